@@ -2,21 +2,179 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 from sklearn.cluster import KMeans
 from datetime import datetime, timedelta
 import warnings
+from top_n import top_n
+from concentration_engine import concentration_summary
+from group_statistics import GroupStatistics
+from streaming_covariance import CovarianceAccumulator
+from model_cache import ModelCache, DEFAULT_CACHE_DIR, data_fingerprint, cache_key
+from model_training import TrainingJob, train_concurrently
+from feature_store import FeatureStore, DEFAULT_STORE_DIR
+from efficiency_clustering import EFFICIENCY_FEATURES, MINIBATCH_MIN_ROWS, SEGMENT_PARAMS, train_efficiency_segments
+from threadpoolctl import threadpool_limits
 warnings.filterwarnings('ignore')
 
+# Hyperparameters of the predictive models; part of every model cache key
+MODEL_PARAMS = {
+    'revenue': {'n_estimators': 100, 'random_state': 42, 'test_size': 0.2},
+    'profit_margin': {'n_estimators': 100, 'random_state': 42, 'test_size': 0.2},
+    'efficiency_clustering': {'n_clusters': 3, 'random_state': 42},
+}
+# Classic backend inputs, read from the feature store; its Thick code and customer lag
+# statistics are stored but left out, as they lowered the hold-out R² on the current ledger
+MODEL_FEATURES = ['Qty', 'Rate', 'Total_Target_Cost', 'Month', 'Quarter', 'Day_of_Week',
+                  'Customer_Encoded', 'Product_Encoded']
+
+# Histogram gradient boosting backend: Customer and Part are native categorical features, no scaling
+HISTOGRAM_BACKEND_MIN_ROWS = 200000
+HISTOGRAM_PARAMS = {'max_iter': 200, 'learning_rate': 0.1, 'random_state': 42, 'test_size': 0.2}
+CATEGORICAL_FEATURES = ['Customer', 'Part description']
+HISTOGRAM_FEATURES = ['Qty', 'Rate', 'Total_Target_Cost', 'Month', 'Quarter', 'Day_of_Week'] + CATEGORICAL_FEATURES
+# Native categorical splits allow at most this many categories; rarer labels are treated as missing
+MAX_NATIVE_CATEGORIES = 255
+# Ledger columns cross-validation and hyperparameter search read; tuned parameters are tied to their fingerprint
+EVALUATION_COLUMNS = CATEGORICAL_FEATURES + ['Date', 'Qty', 'Rate', 'Total_Target_Cost', 'Month', 'Quarter',
+                                             'Day_of_Week', 'Value', 'Profit_Margin']
+# Estimator behind each predictive model per backend; tuned hyperparameters are stored per variant
+MODEL_VARIANTS = {
+    'classic': {'revenue': 'random_forest', 'profit_margin': 'gradient_boosting'},
+    'histogram': {'revenue': 'histogram', 'profit_margin': 'histogram'},
+}
+
+
+def estimator_params(params):
+    """Model hyperparameters without the evaluation settings (hold-out size)"""
+    return {key: value for key, value in params.items() if key != 'test_size'}
+
+
+def train_revenue_model(X, y, params, encoders=None, n_jobs=1):
+    """Fit the scaled RandomForest revenue model (trees built on n_jobs cores) and score it on a hold-out split"""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=params['test_size'],
+                                                        random_state=params['random_state'])
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    
+    model = RandomForestRegressor(n_jobs=n_jobs, **estimator_params(params))
+    model.fit(X_train_scaled, y_train)
+    
+    y_pred = model.predict(X_test_scaled)
+    return {
+        'model': model,
+        'scaler': scaler,
+        'backend': 'classic',
+        'accuracy': r2_score(y_test, y_pred),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+        'feature_importance': pd.DataFrame({'Feature': list(X.columns), 'Importance': model.feature_importances_}),
+        'encoders': encoders,
+    }
+
+
+def train_margin_model(X, y, params, encoders=None):
+    """Fit the scaled GradientBoosting profit-margin model (inherently serial) and score it on a hold-out split"""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=params['test_size'],
+                                                        random_state=params['random_state'])
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    
+    model = GradientBoostingRegressor(**estimator_params(params))
+    model.fit(X_train_scaled, y_train)
+    
+    y_pred = model.predict(X_test_scaled)
+    return {
+        'model': model,
+        'scaler': scaler,
+        'backend': 'classic',
+        'accuracy': r2_score(y_test, y_pred),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+        'encoders': encoders,
+    }
+
+
+def fit_categories(data, columns=CATEGORICAL_FEATURES):
+    """Category list per column for the histogram backend: the most frequent labels, sorted"""
+    return {col: data[col].value_counts().index[:MAX_NATIVE_CATEGORIES].sort_values() for col in columns}
+
+
+def histogram_features(data, categories):
+    """Model frame for the histogram backend, with Customer/Part as fixed pandas categoricals"""
+    X = data[HISTOGRAM_FEATURES].copy()
+    for col, values in categories.items():
+        X[col] = pd.Categorical(data[col], categories=values)
+    return X
+
+
+def train_histogram_model(X, y, params, categories=None, n_jobs=1):
+    """Fit HistGradientBoosting with native categorical splits and score it on a hold-out split"""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=params['test_size'],
+                                                        random_state=params['random_state'])
+    model = HistGradientBoostingRegressor(categorical_features='from_dtype', **estimator_params(params))
+    with threadpool_limits(limits=n_jobs):
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+    # No impurity importances for histogram boosting; keep a bounded test sample to permute later,
+    # so only the fit and predict count towards training time
+    sample = X_test.sample(min(len(X_test), 5000), random_state=params['random_state'])
+    return {
+        'model': model,
+        'scaler': None,
+        'backend': 'histogram',
+        'accuracy': r2_score(y_test, y_pred),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+        'feature_importance': None,
+        'importance_sample': (sample, y_test.loc[sample.index], params['random_state']),
+        'categories': categories,
+    }
+
+
+def feature_importance(artifact):
+    """Feature importances of a trained model, permuting the histogram backend's sample on first use"""
+    if artifact['feature_importance'] is None:
+        sample, target, random_state = artifact['importance_sample']
+        importance = permutation_importance(artifact['model'], sample, target, n_repeats=3,
+                                            random_state=random_state)
+        artifact['feature_importance'] = pd.DataFrame({'Feature': list(sample.columns),
+                                                       'Importance': importance.importances_mean})
+    return artifact['feature_importance']
+
+
+def train_efficiency_clusters(efficiency_data, params, n_jobs=1):
+    """Fit KMeans on the efficiency features, its OpenMP threads capped at n_jobs"""
+    model = KMeans(n_clusters=params['n_clusters'], random_state=params['random_state'])
+    with threadpool_limits(limits=n_jobs):
+        model.fit(efficiency_data)
+    return {'model': model}
+
+
 class AdvancedBDMAnalytics:
-    def __init__(self):
+    def __init__(self, model_cache_dir=DEFAULT_CACHE_DIR, n_jobs=None, model_backend='auto', clustering='auto',
+                 feature_store_dir=DEFAULT_STORE_DIR):
         self.data = None
+        # 'classic' (RandomForest/GradientBoosting), 'histogram', or 'auto' to switch on training-set size
+        self.model_backend = model_backend
+        # 'kmeans' (fixed k), 'minibatch' (streamed, k chosen by silhouette), or 'auto' by row count
+        self.clustering = clustering
+        # Cores for model training (None = all); independent models train at the same time
+        self.n_jobs = n_jobs
+        self.training_wall_time = 0.0
         self.models = {}
         self.insights = {}
+        self._covariance = None
+        # Pass model_cache_dir=None to always retrain without touching the disk
+        self.model_cache = ModelCache(model_cache_dir) if model_cache_dir else None
+        # Stable encodings and precomputed features; feature_store_dir=None computes them in memory
+        self.feature_store = FeatureStore(feature_store_dir)
         
     def load_and_prepare_data(self, csv_file='Main4 - Main3.csv'):
         """Load and prepare data for advanced analysis"""
@@ -80,6 +238,7 @@ class AdvancedBDMAnalytics:
             data['Cost_Per_Unit'] = data['Total_Actual_Cost'] / data['Qty'].replace(0, 1)
             
             self.data = data
+            self._covariance = None
             print(f"Data loaded successfully: {len(data)} records with {data.shape[1]} features")
             return data
             
@@ -87,6 +246,14 @@ class AdvancedBDMAnalytics:
             print(f"Error loading data: {e}")
             return pd.DataFrame()
     
+    def correlation_matrix(self, columns=None):
+        """Pairwise correlations of the numeric columns, accumulated once and shared by every report"""
+        if self._covariance is None:
+            numerical_cols = self.data.select_dtypes(include=[np.number]).columns
+            self._covariance = CovarianceAccumulator.from_frame(self.data, numerical_cols, chunksize=100000)
+        matrix = self._covariance.correlation()
+        return matrix if columns is None else matrix.loc[columns, columns]
+    
     def perform_statistical_analysis(self):
         """Perform comprehensive statistical analysis"""
         if self.data is None or self.data.empty:
@@ -101,14 +268,14 @@ class AdvancedBDMAnalytics:
         desc_stats = self.data[numerical_cols].describe()
         
         # Correlation Analysis
-        correlation_matrix = self.data[numerical_cols].corr()
+        correlation_matrix = self.correlation_matrix()
         
         # Key correlations with Value (revenue)
-        value_correlations = correlation_matrix['Value'].sort_values(ascending=False)
+        value_correlations = top_n(correlation_matrix['Value'], 10)
         
         print("\\nTOP FACTORS INFLUENCING REVENUE:")
         print("-" * 35)
-        for factor, corr in value_correlations.head(10).items():
+        for factor, corr in value_correlations.items():
             if factor != 'Value':
                 print(f"{factor:<30}: {corr:.3f}")
         
@@ -143,13 +310,17 @@ class AdvancedBDMAnalytics:
         print("-" * 35)
         
         # Test for significant differences in profit margins between customers
-        customers = self.data['Customer'].unique()
-        if len(customers) > 1:
-            customer_margins = [self.data[self.data['Customer'] == cust]['Profit_Margin'].values 
-                              for cust in customers]
-            f_stat, p_value = stats.f_oneway(*customer_margins)
-            print(f"Profit Margin variation between customers: F={f_stat:.3f}, p={p_value:.3f}")
-            if p_value < 0.05:
+        margin_tests = None
+        if self.data['Customer'].nunique() > 1:
+            margin_stats = GroupStatistics(self.data, 'Profit_Margin', 'Customer')
+            margin_tests = margin_stats.summary()
+            anova = margin_tests['anova']
+            print(f"Profit Margin variation between customers: F={anova['statistic']:.3f}, p={anova['p_value']:.3f}")
+            print(f"  Welch ANOVA (unequal variances): F={margin_tests['welch']['statistic']:.3f}, p={margin_tests['welch']['p_value']:.3f}")
+            print(f"  Kruskal-Wallis (rank based):     H={margin_tests['kruskal']['statistic']:.3f}, p={margin_tests['kruskal']['p_value']:.3f}")
+            print(f"  Customer pairs differing (Holm-adjusted p<0.05): "
+                  f"{margin_tests['significant_pairs']} of {margin_tests['total_pairs']}")
+            if anova['p_value'] < 0.05:
                 print("✓ Significant differences in profit margins between customers")
             else:
                 print("✗ No significant differences in profit margins between customers")
@@ -159,10 +330,75 @@ class AdvancedBDMAnalytics:
             'top_revenue_factors': value_correlations.head(5).to_dict(),
             'variance_analysis': {cat: {'mean': self.data[cat].mean(), 'std': self.data[cat].std()} 
                                 for cat in variance_categories if cat in self.data.columns},
-            'customer_performance': customer_stats.to_dict()
+            'customer_performance': customer_stats.to_dict(),
+            'margin_tests': margin_tests
         }
     
-    def build_predictive_models(self):
+    def _train_or_load(self, jobs, refresh=False):
+        """Load cached models and train the rest concurrently; jobs maps name -> (fingerprint, features, params, TrainingJob)"""
+        artifacts, keys, pending = {}, {}, []
+        for name, (fingerprint, features, params, job) in jobs.items():
+            keys[name] = cache_key(fingerprint, features, params)
+            artifact = None
+            if self.model_cache is not None and not refresh:
+                artifact = self.model_cache.load(name, keys[name])
+            if artifact is not None:
+                artifacts[name] = dict(artifact, from_cache=True)
+            else:
+                pending.append(job)
+        
+        if pending:
+            results, wall_time = train_concurrently(pending, n_jobs=self.n_jobs)
+            for name, result in results.items():
+                artifact = dict(result['artifact'], data=jobs[name][0], features=list(jobs[name][1]),
+                                trained_at=datetime.now().isoformat(timespec='seconds'),
+                                train_seconds=result['seconds'], train_cores=result['cores'])
+                if self.model_cache is not None:
+                    self.model_cache.save(name, keys[name], artifact)
+                artifacts[name] = dict(artifact, from_cache=False)
+            self.training_wall_time = wall_time
+        return artifacts
+    
+    def report_training_times(self, artifacts):
+        """Print how each model was obtained and how long its fit took"""
+        print("\\nMODEL TRAINING TIMES")
+        print("-" * 20)
+        for name, artifact in artifacts.items():
+            if artifact['from_cache']:
+                print(f"{name:<22}: loaded from cache (trained {artifact['trained_at']})")
+            else:
+                print(f"{name:<22}: {artifact['train_seconds']:6.2f}s on {artifact['train_cores']} core(s)")
+        if any(not artifact['from_cache'] for artifact in artifacts.values()):
+            print(f"{'wall time':<22}: {self.training_wall_time:6.2f}s")
+    
+    def invalidate_models(self, name=None):
+        """Drop the engine's cached models (or one of them) so the next build retrains them"""
+        self.models = {} if name is None else {k: v for k, v in self.models.items() if k != name}
+        if self.model_cache is None:
+            return 0
+        return self.model_cache.invalidate(name)
+    
+    def select_backend(self, rows):
+        """Model backend for a training set of `rows` rows"""
+        if self.model_backend != 'auto':
+            return self.model_backend
+        return 'histogram' if rows >= HISTOGRAM_BACKEND_MIN_ROWS else 'classic'
+    
+    def tuned_params(self, name, variant, defaults, fingerprint):
+        """Hyperparameters for a model: the newest search result for its variant on this data, else the defaults"""
+        if self.model_cache is None:
+            return defaults
+        # Parameters tuned on another version of the ledger are not applied
+        tuned = self.model_cache.latest(f'tuned_{name}_{variant}', lambda result: result.get('data') == fingerprint)
+        return defaults if tuned is None else dict(defaults, **tuned['params'])
+    
+    def select_clustering(self, rows):
+        """Efficiency clustering mode for `rows` complete rows"""
+        if self.clustering != 'auto':
+            return self.clustering
+        return 'minibatch' if rows >= MINIBATCH_MIN_ROWS else 'kmeans'
+    
+    def build_predictive_models(self, refresh=False):
         """Build machine learning models for prediction and forecasting"""
         if self.data is None or self.data.empty:
             return
@@ -172,100 +408,116 @@ class AdvancedBDMAnalytics:
         print("="*50)
         
         # Prepare features for modeling
-        feature_columns = ['Qty', 'Rate', 'Total_Target_Cost', 'Month', 'Quarter', 'Day_of_Week']
-        
-        # Encode categorical variables
-        le = LabelEncoder()
         data_model = self.data.copy()
-        data_model['Customer_Encoded'] = le.fit_transform(data_model['Customer'])
-        data_model['Product_Encoded'] = le.fit_transform(data_model['Part description'])
-        
-        feature_columns.extend(['Customer_Encoded', 'Product_Encoded'])
+        backend = self.select_backend(len(data_model))
+        if backend == 'histogram':
+            feature_columns = list(HISTOGRAM_FEATURES)
+        else:
+            feature_columns = list(MODEL_FEATURES)
+            # Stable categorical codes and time features come precomputed from the feature store
+            store_features = self.feature_store.features(data_model)
+            data_model[feature_columns] = store_features[feature_columns]
+            encoders = self.feature_store.encoders
         
         # Remove rows with missing values in key columns
-        model_data = data_model.dropna(subset=feature_columns + ['Value', 'Profit_Margin'])
+        numeric_features = [col for col in feature_columns if col not in CATEGORICAL_FEATURES]
+        model_data = data_model.dropna(subset=numeric_features + ['Value', 'Profit_Margin'])
         
         if len(model_data) < 50:
             print("Insufficient data for reliable modeling")
             return
         
+        print(f"Model backend: {backend} ({len(model_data):,} training rows)")
+        fingerprint = data_fingerprint(model_data, CATEGORICAL_FEATURES + numeric_features + ['Value', 'Profit_Margin'])
+        efficiency_features = list(EFFICIENCY_FEATURES)
+        efficiency_data = model_data[efficiency_features].dropna()
+        
+        # Hyperparameters saved by hyperparameter_search.py replace the defaults of the matching variant
+        defaults = MODEL_PARAMS if backend == 'classic' else {'revenue': HISTOGRAM_PARAMS, 'profit_margin': HISTOGRAM_PARAMS}
+        tuning_fingerprint = data_fingerprint(self.data, EVALUATION_COLUMNS)
+        params = {name: self.tuned_params(name, variant, defaults[name], tuning_fingerprint)
+                  for name, variant in MODEL_VARIANTS[backend].items()}
+        for name in params:
+            if params[name] != defaults[name]:
+                print(f"Using tuned hyperparameters for {name}: {estimator_params(params[name])}")
+        
+        # Independent fits; cache misses train at the same time in a process pool
+        if backend == 'histogram':
+            categories = fit_categories(model_data)
+            X = histogram_features(model_data, categories)
+            jobs = {
+                'revenue': (fingerprint, feature_columns, params['revenue'],
+                            TrainingJob('revenue', train_histogram_model, (X, model_data['Value'], params['revenue']),
+                                        {'categories': categories}, parallel=True)),
+                'profit_margin': (fingerprint, feature_columns, params['profit_margin'],
+                                  TrainingJob('profit_margin', train_histogram_model,
+                                              (X, model_data['Profit_Margin'], params['profit_margin']),
+                                              {'categories': categories}, parallel=True)),
+            }
+        else:
+            X = model_data[feature_columns]
+            jobs = {
+                'revenue': (fingerprint, feature_columns, params['revenue'],
+                            TrainingJob('revenue', train_revenue_model, (X, model_data['Value'], params['revenue']),
+                                        {'encoders': encoders}, parallel=True)),
+                'profit_margin': (fingerprint, feature_columns, params['profit_margin'],
+                                  TrainingJob('profit_margin', train_margin_model,
+                                              (X, model_data['Profit_Margin'], params['profit_margin']),
+                                              {'encoders': encoders})),
+            }
+        clustering = self.select_clustering(len(efficiency_data))
+        if len(efficiency_data) > 10:
+            if clustering == 'minibatch':
+                cluster_params, train_clusters = SEGMENT_PARAMS, train_efficiency_segments
+            else:
+                cluster_params, train_clusters = MODEL_PARAMS['efficiency_clustering'], train_efficiency_clusters
+            jobs['efficiency_clustering'] = (data_fingerprint(efficiency_data), efficiency_features, cluster_params,
+                                             TrainingJob('efficiency_clustering', train_clusters,
+                                                         (efficiency_data, cluster_params), parallel=True))
+        artifacts = self._train_or_load(jobs, refresh)
+        
         # 1. Revenue Prediction Model
         print("\\n1. REVENUE PREDICTION MODEL")
         print("-" * 30)
         
-        X = model_data[feature_columns]
-        y_revenue = model_data['Value']
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y_revenue, test_size=0.2, random_state=42)
-        
-        # Scale features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-        
-        # Random Forest Model
-        rf_revenue = RandomForestRegressor(n_estimators=100, random_state=42)
-        rf_revenue.fit(X_train_scaled, y_train)
-        
-        y_pred = rf_revenue.predict(X_test_scaled)
-        r2 = r2_score(y_test, y_pred)
-        mse = mean_squared_error(y_test, y_pred)
-        mae = mean_absolute_error(y_test, y_pred)
-        
-        print(f"Revenue Prediction Accuracy (R²): {r2:.3f}")
-        print(f"Mean Absolute Error: ₹{mae:,.0f}")
-        print(f"Root Mean Square Error: ₹{np.sqrt(mse):,.0f}")
-        
-        # Feature importance
-        feature_importance = pd.DataFrame({
-            'Feature': feature_columns,
-            'Importance': rf_revenue.feature_importances_
-        }).sort_values('Importance', ascending=False)
+        revenue = artifacts['revenue']
+        print(f"Revenue Prediction Accuracy (R²): {revenue['accuracy']:.3f}")
+        print(f"Mean Absolute Error: ₹{revenue['mae']:,.0f}")
+        print(f"Root Mean Square Error: ₹{revenue['rmse']:,.0f}")
         
         print("\\nTop Revenue Prediction Features:")
-        for _, row in feature_importance.head(5).iterrows():
+        for _, row in top_n(feature_importance(revenue), 5, by='Importance').iterrows():
             print(f"{row['Feature']:<20}: {row['Importance']:.3f}")
         
-        self.models['revenue'] = {'model': rf_revenue, 'scaler': scaler, 'accuracy': r2}
+        self.models['revenue'] = revenue
         
         # 2. Profit Margin Prediction Model
         print("\\n2. PROFIT MARGIN PREDICTION MODEL")
         print("-" * 35)
         
-        y_margin = model_data['Profit_Margin']
-        X_train, X_test, y_train_margin, y_test_margin = train_test_split(X, y_margin, test_size=0.2, random_state=42)
-        
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
+        margin = artifacts['profit_margin']
+        print(f"Profit Margin Prediction Accuracy (R²): {margin['accuracy']:.3f}")
+        print(f"Mean Absolute Error: {margin['mae']:.2f}%")
         
-        gb_margin = GradientBoostingRegressor(n_estimators=100, random_state=42)
-        gb_margin.fit(X_train_scaled, y_train_margin)
-        
-        y_pred_margin = gb_margin.predict(X_test_scaled)
-        r2_margin = r2_score(y_test_margin, y_pred_margin)
-        mae_margin = mean_absolute_error(y_test_margin, y_pred_margin)
-        
-        print(f"Profit Margin Prediction Accuracy (R²): {r2_margin:.3f}")
-        print(f"Mean Absolute Error: {mae_margin:.2f}%")
-        
-        self.models['profit_margin'] = {'model': gb_margin, 'scaler': scaler, 'accuracy': r2_margin}
+        self.models['profit_margin'] = margin
         
         # 3. Cost Efficiency Clustering
         print("\\n3. OPERATIONAL EFFICIENCY CLUSTERING")
         print("-" * 40)
         
-        efficiency_features = ['Manpower_Efficiency', 'Material_Efficiency', 'Machine_Efficiency', 'Overall_Efficiency']
-        efficiency_data = model_data[efficiency_features].dropna()
-        
-        if len(efficiency_data) > 10:
-            kmeans = KMeans(n_clusters=3, random_state=42)
-            clusters = kmeans.fit_predict(efficiency_data)
+        if 'efficiency_clustering' in artifacts:
+            kmeans = artifacts['efficiency_clustering']['model']
+            clusters = kmeans.predict(efficiency_data)
             
             model_data.loc[efficiency_data.index, 'Efficiency_Cluster'] = clusters
             
             # Analyze clusters
             cluster_analysis = model_data.groupby('Efficiency_Cluster')[efficiency_features + ['Value', 'Profit_Margin']].mean()
             
+            if 'segmentation' in artifacts['efficiency_clustering']:
+                segmentation = artifacts['efficiency_clustering']['segmentation']
+                print(f"Mini-batch clustering: k={segmentation.best_k} chosen by silhouette "
+                      f"({segmentation.scores.loc[segmentation.best_k, 'silhouette']:.3f})")
             print("Efficiency Cluster Analysis:")
             for cluster in cluster_analysis.index:
                 overall_eff = cluster_analysis.loc[cluster, 'Overall_Efficiency']
@@ -273,6 +525,8 @@ class AdvancedBDMAnalytics:
                 print(f"Cluster {cluster}: Efficiency={overall_eff:.1f}%, Profit Margin={avg_margin:.1f}%")
             
             self.models['efficiency_clustering'] = kmeans
+        
+        self.report_training_times(artifacts)
     
     def generate_business_insights(self):
         """Generate comprehensive business insights and recommendations"""
@@ -299,8 +553,8 @@ class AdvancedBDMAnalytics:
         print("\\n2. CUSTOMER INSIGHTS")
         print("-" * 20)
         
-        customer_revenue = self.data.groupby('Customer')['Value'].sum().sort_values(ascending=False)
-        top_customers = customer_revenue.head(3)
+        customer_revenue = self.data.groupby('Customer')['Value'].sum()
+        top_customers = top_n(customer_revenue, 3)
         
         print("Top 3 Customers by Revenue:")
         for i, (customer, revenue) in enumerate(top_customers.items(), 1):
@@ -308,9 +562,10 @@ class AdvancedBDMAnalytics:
             print(f"{i}. {customer}: ₹{revenue:,.0f} ({percentage:.1f}%)")
         
         # Customer concentration risk
-        top_80_percent = customer_revenue.cumsum() / customer_revenue.sum() <= 0.8
-        customers_80_percent = top_80_percent.sum()
+        concentration = concentration_summary(customer_revenue)
+        customers_80_percent = concentration['customers_for_share']
         print(f"\\nCustomer Concentration: {customers_80_percent} customers generate 80% of revenue")
+        print(f"Herfindahl Index: {concentration['hhi']:,.0f} | Gini: {concentration['gini']:.3f}")
         if customers_80_percent <= 3:
             print("⚠️  HIGH RISK: Heavy dependence on few customers")
         elif customers_80_percent <= 5:
@@ -326,10 +581,10 @@ class AdvancedBDMAnalytics:
             'Value': 'sum',
             'Qty': 'sum',
             'Profit_Margin': 'mean'
-        }).sort_values('Value', ascending=False)
+        })
         
         print("Top 5 Products by Revenue:")
-        for i, (product, row) in enumerate(product_performance.head(5).iterrows(), 1):
+        for i, (product, row) in enumerate(top_n(product_performance, 5, by='Value').iterrows(), 1):
             print(f"{i}. {product[:40]}: ₹{row['Value']:,.0f} (Margin: {row['Profit_Margin']:.1f}%)")
         
         # 4. Operational Efficiency
@@ -406,6 +661,8 @@ class AdvancedBDMAnalytics:
             'total_revenue': total_revenue,
             'avg_profit_margin': avg_profit_margin,
             'customer_concentration_risk': customers_80_percent,
+            'customer_hhi': concentration['hhi'],
+            'customer_gini': concentration['gini'],
             'operational_efficiency': avg_overall_eff,
             'cost_variance': avg_cost_variance,
             'recommendations': recommendations
@@ -421,8 +678,8 @@ class AdvancedBDMAnalytics:
         fig.suptitle('BDM Manufacturing Analytics Dashboard', fontsize=16, fontweight='bold')
         
         # 1. Revenue by Customer
-        customer_revenue = self.data.groupby('Customer')['Value'].sum().sort_values(ascending=True)
-        customer_revenue.tail(10).plot(kind='barh', ax=axes[0,0], color='steelblue')
+        customer_revenue = self.data.groupby('Customer')['Value'].sum()
+        top_n(customer_revenue, 10).iloc[::-1].plot(kind='barh', ax=axes[0,0], color='steelblue')
         axes[0,0].set_title('Top 10 Customers by Revenue')
         axes[0,0].set_xlabel('Revenue (₹)')
         
@@ -462,8 +719,8 @@ class AdvancedBDMAnalytics:
         axes[1,1].set_ylabel('Profit Margin (%)')
         
         # 6. Top Products by Volume
-        product_qty = self.data.groupby('Part description')['Qty'].sum().sort_values(ascending=True)
-        product_qty.tail(8).plot(kind='barh', ax=axes[1,2], color='purple', alpha=0.7)
+        product_qty = self.data.groupby('Part description')['Qty'].sum()
+        top_n(product_qty, 8).iloc[::-1].plot(kind='barh', ax=axes[1,2], color='purple', alpha=0.7)
         axes[1,2].set_title('Top 8 Products by Volume')
         axes[1,2].set_xlabel('Quantity')
         
@@ -475,7 +732,7 @@ class AdvancedBDMAnalytics:
         plt.figure(figsize=(12, 8))
         numerical_cols = ['Value', 'Qty', 'Rate', 'Profit_Margin', 'Overall_Efficiency', 
                          'Cost_Variance_Pct', 'ROI']
-        correlation_matrix = self.data[numerical_cols].corr()
+        correlation_matrix = self.correlation_matrix(numerical_cols)
         
         sns.heatmap(correlation_matrix, annot=True, cmap='RdYlBu_r', center=0, 
                    fmt='.2f', square=True)
@@ -5,6 +5,15 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
+from shared_dataset import SharedDataset, enable_copy_on_write
+from dataset_watcher import DatasetWatcher
+from classification_engine import order_quadrants
+from top_n import top_n
+from rolling_kpi_engine import RollingKPIEngine
+from period_comparison import business_comparison
+
+# Sessions share one ledger frame; copy-on-write keeps their derived frames from writing into it
+enable_copy_on_write()
 
 # Configure page
 st.set_page_config(
@@ -68,21 +77,20 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load and prepare data
-@st.cache_data
+@st.cache_resource
+def get_shared_dataset():
+    """Process-wide cleaned dataset shared by every session without copying"""
+    return SharedDataset()
+
+@st.cache_resource
+def get_dataset_watcher():
+    """Background watcher that rebuilds the shared dataset when the source CSV changes"""
+    return DatasetWatcher(get_shared_dataset()).start()
+
 def load_data():
     try:
-        data = pd.read_csv('Main4 - Main3.csv')
-        
-        # Clean data
-        def clean_currency(x):
-            return float(str(x).replace(',', ''))
-        
-        data['Qty'] = data['Qty'].apply(clean_currency)
-        data['Value'] = data['Value'].apply(clean_currency)
-        data['Rate'] = data['Rate'].apply(clean_currency)
-        data['Date'] = pd.to_datetime(data['Date'], errors='coerce', dayfirst=True)
-        
-        return data
+        get_dataset_watcher()
+        return get_shared_dataset().data
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
@@ -110,13 +118,21 @@ filtered_data = data[
 # Key Metrics Row
 col1, col2, col3, col4 = st.columns(4)
 
+# Latest month against the month before, shown as metric deltas
+monthly_comparison = business_comparison(filtered_data, 'M')
+
+def month_over_month(column):
+    if len(monthly_comparison) < 2 or pd.isna(monthly_comparison[column].iloc[-1]):
+        return None
+    return f"{monthly_comparison[column].iloc[-1]:+.1f}% MoM"
+
 with col1:
     total_sales = filtered_data['Value'].sum()
-    st.metric("💰 Total Sales", f"₹{total_sales:,.0f}")
+    st.metric("💰 Total Sales", f"₹{total_sales:,.0f}", delta=month_over_month('Revenue_MoM_Pct'))
 
 with col2:
     total_qty = filtered_data['Qty'].sum()
-    st.metric("📦 Total Quantity", f"{total_qty:,.0f}")
+    st.metric("📦 Total Quantity", f"{total_qty:,.0f}", delta=month_over_month('Qty_MoM_Pct'))
 
 with col3:
     unique_products = filtered_data['Part description'].nunique()
@@ -176,6 +192,16 @@ with tab2:
         markers=True
     )
     fig_line.update_traces(line_color='#ff6b6b', marker_color='#ff6b6b')
+    
+    # Trailing 7-day volume over every calendar day
+    rolling_volume = RollingKPIEngine(key=None, windows=(7,)).fit(filtered_data).daily()
+    fig_line.add_trace(go.Scatter(
+        x=rolling_volume.index,
+        y=rolling_volume['Qty_7d'] / 7,
+        mode='lines',
+        name='7-day average',
+        line=dict(color='#1f4e79', width=3)
+    ))
     fig_line.update_layout(height=400)
     st.plotly_chart(fig_line, use_container_width=True)
     
@@ -211,17 +237,8 @@ with tab3:
     value_median = filtered_data['Value'].median()
     
     # Create quadrant labels
-    def get_quadrant(row):
-        if row['Qty'] > qty_median and row['Value'] > value_median:
-            return "High Volume, High Sales"
-        elif row['Qty'] > qty_median and row['Value'] <= value_median:
-            return "High Volume, Low Sales"
-        elif row['Qty'] <= qty_median and row['Value'] > value_median:
-            return "Low Volume, High Sales"
-        else:
-            return "Low Volume, Low Sales"
-    
-    filtered_data['Quadrant'] = filtered_data.apply(get_quadrant, axis=1)
+    filtered_data['Quadrant'] = order_quadrants(filtered_data['Qty'], filtered_data['Value'],
+                                                qty_threshold=qty_median, value_threshold=value_median)
     
     # Scatter plot for quadrant analysis
     fig_scatter = px.scatter(
@@ -242,7 +259,7 @@ with tab3:
     st.plotly_chart(fig_scatter, use_container_width=True)
     
     # Quadrant summary
-    quadrant_summary = filtered_data.groupby('Quadrant').agg({
+    quadrant_summary = filtered_data.groupby('Quadrant', observed=True).agg({
         'Part description': 'count',
         'Value': 'sum',
         'Qty': 'sum'
@@ -255,11 +272,11 @@ with tab4:
     st.subheader("Product Performance Analysis")
     
     # Top products by sales
-    top_products = filtered_data.groupby('Part description').agg({
+    top_products = top_n(filtered_data.groupby('Part description').agg({
         'Value': 'sum',
         'Qty': 'sum',
         'Rate': 'mean'
-    }).reset_index().sort_values('Value', ascending=False).head(20)
+    }).reset_index(), 20, by='Value')
     
     fig_top_products = px.bar(
         top_products, 
@@ -0,0 +1,103 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from advanced_analytics_engine import MODEL_FEATURES, HISTOGRAM_FEATURES, CATEGORICAL_FEATURES
+from feature_store import order_features
+from model_cache import ModelCache, DEFAULT_CACHE_DIR
+
+# Label-encoded column produced from each categorical ledger column by the classic backend
+ENCODED_COLUMNS = {'Customer': 'Customer_Encoded', 'Part description': 'Product_Encoded'}
+
+PREDICTION_COLUMNS = {'revenue': 'Predicted_Value', 'profit_margin': 'Predicted_Profit_Margin'}
+
+
+class BatchScorer:
+    """Score prospective orders with the trained revenue and profit-margin models.
+
+    Each model is the artifact dict written by ``build_predictive_models``, so
+    the scorer reuses exactly the encoders, scaler or category lists the model
+    was fitted with. Customers and parts the model has never seen are encoded
+    as -1 (classic backend) or as a missing category (histogram backend)
+    rather than raising. Rows without a usable date get no prediction.
+    """
+
+    def __init__(self, revenue, profit_margin=None):
+        self.models = {'revenue': revenue, 'profit_margin': profit_margin}
+
+    @classmethod
+    def from_cache(cls, cache_dir=DEFAULT_CACHE_DIR):
+        """Scorer over the most recently trained revenue model and the margin model of the same training run"""
+        cache = ModelCache(cache_dir)
+        revenue = cache.latest('revenue')
+        if revenue is None:
+            raise FileNotFoundError(f"No trained revenue model in {cache_dir}; run advanced_analytics_engine.py first")
+        margin = cache.latest('profit_margin', lambda artifact: revenue.get('data') is not None and
+                              (artifact.get('data'), artifact['backend']) == (revenue['data'], revenue['backend']))
+        if margin is None and cache.entries('profit_margin'):
+            raise ValueError(f"No cached profit-margin model matches the latest revenue model in {cache_dir}; "
+                             "retrain with advanced_analytics_engine.py")
+        return cls(revenue, margin)
+
+    @classmethod
+    def from_analytics(cls, analytics):
+        """Scorer over the models of an AdvancedBDMAnalytics run"""
+        if 'revenue' not in analytics.models:
+            raise ValueError("build_predictive_models() has not produced a revenue model")
+        return cls(analytics.models['revenue'], analytics.models.get('profit_margin'))
+
+    def _model_inputs(self, artifact, features):
+        if artifact['backend'] == 'histogram':
+            X = features[artifact.get('features', HISTOGRAM_FEATURES)].copy()
+            for col, values in artifact['categories'].items():
+                X[col] = pd.Categorical(features[col], categories=values)
+            return X
+
+        encoded = features.copy()
+        for col, encoded_col in ENCODED_COLUMNS.items():
+            classes = pd.Index(artifact['encoders'][col].classes_)
+            encoded[encoded_col] = classes.get_indexer(features[col])
+        X = encoded[artifact.get('features', MODEL_FEATURES)]
+        return X if artifact['scaler'] is None else artifact['scaler'].transform(X)
+
+    def predict(self, orders):
+        """Predicted Value and Profit_Margin for every order, indexed like `orders`"""
+        features = order_features(orders)
+        numeric = [col for col in HISTOGRAM_FEATURES if col not in CATEGORICAL_FEATURES]
+        scorable = features[numeric].notna().all(axis=1)
+
+        predictions = pd.DataFrame(index=orders.index)
+        for name, column in PREDICTION_COLUMNS.items():
+            artifact = self.models[name]
+            if artifact is None:
+                continue
+            predictions[column] = np.nan
+            if scorable.any():
+                rows = features[scorable]
+                predictions.loc[scorable, column] = artifact['model'].predict(self._model_inputs(artifact, rows))
+        return predictions
+
+    def score_csv(self, input_path, output_path, chunksize=50000):
+        """Stream a CSV of orders through the models, appending the predictions chunk by chunk"""
+        rows = 0
+        for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+            scored = pd.concat([chunk, self.predict(chunk)], axis=1)
+            scored.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            rows += len(chunk)
+        return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Predict Value and Profit_Margin for a CSV of prospective orders")
+    parser.add_argument('input', help="CSV with Customer, Part description, Qty, Rate, target costs and Date")
+    parser.add_argument('output', help="CSV to write: the input columns plus the predictions")
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    scorer = BatchScorer.from_cache(args.cache_dir)
+    backend = scorer.models['revenue']['backend']
+    rows = scorer.score_csv(args.input, args.output, args.chunksize)
+    print(f"Scored {rows:,} order(s) with the {backend} models -> {os.path.abspath(args.output)}")
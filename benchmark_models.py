@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import r2_score
+from sklearn.preprocessing import LabelEncoder
+
+from advanced_analytics_engine import (AdvancedBDMAnalytics, MODEL_PARAMS, MODEL_FEATURES, HISTOGRAM_PARAMS,
+                                       train_revenue_model, train_margin_model, train_histogram_model,
+                                       fit_categories, histogram_features)
+
+DEFAULT_SIZES = [3000, 30000, 300000]
+# Share of the original orders held out for scoring, split off before resampling
+TEST_FRACTION = 0.2
+
+
+def synthetic_ledger(data, rows, seed=42):
+    """Resample the ledger to `rows` orders, jittering quantities so rows are not exact duplicates"""
+    rng = np.random.default_rng(seed)
+    sample = data.iloc[rng.integers(0, len(data), rows)].reset_index(drop=True)
+    scale = rng.uniform(0.5, 1.5, rows)
+    for col in ['Qty', 'Value', 'Total_Target_Cost']:
+        sample[col] = sample[col] * scale
+    sample['Profit_Margin'] = sample['Profit_Margin'] + rng.normal(0, 0.5, rows)
+    return sample
+
+
+def split_ledger(data, test_fraction=TEST_FRACTION, seed=42):
+    """Random train/test split of the original orders, so no resampled test row has a twin in training"""
+    test = np.random.default_rng(seed).random(len(data)) < test_fraction
+    return data[~test], data[test]
+
+
+def classic_features(data, encoders):
+    data = data.copy()
+    data['Customer_Encoded'] = encoders['Customer'].transform(data['Customer'])
+    data['Product_Encoded'] = encoders['Part description'].transform(data['Part description'])
+    return data[MODEL_FEATURES]
+
+
+def holdout_r2(artifact, X, y):
+    """R² of a trained artifact on the held-out resampled orders"""
+    scaler = artifact['scaler']
+    return r2_score(y, artifact['model'].predict(X if scaler is None else scaler.transform(X)))
+
+
+def run_benchmark(data, sizes=DEFAULT_SIZES, n_jobs=None):
+    """Fit time and hold-out R² of both backends for revenue and margin at each synthetic ledger size.
+
+    The original orders are split into train and test first and each side is
+    resampled on its own; R² is scored on the resampled test orders.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    train_orders, test_orders = split_ledger(data)
+    encoders = {col: LabelEncoder().fit(data[col]) for col in ['Customer', 'Part description']}
+    results = []
+    for rows in sizes:
+        test_rows = int(rows * TEST_FRACTION)
+        sample = synthetic_ledger(train_orders, rows - test_rows)
+        test = synthetic_ledger(test_orders, test_rows, seed=43)
+        categories = fit_categories(sample)
+        inputs = {'classic': lambda frame: classic_features(frame, encoders),
+                  'histogram': lambda frame: histogram_features(frame, categories)}
+        targets = {'revenue': 'Value', 'profit_margin': 'Profit_Margin'}
+        backends = {
+            'classic': (classic_features(sample, encoders), {
+                'revenue': lambda X: train_revenue_model(X, sample['Value'], MODEL_PARAMS['revenue'], n_jobs=n_jobs),
+                'profit_margin': lambda X: train_margin_model(X, sample['Profit_Margin'], MODEL_PARAMS['profit_margin']),
+            }),
+            'histogram': (histogram_features(sample, categories), {
+                'revenue': lambda X: train_histogram_model(X, sample['Value'], HISTOGRAM_PARAMS, n_jobs=n_jobs),
+                'profit_margin': lambda X: train_histogram_model(X, sample['Profit_Margin'], HISTOGRAM_PARAMS, n_jobs=n_jobs),
+            }),
+        }
+        for backend, (X, trainers) in backends.items():
+            for target, train in trainers.items():
+                start = time.perf_counter()
+                artifact = train(X)
+                seconds = time.perf_counter() - start
+                r2 = holdout_r2(artifact, inputs[backend](test), test[targets[target]])
+                results.append({'rows': rows, 'backend': backend, 'model': target, 'seconds': seconds, 'r2': r2})
+                print(f"{rows:>9,} rows  {backend:<10} {target:<14} {seconds:8.2f}s  R²={r2:.3f}")
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    analytics = AdvancedBDMAnalytics(model_cache_dir=None)
+    analytics.load_and_prepare_data()
+    print(f"Benchmarking model backends on {os.cpu_count()} core(s)")
+    results = run_benchmark(analytics.data, sizes)
+    print("\nSpeed-up of histogram over classic (fit time ratio):")
+    pivot = results.pivot_table(index=['rows', 'model'], columns='backend', values='seconds')
+    print((pivot['classic'] / pivot['histogram']).round(1).to_string())
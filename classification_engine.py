@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Quadrant label sets, ordered (high/high, high/low, low/high, low/low) for (primary, secondary)
+DASHBOARD_CUSTOMER_SEGMENTS = ("💎 Champions", "🏆 High Value", "🔄 Frequent", "🔍 Potential")
+REPORT_CUSTOMER_SEGMENTS = ("Champions", "Loyal Customers", "Potential Loyalists", "At Risk")
+PRODUCT_CATEGORIES = ("Star Products", "Cash Cows", "Question Marks", "Dogs")
+ORDER_QUADRANTS = ("High Volume, High Sales", "High Volume, Low Sales",
+                   "Low Volume, High Sales", "Low Volume, Low Sales")
+
+
+def _values(values):
+    return np.asarray(values.to_numpy(dtype=float) if isinstance(values, pd.Series) else values, dtype=float)
+
+
+def _as_labels(codes, labels, like):
+    """Wrap integer label codes as a Categorical, or a Series aligned with `like`"""
+    categorical = pd.Categorical.from_codes(codes, categories=list(labels))
+    if isinstance(like, pd.Series):
+        return pd.Series(categorical, index=like.index)
+    return categorical
+
+
+def classify_quadrants(primary, secondary, labels, primary_threshold=None, secondary_threshold=None):
+    """Label each row by whether primary and secondary are strictly above their thresholds.
+
+    Vectorized form of the row-wise if/elif quadrant rules: labels are taken in
+    (high/high, high/low, low/high, low/low) order and thresholds default to the
+    column medians. Rows with a NaN in either measure fall through to low/low,
+    as they did with the explicit ``<=`` branches.
+    """
+    primary_values = _values(primary)
+    secondary_values = _values(secondary)
+    if primary_threshold is None:
+        primary_threshold = np.nanmedian(primary_values) if len(primary_values) else np.nan
+    if secondary_threshold is None:
+        secondary_threshold = np.nanmedian(secondary_values) if len(secondary_values) else np.nan
+
+    primary_low = ~(primary_values > primary_threshold)
+    secondary_low = ~(secondary_values > secondary_threshold)
+    codes = 2 * primary_low.astype(np.int8) + secondary_low.astype(np.int8)
+    codes[np.isnan(primary_values) | np.isnan(secondary_values)] = 3
+    return _as_labels(codes, labels, primary)
+
+
+def segment_customers(revenue, frequency, labels=DASHBOARD_CUSTOMER_SEGMENTS,
+                      revenue_threshold=None, frequency_threshold=None):
+    """Revenue x frequency customer segments, split at the medians by default"""
+    return classify_quadrants(revenue, frequency, labels, revenue_threshold, frequency_threshold)
+
+
+def categorize_products(revenue, volume, labels=PRODUCT_CATEGORIES,
+                        revenue_threshold=None, volume_threshold=None):
+    """BCG-style revenue x volume product categories, split at the medians by default"""
+    return classify_quadrants(revenue, volume, labels, revenue_threshold, volume_threshold)
+
+
+def order_quadrants(qty, value, labels=ORDER_QUADRANTS, qty_threshold=None, value_threshold=None):
+    """Volume x sales quadrant for every ledger row, split at the medians by default"""
+    return classify_quadrants(qty, value, labels, qty_threshold, value_threshold)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# Period aliases accepted by concentration_series
+PERIODS = {'month': 'M', 'quarter': 'Q'}
+
+
+def customer_totals(data, value_col='Value'):
+    """Per-customer revenue totals, the input every concentration measure works from"""
+    return data.groupby('Customer')[value_col].sum()
+
+
+def _concentration_arrays(matrix, share):
+    """Concentration measures for each row of a (periods x customers) totals matrix"""
+    matrix = np.nan_to_num(np.asarray(matrix, dtype=float), nan=0.0)
+    totals = matrix.sum(axis=1)
+    safe_totals = np.where(totals == 0, np.nan, totals)
+    ascending = np.sort(matrix, axis=1)
+
+    # Same rule as the reports: customers, largest first, while cumulative share <= target
+    cumulative = np.cumsum(ascending[:, ::-1], axis=1)
+    with np.errstate(invalid='ignore'):
+        customers_for_share = (cumulative / safe_totals[:, None] <= share).sum(axis=1)
+
+    shares = matrix / safe_totals[:, None]
+    hhi = np.nansum(shares ** 2, axis=1) * 10000
+    top_share = ascending[:, -1] / safe_totals if matrix.shape[1] else np.full(len(totals), np.nan)
+
+    # Gini over customers active in the row; inactive (zero) customers sort first and are skipped
+    active = (matrix > 0).sum(axis=1)
+    ranks = np.arange(1, matrix.shape[1] + 1) - (matrix.shape[1] - active)[:, None]
+    weighted = (ranks * ascending).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gini = 2 * weighted / (active * safe_totals) - (active + 1) / active
+    gini = np.where(active > 1, gini, 0.0)
+
+    return {
+        'Revenue': totals,
+        'Active_Customers': active,
+        'Customers_For_Share': customers_for_share,
+        'Top_Customer_Share': top_share * 100,
+        'HHI': np.where(totals == 0, np.nan, hhi),
+        'Gini': gini,
+    }
+
+
+def _single_row(totals, share):
+    return _concentration_arrays(np.asarray(totals, dtype=float)[None, :], share)
+
+
+def customers_for_share(totals, share=0.8):
+    """Number of largest customers whose cumulative revenue stays within `share` of the total"""
+    return int(_single_row(totals, share)['Customers_For_Share'][0])
+
+
+def herfindahl_index(totals):
+    """Herfindahl-Hirschman index of revenue shares on the 0-10,000 scale"""
+    return float(_single_row(totals, 0.8)['HHI'][0])
+
+
+def gini_coefficient(totals):
+    """Gini coefficient of revenue across active customers (0 = equal, 1 = one customer)"""
+    return float(_single_row(totals, 0.8)['Gini'][0])
+
+
+def concentration_summary(totals, share=0.8):
+    """80%-count, HHI, Gini and top-customer share for one set of customer totals"""
+    arrays = _single_row(totals, share)
+    return {
+        'customers_for_share': int(arrays['Customers_For_Share'][0]),
+        'share': share,
+        'hhi': float(arrays['HHI'][0]),
+        'gini': float(arrays['Gini'][0]),
+        'top_customer_share': float(arrays['Top_Customer_Share'][0]),
+        'active_customers': int(arrays['Active_Customers'][0]),
+    }
+
+
+def concentration_series(data, period='month', window=1, share=0.8, value_col='Value'):
+    """Concentration measures for every month or quarter in one vectorized pass.
+
+    Builds a (period x customer) revenue matrix once, optionally sums it over a
+    trailing window of periods (window=None accumulates from the start), and
+    computes all measures for every period at once.
+    """
+    freq = PERIODS.get(period, period)
+    periods = data['Date'].dt.to_period(freq)
+    matrix = data.groupby([periods, data['Customer']])[value_col].sum().unstack(fill_value=0.0)
+    if matrix.empty:
+        return pd.DataFrame(columns=['Revenue', 'Active_Customers', 'Customers_For_Share',
+                                     'Top_Customer_Share', 'HHI', 'Gini'])
+
+    # Fill periods without any orders so trailing windows count calendar periods
+    matrix = matrix.reindex(pd.period_range(matrix.index.min(), matrix.index.max(), freq=freq), fill_value=0.0)
+    values = matrix.to_numpy(dtype=float)
+    if window is None:
+        values = np.cumsum(values, axis=0)
+    elif window > 1:
+        # Sum each trailing window directly; differencing a cumsum leaves float residue
+        # that would count customers with no revenue in the window as active
+        padded = np.vstack([np.zeros((window - 1, values.shape[1])), values])
+        values = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0).sum(axis=-1)
+
+    series = pd.DataFrame(_concentration_arrays(values, share), index=matrix.index)
+    series.index.name = 'Date'
+    return series
@@ -0,0 +1,167 @@
+import gzip
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Supported export formats: (file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+# Shared worker pool so large exports never run on the Streamlit script thread
+_EXPORT_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='bdm-export')
+
+
+class ExportResult:
+    """Finished export, held either in memory or as a file on disk"""
+
+    def __init__(self, file_name, mime, rows, data=None, path=None):
+        self.file_name = file_name
+        self.mime = mime
+        self.rows = rows
+        self.data = data
+        self.path = path
+
+    @property
+    def size_bytes(self):
+        if self.path is not None:
+            return os.path.getsize(self.path)
+        return len(self.data)
+
+    def exists(self):
+        """False once a spilled export file has been discarded or removed"""
+        return self.path is None or os.path.isfile(self.path)
+
+    def open(self):
+        """Return a binary file object for the export payload"""
+        if self.path is not None:
+            return open(self.path, 'rb')
+        return BytesIO(self.data)
+
+    def read(self):
+        """Return the export payload as bytes, read from disk only when asked for"""
+        with self.open() as payload:
+            return payload.read()
+
+    def discard(self):
+        """Delete the spilled export file, if any"""
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class StreamingDataExporter:
+    """Write DataFrame exports chunk by chunk instead of building them in one string"""
+
+    def __init__(self, chunk_size=50000, spill_threshold_rows=100000, export_dir=None):
+        self.chunk_size = chunk_size
+        self.spill_threshold_rows = spill_threshold_rows
+        self.export_dir = export_dir or os.path.join(tempfile.gettempdir(), 'bdm_exports')
+
+    def available_formats(self):
+        """List the export formats usable in this environment"""
+        return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pq is not None]
+
+    def iter_csv_chunks(self, df, index=False):
+        """Yield the CSV encoding of a DataFrame as UTF-8 byte chunks"""
+        if df.empty:
+            yield df.to_csv(index=index).encode('utf-8')
+            return
+
+        for start in range(0, len(df), self.chunk_size):
+            chunk = df.iloc[start:start + self.chunk_size]
+            yield chunk.to_csv(index=index, header=(start == 0)).encode('utf-8')
+
+    def write_csv(self, df, fileobj, index=False, compress=False):
+        """Stream CSV chunks into a binary file object, optionally gzip-compressed"""
+        if compress:
+            with gzip.GzipFile(fileobj=fileobj, mode='wb') as gz:
+                for chunk in self.iter_csv_chunks(df, index=index):
+                    gz.write(chunk)
+        else:
+            for chunk in self.iter_csv_chunks(df, index=index):
+                fileobj.write(chunk)
+
+    def write_parquet(self, df, fileobj, index=False):
+        """Stream row groups of a DataFrame into a Parquet file object"""
+        if pq is None:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        schema = pa.Schema.from_pandas(df, preserve_index=index)
+        with pq.ParquetWriter(fileobj, schema, compression='snappy') as writer:
+            for start in range(0, max(len(df), 1), self.chunk_size):
+                chunk = df.iloc[start:start + self.chunk_size]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=index))
+
+    def write(self, df, fileobj, fmt='csv', index=False):
+        """Write a DataFrame to a binary file object in the requested format"""
+        if fmt == 'csv':
+            self.write_csv(df, fileobj, index=index)
+        elif fmt == 'csv.gz':
+            self.write_csv(df, fileobj, index=index, compress=True)
+        elif fmt == 'parquet':
+            self.write_parquet(df, fileobj, index=index)
+        else:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+    def export(self, df, file_stem, fmt='csv', index=False):
+        """Build an export, spilling to a temporary file once it exceeds the row threshold"""
+        extension, mime = EXPORT_FORMATS[fmt]
+        file_name = f"{file_stem}{extension}"
+
+        if len(df) < self.spill_threshold_rows:
+            buffer = BytesIO()
+            self.write(df, buffer, fmt=fmt, index=index)
+            return ExportResult(file_name, mime, len(df), data=buffer.getvalue())
+
+        os.makedirs(self.export_dir, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(prefix=f"{file_stem}_", suffix=extension,
+                                             dir=self.export_dir, delete=False)
+        try:
+            with handle:
+                self.write(df, handle, fmt=fmt, index=index)
+        except Exception:
+            os.remove(handle.name)
+            raise
+        return ExportResult(file_name, mime, len(df), path=handle.name)
+
+    def submit(self, df, file_stem, fmt='csv', index=False):
+        """Build an export on the background pool and return its Future"""
+        return _EXPORT_EXECUTOR.submit(self.export, df, file_stem, fmt, index)
+
+    def discard(self, futures):
+        """Delete the spilled files of earlier exports once they finish; other exports are untouched"""
+        for future in futures:
+            future.add_done_callback(_discard_result)
+
+    def cleanup(self, max_age_seconds=86400):
+        """Delete spilled export files older than max_age_seconds, left behind by finished processes"""
+        if not os.path.isdir(self.export_dir):
+            return
+
+        cutoff = time.time() - max_age_seconds
+        for name in os.listdir(self.export_dir):
+            path = os.path.join(self.export_dir, name)
+            try:
+                if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def _discard_result(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().discard()
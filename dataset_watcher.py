@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+
+from shared_dataset import list_source_files
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# Only events that can change file contents; reads emit opened/closed_no_write
+CHANGE_EVENT_TYPES = {'created', 'modified', 'moved', 'deleted', 'closed'}
+
+
+def source_fingerprint(source):
+    """Cheap change signature for a source file or directory: (path, mtime, size) per CSV"""
+    fingerprint = []
+    for path in list_source_files(source):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+class _SourceEventHandler(FileSystemEventHandler):
+    """Forward filesystem events that touch the watched source to the watcher"""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in CHANGE_EVENT_TYPES:
+            return
+        paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+        if any(self.watcher.is_source_path(path) for path in paths if path):
+            self.watcher.trigger()
+
+
+class DatasetWatcher:
+    """Watch a SharedDataset's source and rebuild it in the background when it changes.
+
+    Change notifications come from watchdog when it is installed and from a
+    polling thread otherwise. Bursts of events (a CSV being copied in several
+    writes) are debounced, and the rebuild runs on the watcher's own thread
+    through ``SharedDataset.refresh()``, which publishes the new snapshot and
+    its row indexes atomically. Sessions pick it up on their next rerun without
+    ever waiting on the load; a failed rebuild keeps the previous snapshot.
+    """
+
+    def __init__(self, dataset, poll_interval=5.0, debounce_seconds=2.0):
+        self.dataset = dataset
+        self.source = os.path.abspath(dataset.source)
+        self.poll_interval = poll_interval
+        self.debounce_seconds = debounce_seconds
+        self.last_error = None
+
+        self._fingerprint = source_fingerprint(self.source)
+        self._pending = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def is_source_path(self, path):
+        path = os.path.abspath(path)
+        if os.path.isdir(self.source):
+            return os.path.dirname(path) == self.source and path.lower().endswith('.csv')
+        return path == self.source
+
+    def start(self):
+        """Start watching; safe to call more than once"""
+        if self._thread is not None:
+            return self
+
+        if Observer is not None:
+            watch_dir = self.source if os.path.isdir(self.source) else os.path.dirname(self.source)
+            self._observer = Observer()
+            self._observer.schedule(_SourceEventHandler(self), watch_dir, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+
+        self._thread = threading.Thread(target=self._run, name='bdm-dataset-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._pending.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def trigger(self):
+        """Request a background rebuild, e.g. from an event handler or a refresh button"""
+        self._pending.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            # With watchdog we still wake up periodically as a safety net for missed events
+            timeout = self.poll_interval if self._observer is None else self.poll_interval * 12
+            triggered = self._pending.wait(timeout)
+            if self._stopped.is_set():
+                break
+
+            if triggered:
+                # Let the writer finish before reading the file
+                self._pending.clear()
+                while self._pending.wait(self.debounce_seconds) and not self._stopped.is_set():
+                    self._pending.clear()
+                self._rebuild(force=True)
+            else:
+                self._rebuild(force=False)
+
+    def _rebuild(self, force):
+        fingerprint = source_fingerprint(self.source)
+        if not force and fingerprint == self._fingerprint:
+            return
+
+        try:
+            snapshot = self.dataset.refresh()
+        except Exception as e:
+            self.last_error = e
+            logger.warning("Dataset rebuild failed, keeping previous snapshot: %s", e)
+            return
+
+        self._fingerprint = fingerprint
+        self.last_error = None
+        logger.info("Dataset refreshed to version %s (%s rows)", snapshot.version, len(snapshot))
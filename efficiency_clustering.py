@@ -0,0 +1,164 @@
+import hashlib
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+from model_cache import ModelCache, DEFAULT_CACHE_DIR, data_fingerprint, cache_key
+from shared_dataset import DEFAULT_SOURCE, iter_manufacturing_chunks
+
+EFFICIENCY_FEATURES = ['Manpower_Efficiency', 'Material_Efficiency', 'Machine_Efficiency', 'Overall_Efficiency']
+
+# From this many rows the engine segments with mini-batch k-means instead of full KMeans
+MINIBATCH_MIN_ROWS = 200000
+SEGMENT_PARAMS = {
+    'k_values': [2, 3, 4, 5, 6],   # candidate cluster counts, all fitted in the same pass
+    'batch_size': 4096,
+    'sample_rows': 20000,          # uniform sample kept for choosing k
+    'silhouette_rows': 5000,       # silhouette is O(n²), so it is scored on a subsample
+    'random_state': 42,
+}
+
+
+class EfficiencySegmentation:
+    """Mini-batch k-means over the efficiency features, streamed chunk by chunk.
+
+    Every candidate k is fitted in the same pass with ``partial_fit``, so the
+    data is read once and memory is bounded by the chunk size. Alongside, a
+    uniform sample of fixed size is kept (each row gets a random priority and
+    the lowest priorities survive); once the data is consumed ``select()``
+    scores each candidate on that sample by silhouette and keeps the best.
+    Rows with a missing or infinite feature are skipped and get no label.
+    """
+
+    def __init__(self, features=EFFICIENCY_FEATURES, params=SEGMENT_PARAMS):
+        self.features = list(features)
+        self.params = dict(params)
+        self.candidates = {k: MiniBatchKMeans(n_clusters=k, batch_size=params['batch_size'], n_init=3,
+                                              random_state=params['random_state'])
+                           for k in params['k_values']}
+        self.rng = np.random.default_rng(params['random_state'])
+        self.sample = None
+        self.pending = None
+        self.rows = 0
+        self.best_k = None
+        self.scores = None
+
+    @classmethod
+    def from_frame(cls, data, features=EFFICIENCY_FEATURES, params=SEGMENT_PARAMS, chunksize=100000):
+        segmentation = cls(features, params)
+        for start in range(0, len(data), chunksize):
+            segmentation.update(data.iloc[start:start + chunksize])
+        return segmentation.select()
+
+    def _complete(self, data):
+        values = data[self.features].astype(float)
+        return values[np.isfinite(values.to_numpy()).all(axis=1)]
+
+    def update(self, chunk):
+        """Fold a chunk of rows into every candidate model and the k-selection sample"""
+        X = self._complete(chunk)
+        if self.pending is not None:
+            X, self.pending = pd.concat([self.pending, X]), None
+        # The first partial_fit initialises the centroids and needs at least k rows
+        if self.rows == 0 and len(X) < max(self.candidates):
+            self.pending = X
+            return self
+
+        values = X.to_numpy()
+        batch_size = self.params['batch_size']
+        for model in self.candidates.values():
+            for start in range(0, len(values), batch_size):
+                model.partial_fit(values[start:start + batch_size])
+        self.rows += len(X)
+
+        sampled = X.assign(_priority=self.rng.random(len(X)))
+        if self.sample is not None:
+            sampled = pd.concat([self.sample, sampled])
+        self.sample = sampled.nsmallest(self.params['sample_rows'], '_priority')
+        return self
+
+    def select(self):
+        """Score every candidate k on the sample and keep the one with the best silhouette"""
+        if self.pending is not None and self.rows == 0:
+            raise ValueError(f"Need at least {max(self.candidates)} complete rows to segment efficiency")
+        sample = self.sample[self.features].to_numpy()
+        scores = []
+        for k, model in self.candidates.items():
+            labels = model.predict(sample)
+            silhouette = (silhouette_score(sample, labels, sample_size=min(len(sample), self.params['silhouette_rows']),
+                                           random_state=self.params['random_state'])
+                          if len(np.unique(labels)) > 1 else np.nan)
+            scores.append({'k': k, 'silhouette': silhouette, 'inertia': -model.score(sample)})
+        self.scores = pd.DataFrame(scores).set_index('k')
+        self.best_k = int(self.scores['silhouette'].idxmax())
+        return self
+
+    @property
+    def model(self):
+        return self.candidates[self.best_k]
+
+    def centroids(self):
+        """Cluster centres of the chosen model, one row per segment"""
+        return pd.DataFrame(self.model.cluster_centers_, columns=self.features).rename_axis('Segment')
+
+    def predict(self, data):
+        """Segment of every row from the stored centroids, NaN where a feature is missing"""
+        X = self._complete(data)
+        labels = pd.Series(np.nan, index=data.index, name='Efficiency_Segment')
+        if len(X):
+            labels.loc[X.index] = self.model.predict(X.to_numpy())
+        return labels
+
+
+def train_efficiency_segments(efficiency_data, params, n_jobs=1):
+    """Engine training job: mini-batch segmentation with k chosen by silhouette, threads capped at n_jobs"""
+    with threadpool_limits(limits=n_jobs):
+        segmentation = EfficiencySegmentation.from_frame(efficiency_data, list(efficiency_data.columns), params)
+    # The chosen model keeps the KMeans interface (predict, cluster_centers_) the engine already uses
+    return {'model': segmentation.model, 'segmentation': segmentation}
+
+
+def segment_source(source=DEFAULT_SOURCE, chunksize=100000, cache_dir=DEFAULT_CACHE_DIR):
+    """Segment a whole ledger source in one streaming pass and store the result in the model cache"""
+    segmentation = EfficiencySegmentation()
+    digest = hashlib.sha256()
+    for chunk in iter_manufacturing_chunks(source, chunksize=chunksize):
+        segmentation.update(chunk)
+        digest.update(data_fingerprint(chunk, EFFICIENCY_FEATURES).encode())
+    segmentation.select()
+    key = cache_key(digest.hexdigest(), EFFICIENCY_FEATURES, SEGMENT_PARAMS)
+    ModelCache(cache_dir).save('efficiency_segments', key, {'model': segmentation.model,
+                                                            'segmentation': segmentation})
+    return segmentation
+
+
+def label_source(input_path, output_path, chunksize=100000, cache_dir=DEFAULT_CACHE_DIR):
+    """Label ledger rows with the most recently cached segmentation, without refitting"""
+    artifact = ModelCache(cache_dir).latest('efficiency_segments')
+    if artifact is None:
+        raise FileNotFoundError(f"No cached efficiency segmentation in {cache_dir}; run efficiency_clustering.py first")
+    segmentation = artifact['segmentation']
+    rows = 0
+    for i, chunk in enumerate(iter_manufacturing_chunks(input_path, chunksize=chunksize)):
+        chunk['Efficiency_Segment'] = segmentation.predict(chunk)
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+
+if __name__ == "__main__":
+    # Go through the module so the cached segmentation refers to efficiency_clustering, not __main__
+    from efficiency_clustering import segment_source, label_source
+    if len(sys.argv) > 1 and sys.argv[1] == '--label':
+        rows = label_source(sys.argv[2], sys.argv[3])
+        print(f"Labelled {rows:,} rows -> {sys.argv[3]}")
+        sys.exit(0)
+    segmentation = segment_source(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE)
+    print(f"Segmented {segmentation.rows:,} rows; k={segmentation.best_k} chosen by silhouette")
+    print(segmentation.scores.round(3).to_string())
+    print("\nSegment centroids (%):")
+    print(segmentation.centroids().round(1).to_string())
@@ -0,0 +1,240 @@
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (parquet engine for pandas)
+except ImportError:
+    pyarrow = None
+
+from model_cache import data_fingerprint
+from shared_dataset import DEFAULT_SOURCE, clean_numeric_column, load_manufacturing_data
+
+# Persisted features live here; override with the BDM_FEATURE_STORE environment variable
+DEFAULT_STORE_DIR = os.environ.get('BDM_FEATURE_STORE', '.feature_store')
+
+TARGET_COST_COLUMNS = ['Target  Manpower', 'Target RawMaterial(Cost)',
+                       'Target Machinepower(Cost)', 'Target Overhead(Cost)or Profit']
+# Categorical ledger column -> stable integer code column
+ENCODED_FEATURES = {'Customer': 'Customer_Encoded', 'Part description': 'Product_Encoded', 'Thick': 'Thick_Encoded'}
+TIME_FEATURES = ['Month', 'Quarter', 'Day_of_Week']
+# The customer's history strictly before the order date
+LAG_FEATURES = ['Customer_Prior_Orders', 'Customer_Prior_Mean_Value', 'Customer_Prior_Mean_Margin',
+                'Days_Since_Customer_Order']
+FEATURE_COLUMNS = ['Qty', 'Rate', 'Total_Target_Cost'] + TIME_FEATURES + list(ENCODED_FEATURES.values()) + LAG_FEATURES
+# Ledger columns that define a feature version
+SOURCE_COLUMNS = list(ENCODED_FEATURES) + ['Date', 'Qty', 'Rate', 'Total_Target_Cost', 'Value', 'Profit_Margin']
+
+
+class StableLabelEncoder:
+    """Label encoder whose codes never change: new labels are appended after the known ones.
+
+    The first batch of labels is coded in sorted order, exactly as a fitted
+    LabelEncoder would code it; labels seen later are appended, sorted, after
+    the known ones. ``classes_`` is in code order, so it can stand in for a
+    fitted LabelEncoder wherever codes are looked up by position. Unknown
+    labels transform to -1.
+    """
+
+    def __init__(self, classes=()):
+        self.classes_ = np.array(list(classes), dtype=object)
+
+    def update(self, values):
+        known = pd.Index(self.classes_)
+        labels = pd.unique(pd.Series(values).dropna())
+        new = sorted((label for label in labels if label not in known), key=str)
+        if new:
+            self.classes_ = np.concatenate([self.classes_, np.array(new, dtype=object)])
+        return self
+
+    def transform(self, values):
+        return pd.Index(self.classes_).get_indexer(values)
+
+
+def order_features(orders):
+    """Model inputs derived from ledger rows or prospective orders, cleaned the same way as the ledger"""
+    features = pd.DataFrame(index=orders.index)
+    for col in ENCODED_FEATURES:
+        features[col] = orders[col] if col in orders.columns else np.nan
+    for col in ['Qty', 'Rate']:
+        features[col] = clean_numeric_column(orders[col])
+
+    if 'Total_Target_Cost' in orders.columns:
+        features['Total_Target_Cost'] = clean_numeric_column(orders['Total_Target_Cost'])
+    else:
+        features['Total_Target_Cost'] = sum(clean_numeric_column(orders[col]) for col in TARGET_COST_COLUMNS)
+
+    dates = pd.to_datetime(orders['Date'], errors='coerce', dayfirst=True)
+    features['Date'] = dates
+    features['Month'] = dates.dt.month
+    features['Quarter'] = dates.dt.quarter
+    features['Day_of_Week'] = dates.dt.dayofweek
+    return features
+
+
+def _lag_columns(orders, value, margin, last_date, dates):
+    """Lag features from prior totals; a customer's first order gets 0 orders, 0 means and -1 days"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'Customer_Prior_Orders': orders,
+            'Customer_Prior_Mean_Value': np.where(orders > 0, value / orders, 0.0),
+            'Customer_Prior_Mean_Margin': np.where(orders > 0, margin / orders, 0.0),
+            'Days_Since_Customer_Order': (dates - last_date).dt.days.fillna(-1),
+        }, index=orders.index)
+
+
+def customer_lags(data):
+    """Per-row customer history before the order date, from grouped cumulative sums over daily totals"""
+    daily = data.groupby(['Customer', 'Date']).agg(orders=('Value', 'size'), value=('Value', 'sum'),
+                                                   margin=('Profit_Margin', 'sum'))
+    prior = daily.groupby(level='Customer').cumsum() - daily
+    dates = daily.index.get_level_values('Date').to_series(index=daily.index)
+    last_date = dates.groupby(level='Customer').shift(1)
+    lags = _lag_columns(prior['orders'], prior['value'], prior['margin'], last_date, dates)
+    rows = pd.MultiIndex.from_arrays([data['Customer'], data['Date']])
+    lags = lags.reindex(rows).set_axis(data.index)
+    return lags.fillna({'Customer_Prior_Orders': 0, 'Customer_Prior_Mean_Value': 0.0,
+                        'Customer_Prior_Mean_Margin': 0.0, 'Days_Since_Customer_Order': -1})
+
+
+def customer_state(data):
+    """Each customer's totals over the whole history, the starting point for scoring new orders"""
+    return data.groupby('Customer').agg(orders=('Value', 'size'), value=('Value', 'sum'),
+                                        margin=('Profit_Margin', 'sum'), last_date=('Date', 'max'))
+
+
+class FeatureStore:
+    """Versioned model features with stable categorical encodings, stored in columnar files.
+
+    A version is the fingerprint of the ledger columns the features come from.
+    ``features(data)`` reads that version's feature file if it exists and
+    otherwise computes it once: Customer/Part/Thick codes, time features,
+    target-cost totals and lagged per-customer statistics. Encodings only ever
+    grow (``encodings.json``), so a label keeps its code in every version.
+    Scoring calls ``order_features(orders)``, which applies the same encoders
+    and takes the lag features from the customer totals of the latest version.
+    The models read a subset of these columns (``MODEL_FEATURES`` in the
+    engine). Files are parquet when pyarrow is installed and pickles
+    otherwise. With ``directory=None`` nothing is written.
+    """
+
+    def __init__(self, directory=DEFAULT_STORE_DIR):
+        self.directory = directory
+        self.encoders = {col: StableLabelEncoder() for col in ENCODED_FEATURES}
+        self.manifest = {}
+        self._history = None
+        if directory and os.path.exists(self._file('encodings.json')):
+            with open(self._file('encodings.json')) as f:
+                saved = json.load(f)
+            self.encoders = {col: StableLabelEncoder(saved.get(col, ())) for col in ENCODED_FEATURES}
+        if directory and os.path.exists(self._file('manifest.json')):
+            with open(self._file('manifest.json')) as f:
+                self.manifest = json.load(f)
+
+    def _file(self, name):
+        return os.path.join(self.directory, name)
+
+    def _table(self, kind, version):
+        return self._file(f"{kind}-{version}{'.parquet' if pyarrow is not None else '.pkl'}")
+
+    def _write_json(self, name, payload):
+        temp_path = f"{self._file(name)}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(payload, f, indent=1, default=str)
+        os.replace(temp_path, self._file(name))
+
+    def _write_table(self, frame, path):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        if pyarrow is not None:
+            frame.to_parquet(temp_path)
+        else:
+            frame.to_pickle(temp_path)
+        os.replace(temp_path, path)
+
+    def _read_table(self, path, columns=None):
+        if pyarrow is not None:
+            return pd.read_parquet(path, columns=columns)
+        frame = pd.read_pickle(path)
+        return frame if columns is None else frame[columns]
+
+    def version_of(self, data):
+        return data_fingerprint(data, [col for col in SOURCE_COLUMNS if col in data.columns])[:16]
+
+    @property
+    def latest_version(self):
+        if not self.manifest:
+            return None
+        return max(self.manifest, key=lambda version: self.manifest[version]['created'])
+
+    def encode(self, data):
+        """Stable integer codes for the categorical columns, learning labels not seen before"""
+        codes = pd.DataFrame(index=data.index)
+        for col, encoded_col in ENCODED_FEATURES.items():
+            values = data[col] if col in data.columns else pd.Series(np.nan, index=data.index)
+            codes[encoded_col] = self.encoders[col].update(values).transform(values)
+        return codes
+
+    def compute(self, data):
+        """Feature frame for prepared ledger rows, indexed like `data`"""
+        base = order_features(data)
+        features = pd.concat([base, self.encode(data), customer_lags(data)], axis=1)
+        return features[FEATURE_COLUMNS]
+
+    def features(self, data, columns=None):
+        """Stored features for this ledger version, computing and saving them on first use"""
+        version = self.version_of(data)
+        if self.directory and version in self.manifest:
+            stored = self._read_table(self._table('features', version), columns)
+            if len(stored) == len(data):
+                return stored.set_axis(data.index)
+
+        features = self.compute(data)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_table(features.reset_index(drop=True), self._table('features', version))
+            self._write_table(customer_state(data), self._table('customer_state', version))
+            self._write_json('encodings.json', {col: encoder.classes_.tolist()
+                                                for col, encoder in self.encoders.items()})
+            self.manifest[version] = {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'rows': len(features),
+                'encoding_sizes': {col: len(encoder.classes_) for col, encoder in self.encoders.items()},
+            }
+            self._write_json('manifest.json', self.manifest)
+        self._history = customer_state(data)
+        return features if columns is None else features[columns]
+
+    def history(self, version=None):
+        """Customer totals of a stored version (default: latest), or of the last frame computed in memory"""
+        version = version or self.latest_version
+        if self.directory and version is not None:
+            return self._read_table(self._table('customer_state', version))
+        if self._history is None:
+            raise ValueError("No ledger features computed yet; call features(data) first")
+        return self._history
+
+    def order_features(self, orders, version=None):
+        """Features for new orders: same encoders, lag features from the history of `version`"""
+        base = order_features(orders)
+        codes = pd.DataFrame({encoded_col: self.encoders[col].transform(base[col])
+                              for col, encoded_col in ENCODED_FEATURES.items()}, index=orders.index)
+        state = self.history(version).reindex(base['Customer'])
+        lags = _lag_columns(state['orders'].fillna(0).set_axis(orders.index),
+                            state['value'].set_axis(orders.index), state['margin'].set_axis(orders.index),
+                            state['last_date'].set_axis(orders.index), base['Date'])
+        return pd.concat([base, codes, lags], axis=1)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE
+    store = FeatureStore()
+    data = load_manufacturing_data(source)
+    features = store.features(data)
+    version = store.version_of(data)
+    print(f"Feature version {version}: {len(features):,} rows x {features.shape[1]} features in {store.directory}")
+    for col, size in store.manifest[version]['encoding_sizes'].items():
+        print(f"  {col:<18} {size:>6,} stable codes")
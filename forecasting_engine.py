@@ -0,0 +1,182 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from period_comparison import period_cube
+from shared_dataset import DEFAULT_SOURCE, load_manufacturing_data
+
+FORECAST_METHODS = ['linear', 'robust']
+# Periods per seasonal cycle; weekly series get trend only (52 weekly dummies would need years of history)
+SEASON_LENGTHS = {'W': 1, 'M': 12, 'Q': 4, 'Y': 1}
+# Series need this many periods since their first order to get a forecast
+MIN_PERIODS = 4
+# Robust fits are split into chunks of this many series across the process pool
+ROBUST_CHUNK_SERIES = 2000
+HUBER_THRESHOLD = 1.345
+
+
+def design_matrix(periods, season_length=0):
+    """Intercept, linear trend and, for season_length 4 or 12, one dummy per quarter/month except the first"""
+    columns = [np.ones(len(periods)), np.arange(len(periods), dtype=float)]
+    if season_length > 1:
+        season = np.asarray(periods.month - 1 if season_length == 12 else periods.quarter - 1)
+        columns += [(season == s).astype(float) for s in range(1, season_length)]
+    return np.column_stack(columns)
+
+
+def _huber_fit(X, Y, iterations=20):
+    """Huber regression of every row of Y on X by reweighted least squares; returns coefficients and final weights"""
+    coef = np.linalg.lstsq(X, Y.T, rcond=None)[0].T
+    weights = np.ones_like(Y)
+    for _ in range(iterations):
+        residuals = Y - coef @ X.T
+        scale = 1.4826 * np.median(np.abs(residuals), axis=1, keepdims=True)
+        scale = np.where(scale > 0, scale, 1.0)
+        u = np.abs(residuals) / (HUBER_THRESHOLD * scale)
+        weights = np.where(u <= 1, 1.0, 1.0 / np.maximum(u, 1e-12))
+        # Solve (X' W X) b = X' W y for all series at once
+        lhs = np.einsum('tp,nt,tq->npq', X, weights, X)
+        rhs = np.einsum('tp,nt,nt->np', X, weights, Y)
+        coef = np.linalg.solve(lhs + 1e-9 * np.eye(X.shape[1]), rhs[..., None])[..., 0]
+    return coef, weights
+
+
+def _fit_group(Y, X, future_X, method, level):
+    """Forecasts and prediction intervals for series sharing one design matrix"""
+    n_obs, n_params = X.shape
+    dof = n_obs - n_params
+    if method == 'robust':
+        # Leverage from X' W X with the final IRLS weights rather than the unweighted X' X
+        coef, weights = _huber_fit(X, Y)
+        covariance = np.linalg.pinv(np.einsum('tp,nt,tq->npq', X, weights, X))
+        leverage = np.einsum('hp,npq,hq->nh', future_X, covariance, future_X)
+    else:
+        coef = np.linalg.lstsq(X, Y.T, rcond=None)[0].T
+        weights = np.ones_like(Y)
+        leverage = np.einsum('hp,pq,hq->h', future_X, np.linalg.pinv(X.T @ X), future_X)[None, :]
+    residuals = Y - coef @ X.T
+    # Huber's residual scale: root mean squared clipped residual over the share left unclipped
+    # (the usual residual standard error when every weight is one)
+    inliers = (weights >= 1).mean(axis=1)
+    if dof > 0:
+        scale = np.sqrt(((weights * residuals) ** 2).sum(axis=1) / dof) / inliers
+    else:
+        scale = np.full(len(Y), np.nan)
+
+    forecast = coef @ future_X.T
+    # Parameter uncertainty (leverage) grows with the distance of each future period from the fitted data
+    quantile = stats.t.ppf(0.5 + level / 2, max(dof, 1))
+    margin = quantile * scale[:, None] * np.sqrt(1 + leverage)
+    return forecast, forecast - margin, forecast + margin, coef[:, 1]
+
+
+def _fit_chunks(Y, X, future_X, method, level, n_jobs):
+    """Split the heavier robust fits across a process pool; linear fits run in one batch"""
+    chunks = [slice(start, start + ROBUST_CHUNK_SERIES) for start in range(0, len(Y), ROBUST_CHUNK_SERIES)]
+    if method != 'robust' or n_jobs == 1 or len(chunks) == 1:
+        return _fit_group(Y, X, future_X, method, level)
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as pool:
+        futures = [pool.submit(_fit_group, Y[chunk], X, future_X, method, level) for chunk in chunks]
+        parts = [future.result() for future in futures]
+    return tuple(np.concatenate([part[i] for part in parts]) for i in range(4))
+
+
+class SeriesForecasts:
+    """Forecasts with prediction intervals for every series of one dimension.
+
+    ``history`` is the (series x periods) matrix of actuals; ``forecast``,
+    ``lower`` and ``upper`` are (series x future periods). Series with too
+    little history have NaN forecasts.
+    """
+
+    def __init__(self, history, forecast, lower, upper, trend, seasonal, method, level):
+        self.history = history
+        self.forecast = forecast
+        self.lower = lower
+        self.upper = upper
+        self.trend = trend
+        self.seasonal = seasonal
+        self.method = method
+        self.level = level
+
+    def series(self, name):
+        """Actuals followed by the forecast and interval of one series, indexed by period"""
+        actual = self.history.loc[name].rename('Actual')
+        future = pd.DataFrame({'Forecast': self.forecast.loc[name], 'Lower': self.lower.loc[name],
+                               'Upper': self.upper.loc[name]})
+        return pd.concat([actual.to_frame(), future]).rename_axis('Period')
+
+    def summary(self):
+        """One row per series: horizon total, next-period forecast with interval, and trend per period"""
+        first = self.forecast.columns[0]
+        return pd.DataFrame({
+            'Last_Actual': self.history.iloc[:, -1],
+            'Next_Forecast': self.forecast[first],
+            'Next_Lower': self.lower[first],
+            'Next_Upper': self.upper[first],
+            'Horizon_Total': self.forecast.sum(axis=1, min_count=1),
+            'Trend_Per_Period': self.trend,
+        })
+
+
+def forecast_series(data, key=None, freq='M', measure='Revenue', horizon=3, level=0.95, method='linear',
+                    n_jobs=None):
+    """Trend-plus-seasonality forecasts for every series of a dimension, fitted in batches.
+
+    ``freq`` is 'W', 'M', 'Q' or 'Y'. Each series is modelled from its first
+    active period onwards, so series that share a start period share one
+    design matrix and are solved together as a single least-squares problem (or a batched Huber regression for
+    ``method='robust'``, spread over a process pool). Seasonal dummies are
+    added once a series spans two full years (eight quarters). Intervals are
+    ``level`` prediction intervals; forecasts of totals are clipped at zero.
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecast method: {method}")
+    history = period_cube(data, key, freq)[measure]
+    periods = history.columns
+    future = pd.period_range(periods[-1] + 1, periods=horizon, freq=freq, name='Period') if len(periods) else periods
+    shape = (len(history), horizon)
+    forecast, lower, upper = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    trend, seasonal = np.full(len(history), np.nan), np.zeros(len(history), dtype=bool)
+
+    values = history.to_numpy(dtype=float)
+    active = np.nan_to_num(values) != 0
+    starts = np.where(active.any(axis=1), active.argmax(axis=1), len(periods))
+    season_length = SEASON_LENGTHS[freq]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    for start in np.unique(starts):
+        window = periods[start:]
+        if len(window) < MIN_PERIODS:
+            continue
+        rows = np.flatnonzero(starts == start)
+        use_seasons = season_length > 1 and len(window) >= 2 * season_length
+        X = design_matrix(window, season_length if use_seasons else 0)
+        # Future rows continue the trend index and seasons of this window
+        future_X = design_matrix(window.append(future), season_length if use_seasons else 0)[len(window):]
+        Y = np.nan_to_num(values[rows, start:])
+        group = _fit_chunks(Y, X, future_X, method, level, n_jobs)
+        forecast[rows], lower[rows], upper[rows], trend[rows] = group
+        seasonal[rows] = use_seasons
+
+    if measure in ('Revenue', 'Qty', 'Orders'):
+        forecast, lower, upper = (np.clip(matrix, 0, None) for matrix in (forecast, lower, upper))
+    forecast, lower, upper = (pd.DataFrame(matrix, index=history.index, columns=future)
+                              for matrix in (forecast, lower, upper))
+    return SeriesForecasts(history, forecast, lower, upper,
+                           pd.Series(trend, index=history.index), pd.Series(seasonal, index=history.index),
+                           method, level)
+
+
+if __name__ == "__main__":
+    key = sys.argv[1] if len(sys.argv) > 1 else 'Customer'
+    freq = sys.argv[2] if len(sys.argv) > 2 else 'M'
+    method = sys.argv[3] if len(sys.argv) > 3 else 'linear'
+    data = load_manufacturing_data(DEFAULT_SOURCE)
+    forecasts = forecast_series(data, key, freq, method=method)
+    summary = forecasts.summary().sort_values('Horizon_Total', ascending=False)
+    print(f"{method} forecasts for {len(summary):,} {key} series, next {len(forecasts.forecast.columns)} periods ({freq}):")
+    print(summary.head(20).round(0).to_string())
@@ -0,0 +1,136 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+class GroupStatistics:
+    """Per-group moments of one measure, and the significance tests derived from them.
+
+    A single groupby pass collects each group's count, mean, variance and rank
+    sum (ranks are computed once over the whole column). One-way ANOVA, Welch's
+    ANOVA, Kruskal-Wallis and pairwise Welch t-tests all work from that table,
+    so adding a test or a comparison never rescans the ledger.
+    """
+
+    def __init__(self, data, value_col, group_col):
+        values = data[value_col].to_numpy(dtype=float)
+        finite = np.isfinite(values)
+        frame = pd.DataFrame({
+            'group': data[group_col].to_numpy()[finite],
+            'value': values[finite],
+            'rank': stats.rankdata(values[finite]),
+        })
+        self.value_col = value_col
+        self.group_col = group_col
+        self.total_count = len(frame)
+        self.table = frame.groupby('group', sort=True).agg(
+            count=('value', 'size'), mean=('value', 'mean'), var=('value', 'var'), rank_sum=('rank', 'sum'))
+        self.table.index.name = group_col
+        # Single-observation groups have no spread of their own
+        self.table['var'] = self.table['var'].fillna(0.0)
+
+        # Kruskal-Wallis tie correction, from the sizes of tied runs in the full column
+        _, tie_counts = np.unique(frame['value'].to_numpy(), return_counts=True)
+        n = self.total_count
+        self._tie_correction = 1 - (tie_counts ** 3 - tie_counts).sum() / (n ** 3 - n) if n > 1 else 1.0
+
+    def __len__(self):
+        return len(self.table)
+
+    def _arrays(self):
+        table = self.table
+        return (table['count'].to_numpy(dtype=float), table['mean'].to_numpy(dtype=float),
+                table['var'].to_numpy(dtype=float))
+
+    def anova(self):
+        """Classic one-way ANOVA (equal variances), same result as scipy.stats.f_oneway"""
+        counts, means, variances = self._arrays()
+        groups, n = len(counts), counts.sum()
+        grand_mean = (counts * means).sum() / n
+        between = (counts * (means - grand_mean) ** 2).sum()
+        within = ((counts - 1) * variances).sum()
+        df_between, df_within = groups - 1, n - groups
+        with np.errstate(divide='ignore', invalid='ignore'):
+            statistic = (between / df_between) / (within / df_within)
+        return _result('anova', statistic, stats.f.sf(statistic, df_between, df_within), (df_between, df_within))
+
+    def welch(self):
+        """Welch's ANOVA, robust to groups with unequal variances"""
+        counts, means, variances = self._arrays()
+        keep = (counts > 1) & (variances > 0)
+        counts, means, variances = counts[keep], means[keep], variances[keep]
+        groups = len(counts)
+        weights = counts / variances
+        weighted_mean = (weights * means).sum() / weights.sum()
+        between = (weights * (means - weighted_mean) ** 2).sum() / (groups - 1)
+        lam = (((1 - weights / weights.sum()) ** 2) / (counts - 1)).sum()
+        statistic = between / (1 + 2 * (groups - 2) * lam / (groups ** 2 - 1))
+        df_within = (groups ** 2 - 1) / (3 * lam)
+        return _result('welch', statistic, stats.f.sf(statistic, groups - 1, df_within), (groups - 1, df_within))
+
+    def kruskal(self):
+        """Kruskal-Wallis H test on ranks, same result as scipy.stats.kruskal"""
+        counts = self.table['count'].to_numpy(dtype=float)
+        rank_sums = self.table['rank_sum'].to_numpy(dtype=float)
+        n = self.total_count
+        statistic = 12 / (n * (n + 1)) * (rank_sums ** 2 / counts).sum() - 3 * (n + 1)
+        statistic = statistic / self._tie_correction
+        df = len(counts) - 1
+        return _result('kruskal', statistic, stats.chi2.sf(statistic, df), df)
+
+    def pairwise(self, adjust='holm'):
+        """Welch t-tests for every pair of groups, with Holm or Bonferroni adjusted p-values"""
+        counts, means, variances = self._arrays()
+        labels = self.table.index.to_numpy()
+        pairs = np.array(list(combinations(range(len(labels)), 2)), dtype=np.intp).reshape(-1, 2)
+        a, b = pairs[:, 0], pairs[:, 1]
+
+        standard_error = variances[a] / counts[a] + variances[b] / counts[b]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            statistic = (means[a] - means[b]) / np.sqrt(standard_error)
+            df = standard_error ** 2 / ((variances[a] / counts[a]) ** 2 / (counts[a] - 1)
+                                        + (variances[b] / counts[b]) ** 2 / (counts[b] - 1))
+        p_values = 2 * stats.t.sf(np.abs(statistic), df)
+
+        return pd.DataFrame({
+            'group_a': labels[a], 'group_b': labels[b],
+            'mean_diff': means[a] - means[b], 'statistic': statistic, 'df': df,
+            'p_value': p_values, 'p_adjusted': _adjust_p_values(p_values, adjust),
+        })
+
+    def summary(self, alpha=0.05):
+        """All three omnibus tests plus the number of significantly different pairs"""
+        pairs = self.pairwise()
+        return {
+            'anova': self.anova(),
+            'welch': self.welch(),
+            'kruskal': self.kruskal(),
+            'significant_pairs': int((pairs['p_adjusted'] < alpha).sum()),
+            'total_pairs': len(pairs),
+        }
+
+
+def _result(test, statistic, p_value, df):
+    df = tuple(float(value) for value in df) if isinstance(df, tuple) else float(df)
+    return {'test': test, 'statistic': float(statistic), 'p_value': float(p_value), 'df': df}
+
+
+def _adjust_p_values(p_values, method='holm'):
+    """Family-wise error adjustment of an array of p-values (NaNs pass through)"""
+    p_values = np.asarray(p_values, dtype=float)
+    valid = ~np.isnan(p_values)
+    m = valid.sum()
+    adjusted = np.full(p_values.shape, np.nan)
+    if method == 'bonferroni':
+        adjusted[valid] = np.minimum(p_values[valid] * m, 1.0)
+    elif method == 'holm':
+        order = np.argsort(p_values[valid])
+        stepped = np.maximum.accumulate(p_values[valid][order] * (m - np.arange(m)))
+        values = np.empty(m)
+        values[order] = np.minimum(stepped, 1.0)
+        adjusted[valid] = values
+    else:
+        raise ValueError(f"Unknown p-value adjustment: {method}")
+    return adjusted
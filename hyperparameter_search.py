@@ -0,0 +1,148 @@
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import ParameterSampler
+
+from advanced_analytics_engine import AdvancedBDMAnalytics, MODEL_VARIANTS, EVALUATION_COLUMNS
+from model_cache import ModelCache, DEFAULT_CACHE_DIR, data_fingerprint, cache_key
+from model_evaluation import VARIANTS, evaluate_fold, evaluation_rows
+from model_training import TrainingJob, train_concurrently
+
+# Model name -> target column
+SEARCH_TARGETS = {'revenue': 'Value', 'profit_margin': 'Profit_Margin'}
+
+SEARCH_SPACES = {
+    'random_forest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [None, 8, 16, 32],
+        'min_samples_leaf': [1, 2, 5, 10],
+        'max_features': [1.0, 0.5, 'sqrt'],
+    },
+    'gradient_boosting': {
+        'n_estimators': [100, 200, 400],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'max_depth': [2, 3, 5],
+        'min_samples_leaf': [1, 5, 20],
+        'subsample': [1.0, 0.8],
+    },
+    'histogram': {
+        'max_iter': [100, 200, 400],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'max_leaf_nodes': [15, 31, 63],
+        'min_samples_leaf': [10, 20, 50],
+        'l2_regularization': [0.0, 0.1, 1.0],
+    },
+}
+SEARCH_PARAMS = {
+    'n_candidates': 27,
+    'eta': 3,                  # keep the best 1/eta candidates per rung and give them eta times the rows
+    'min_rows': 500,
+    'validation_fraction': 0.2,
+    'random_state': 42,
+}
+
+
+def successive_halving(data, name, variant, params=SEARCH_PARAMS, time_budget=600, n_jobs=None, store=None):
+    """Budgeted search for one model: successive halving over nested row subsamples.
+
+    Candidates are sampled from the variant's search space. The most recent
+    ``validation_fraction`` of orders (by date) is the validation set; every
+    rung trains the surviving candidates in parallel on a random subsample of
+    the older rows, scores them by validation R² and keeps the top 1/eta for
+    the next rung, which gets eta times as many rows. The last rung uses all
+    training rows. A rung is only started when the previous rung's duration
+    still fits in ``time_budget`` seconds; otherwise the best candidate so far
+    wins. Returns the winning hyperparameters and the per-rung history.
+    """
+    target = SEARCH_TARGETS[name]
+    defaults = VARIANTS[variant][1]
+    rows = evaluation_rows(data, target, store)
+    split = int(len(rows) * (1 - params['validation_fraction']))
+    train, valid = rows.iloc[:split], rows.iloc[split:]
+    # Nested subsamples: every rung's rows are a prefix of one random permutation
+    train = train.sample(frac=1.0, random_state=params['random_state'])
+
+    eta = params['eta']
+    sampled = ParameterSampler(SEARCH_SPACES[variant], n_iter=params['n_candidates'],
+                               random_state=params['random_state'])
+    candidates = [dict(defaults)] + [dict(defaults, **candidate) for candidate in sampled]
+    # Enough rungs to narrow the field to one, but never a first rung below min_rows
+    rungs = min(int(np.ceil(np.log(len(candidates)) / np.log(eta))) + 1,
+                int(np.log(max(len(train) / params['min_rows'], 1)) / np.log(eta)) + 1)
+    rung_rows = [max(params['min_rows'], len(train) // eta ** (rungs - 1 - rung)) for rung in range(rungs)]
+
+    start = time.perf_counter()
+    history, last_rung_seconds = [], 0.0
+    for rung, n_rows in enumerate(rung_rows):
+        elapsed = time.perf_counter() - start
+        if rung and elapsed + last_rung_seconds > time_budget:
+            print(f"Time budget of {time_budget}s reached after rung {rung}; stopping early")
+            break
+        subsample = train.iloc[:min(n_rows, len(train))]
+        jobs = [TrainingJob(i, evaluate_fold, (variant, candidate, target, subsample, valid), parallel=True)
+                for i, candidate in enumerate(candidates)]
+        rung_start = time.perf_counter()
+        results, _ = train_concurrently(jobs, n_jobs=n_jobs)
+        last_rung_seconds = time.perf_counter() - rung_start
+
+        scores = [results[i]['artifact']['r2'] for i in range(len(candidates))]
+        for candidate, result in zip(candidates, (results[i]['artifact'] for i in range(len(candidates)))):
+            history.append({'rung': rung + 1, 'rows': len(subsample), **result, 'params': candidate})
+        print(f"Rung {rung + 1}: {len(candidates)} candidate(s) on {len(subsample):,} rows in "
+              f"{last_rung_seconds:.1f}s, best R²={max(scores):.3f}")
+
+        order = np.argsort(scores)[::-1]
+        best = candidates[order[0]]
+        if len(candidates) == 1 or len(subsample) == len(train):
+            break
+        candidates = [candidates[i] for i in order[:max(1, len(candidates) // eta)]]
+
+    return best, pd.DataFrame(history)
+
+
+def search_model(data, name, backend='classic', params=SEARCH_PARAMS, time_budget=600, n_jobs=None,
+                 cache_dir=DEFAULT_CACHE_DIR, store=None):
+    """Run the search for one model and save the winner where build_predictive_models picks it up.
+
+    The result records the fingerprint of the ledger it was tuned on; the
+    engine only applies it to that same data.
+    """
+    variant = MODEL_VARIANTS[backend][name]
+    best, history = successive_halving(data, name, variant, params, time_budget, n_jobs, store)
+    final = history[history['rung'] == history['rung'].max()]
+    fingerprint = data_fingerprint(data, EVALUATION_COLUMNS)
+    result = {
+        'data': fingerprint,
+        'variant': variant,
+        'params': best,
+        'validation_r2': final['r2'].max(),
+        'history': history,
+        'searched_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    if cache_dir:
+        key = cache_key(fingerprint, [variant], {'space': SEARCH_SPACES[variant], 'search': params})
+        ModelCache(cache_dir).save(f'tuned_{name}_{variant}', key, result)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search for the predictive models")
+    parser.add_argument('models', nargs='*', help=f"any of {', '.join(SEARCH_TARGETS)} (default: both)")
+    parser.add_argument('--backend', choices=list(MODEL_VARIANTS), default='classic')
+    parser.add_argument('--budget', type=float, default=600, help="time budget per model in seconds")
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args()
+    unknown = [name for name in args.models if name not in SEARCH_TARGETS]
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(unknown)}")
+
+    analytics = AdvancedBDMAnalytics(model_cache_dir=None)
+    analytics.load_and_prepare_data()
+    for name in args.models or list(SEARCH_TARGETS):
+        print(f"\nSearching {MODEL_VARIANTS[args.backend][name]} hyperparameters for {name}")
+        result = search_model(analytics.data, name, args.backend, time_budget=args.budget, n_jobs=args.n_jobs,
+                              store=analytics.feature_store)
+        print(f"Best validation R²={result['validation_r2']:.3f} with {result['params']}")
@@ -0,0 +1,115 @@
+import glob
+import hashlib
+import json
+import os
+import sys
+
+import joblib
+import pandas as pd
+import sklearn
+
+# Trained models live here; override with the BDM_MODEL_CACHE environment variable
+DEFAULT_CACHE_DIR = os.environ.get('BDM_MODEL_CACHE', '.model_cache')
+# Models the analytics engine trains; tuned parameters, segmentations and online state share the
+# directory but are only removed by name or by invalidate_all()
+ENGINE_MODELS = ['revenue', 'profit_margin', 'efficiency_clustering']
+
+
+def data_fingerprint(data, columns=None):
+    """Content hash of the training rows (values and column names, independent of the index)"""
+    frame = data if columns is None else data[list(columns)]
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in frame.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(fingerprint, features, params):
+    """Key for one trained artifact: training data, feature list, hyperparameters and scikit-learn version"""
+    # Pickled estimators are only guaranteed to load in the scikit-learn version that wrote them
+    payload = json.dumps({'data': fingerprint, 'features': list(features), 'params': params,
+                          'sklearn': sklearn.__version__}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+class ModelCache:
+    """On-disk store of trained models with their scalers, encoders and metrics.
+
+    Each artifact is a joblib file named ``<model name>-<key>.joblib``. The key
+    covers the training-data fingerprint, the feature list, the
+    hyperparameters and the scikit-learn version, so a change to any of them
+    simply misses the cache.
+    Writes go through a temporary file and an atomic rename. ``invalidate()``
+    deletes the engine's models (or one named entry type) explicitly, for
+    example after changing the training code; ``invalidate_all()`` empties
+    the cache.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, name, key):
+        return os.path.join(self.directory, f"{name}-{key}.joblib")
+
+    def load(self, name, key):
+        """Return the cached artifact, or None when missing or unreadable"""
+        path = self._path(name, key)
+        if not os.path.exists(path):
+            return None
+        return self.load_path(path)
+
+    def save(self, name, key, artifact):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name, key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(artifact, temp_path)
+        os.replace(temp_path, path)
+        return path
+
+    def latest(self, name, where=None):
+        """Most recently written artifact for a model name (the newest one where(artifact) accepts), or None"""
+        for path in sorted(self.entries(name), key=os.path.getmtime, reverse=True):
+            artifact = self.load_path(path)
+            if artifact is not None and (where is None or where(artifact)):
+                return artifact
+        return None
+
+    def load_path(self, path):
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            print(f"Ignoring unreadable model cache entry {path}: {e}")
+            return None
+
+    def entries(self, name=None):
+        """Cached files, optionally for one model name"""
+        pattern = f"{name}-*.joblib" if name else "*.joblib"
+        return sorted(glob.glob(os.path.join(self.directory, pattern)))
+
+    def invalidate(self, name=None):
+        """Delete cached artifacts for one model (or the engine's models); returns the number removed"""
+        paths = self.entries(name) if name else [path for model in ENGINE_MODELS for path in self.entries(model)]
+        for path in paths:
+            os.remove(path)
+        return len(paths)
+
+    def invalidate_all(self):
+        """Delete every cached artifact, tuned parameters and online state included"""
+        paths = self.entries()
+        for path in paths:
+            os.remove(path)
+        return len(paths)
+
+
+if __name__ == "__main__":
+    cache = ModelCache()
+    if len(sys.argv) > 1 and sys.argv[1] == '--clear':
+        name = sys.argv[2] if len(sys.argv) > 2 else None
+        removed = cache.invalidate_all() if name == '--all' else cache.invalidate(name)
+        print(f"Removed {removed} cached model(s) from {cache.directory}")
+    else:
+        entries = cache.entries()
+        print(f"{len(entries)} cached model(s) in {cache.directory}:")
+        for path in entries:
+            size = os.path.getsize(path) / 1024
+            print(f"  {os.path.basename(path):<50} {size:10,.1f} KB")
@@ -0,0 +1,162 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from advanced_analytics_engine import (AdvancedBDMAnalytics, MODEL_PARAMS, MODEL_FEATURES, HISTOGRAM_PARAMS,
+                                       EVALUATION_COLUMNS, fit_categories, histogram_features, estimator_params)
+from batch_scoring import ENCODED_COLUMNS
+from feature_store import FeatureStore
+from model_cache import ModelCache, DEFAULT_CACHE_DIR, data_fingerprint, cache_key
+from model_training import TrainingJob, train_concurrently
+
+# Model variant -> (feature set, default hyperparameters)
+VARIANTS = {
+    'random_forest': ('classic', MODEL_PARAMS['revenue']),
+    'gradient_boosting': ('classic', MODEL_PARAMS['profit_margin']),
+    'histogram': ('histogram', HISTOGRAM_PARAMS),
+}
+TARGETS = ['Value', 'Profit_Margin']
+
+
+def evaluation_rows(data, target, store=None):
+    """Date-sorted rows with a known target, carrying the feature-store codes the engine trains on"""
+    store = store if store is not None else FeatureStore()
+    codes = store.features(data, list(ENCODED_COLUMNS.values()))
+    rows = data[EVALUATION_COLUMNS].join(codes).dropna(subset=['Date', target])
+    return rows.sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def rolling_origin_folds(dates, n_folds=5, min_train_fraction=0.5):
+    """Expanding-window folds over date-sorted rows: each fold tests on the block after its training rows.
+
+    The last ``1 - min_train_fraction`` of the rows is cut into ``n_folds``
+    consecutive test blocks; fold i trains on every row dated before block i.
+    Cut points are moved to the first row of their date so no day is split
+    between training and test. ``dates`` must be sorted; returns
+    ``[(train_end, test_end)]`` row positions.
+    """
+    dates = np.asarray(dates)
+    n = len(dates)
+    start = int(n * min_train_fraction)
+    cuts = [start + (n - start) * i // n_folds for i in range(n_folds)] + [n]
+    cuts = [int(np.searchsorted(dates, dates[cut], side='left')) if cut < n else n for cut in cuts]
+    return [(train_end, test_end) for train_end, test_end in zip(cuts[:-1], cuts[1:])
+            if train_end > 0 and test_end > train_end]
+
+
+def make_estimator(variant, params, n_jobs=1):
+    if variant == 'random_forest':
+        return RandomForestRegressor(n_jobs=n_jobs, **estimator_params(params))
+    if variant == 'gradient_boosting':
+        return GradientBoostingRegressor(**estimator_params(params))
+    if variant == 'histogram':
+        return HistGradientBoostingRegressor(categorical_features='from_dtype', **estimator_params(params))
+    raise ValueError(f"Unknown model variant: {variant}")
+
+
+def fold_features(variant, train, test):
+    """Model inputs for one fold, with the scaler or category lists fitted on its training rows only"""
+    if VARIANTS[variant][0] == 'histogram':
+        categories = fit_categories(train)
+        return histogram_features(train, categories), histogram_features(test, categories)
+
+    # Customer/Part codes are the stable feature-store codes of evaluation_rows, as in production training
+    scaler = StandardScaler().fit(train[MODEL_FEATURES])
+    return scaler.transform(train[MODEL_FEATURES]), scaler.transform(test[MODEL_FEATURES])
+
+
+def evaluate_fold(variant, params, target, train, test, n_jobs=1):
+    """Fit one variant on a fold's training rows and score it on the following block"""
+    X_train, X_test = fold_features(variant, train, test)
+    model = make_estimator(variant, params, n_jobs)
+    start = time.perf_counter()
+    with threadpool_limits(limits=n_jobs):
+        model.fit(X_train, train[target])
+        y_pred = model.predict(X_test)
+    return {
+        'r2': r2_score(test[target], y_pred),
+        'mae': mean_absolute_error(test[target], y_pred),
+        'rmse': np.sqrt(mean_squared_error(test[target], y_pred)),
+        'fit_seconds': time.perf_counter() - start,
+    }
+
+
+def evaluate_model(data, variant='random_forest', target='Value', params=None, n_folds=5,
+                   min_train_fraction=0.5, n_jobs=None, cache_dir=DEFAULT_CACHE_DIR, store=None):
+    """Rolling-origin cross-validation of one model variant, folds run in parallel.
+
+    Returns one row per fold with the training/test date ranges, R², MAE,
+    RMSE and fit time. Fold results are cached by the fold's rows, the variant
+    and its hyperparameters, so re-running a comparison only fits what changed.
+    """
+    params = dict(params or VARIANTS[variant][1])
+    rows = evaluation_rows(data, target, store)
+    folds = rolling_origin_folds(rows['Date'].to_numpy(), n_folds, min_train_fraction)
+    cache = ModelCache(cache_dir) if cache_dir else None
+    name = f"cv_{variant}_{target.lower()}"
+
+    results, keys, jobs = {}, {}, []
+    for i, (train_end, test_end) in enumerate(folds):
+        train, test = rows.iloc[:train_end], rows.iloc[train_end:test_end]
+        keys[i] = cache_key(data_fingerprint(rows.iloc[:test_end]), [variant, target, train_end], params)
+        cached = cache.load(name, keys[i]) if cache is not None else None
+        if cached is not None:
+            results[i] = dict(cached, from_cache=True)
+        else:
+            jobs.append(TrainingJob(i, evaluate_fold, (variant, params, target, train, test), parallel=True))
+
+    if jobs:
+        trained, _ = train_concurrently(jobs, n_jobs=n_jobs)
+        for i, result in trained.items():
+            if cache is not None:
+                cache.save(name, keys[i], result['artifact'])
+            results[i] = dict(result['artifact'], from_cache=False)
+
+    report = []
+    for i, (train_end, test_end) in enumerate(folds):
+        report.append({'fold': i + 1, 'train_rows': train_end, 'test_rows': test_end - train_end,
+                       'train_until': rows['Date'].iloc[train_end - 1].date(),
+                       'test_from': rows['Date'].iloc[train_end].date(),
+                       'test_until': rows['Date'].iloc[test_end - 1].date(), **results[i]})
+    return pd.DataFrame(report).set_index('fold')
+
+
+def compare_variants(data, variants=None, target='Value', n_folds=5, n_jobs=None, cache_dir=DEFAULT_CACHE_DIR,
+                     store=None):
+    """Mean and spread of the fold scores of several variants on the same folds"""
+    variants = variants or list(VARIANTS)
+    folds = {variant: evaluate_model(data, variant, target, n_folds=n_folds, n_jobs=n_jobs, cache_dir=cache_dir,
+                                     store=store)
+             for variant in variants}
+    summary = pd.DataFrame({variant: {'r2_mean': result['r2'].mean(), 'r2_std': result['r2'].std(),
+                                      'mae_mean': result['mae'].mean(), 'fit_seconds': result['fit_seconds'].sum()}
+                            for variant, result in folds.items()}).T
+    return summary, folds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling-origin cross-validation of the predictive models")
+    parser.add_argument('variants', nargs='*', help=f"any of {', '.join(VARIANTS)} (default: all)")
+    parser.add_argument('--target', choices=TARGETS, default='Value')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args()
+    unknown = [variant for variant in args.variants if variant not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variant(s): {', '.join(unknown)}")
+
+    analytics = AdvancedBDMAnalytics(model_cache_dir=None)
+    analytics.load_and_prepare_data()
+    summary, folds = compare_variants(analytics.data, args.variants or None, args.target, args.folds, args.n_jobs,
+                                      store=analytics.feature_store)
+    for variant, result in folds.items():
+        print(f"\n{variant} -> {args.target}")
+        print(result.round(3).to_string())
+    print(f"\nSummary ({args.folds} rolling-origin folds, {args.target}):")
+    print(summary.round(3).to_string())
@@ -0,0 +1,62 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class TrainingJob:
+    """One independent model fit: a picklable module-level function and its arguments.
+
+    ``parallel`` marks fits that accept an ``n_jobs`` keyword (RandomForest,
+    for example); they are handed the cores not taken by the serial fits.
+    """
+
+    def __init__(self, name, train, args=(), kwargs=None, parallel=False):
+        self.name = name
+        self.train = train
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.parallel = parallel
+
+
+def _run_timed(train, args, kwargs):
+    start = time.perf_counter()
+    artifact = train(*args, **kwargs)
+    return artifact, time.perf_counter() - start, os.getpid()
+
+
+def allocate_cores(jobs, cores):
+    """Cores for each job: one per serial fit, the remainder shared by the fits that can use more"""
+    parallel = [job for job in jobs if job.parallel]
+    spare = max(cores - (len(jobs) - len(parallel)), len(parallel))
+    share = max(1, spare // len(parallel)) if parallel else 1
+    return {job.name: share if job.parallel else 1 for job in jobs}
+
+
+def train_concurrently(jobs, n_jobs=None):
+    """Run independent fits at the same time in a process pool.
+
+    Returns ``{name: {'artifact', 'seconds', 'cores'}}`` plus the overall
+    wall time. With one core (or one job) the fits run in this process,
+    which avoids pickling the training data for no gain.
+    """
+    cores = n_jobs or os.cpu_count() or 1
+    allocation = allocate_cores(jobs, cores)
+    results = {}
+    start = time.perf_counter()
+
+    if cores == 1 or len(jobs) == 1:
+        for job in jobs:
+            kwargs = dict(job.kwargs, n_jobs=allocation[job.name]) if job.parallel else job.kwargs
+            artifact, seconds, _ = _run_timed(job.train, job.args, kwargs)
+            results[job.name] = {'artifact': artifact, 'seconds': seconds, 'cores': allocation[job.name]}
+        return results, time.perf_counter() - start
+
+    with ProcessPoolExecutor(max_workers=min(len(jobs), cores)) as pool:
+        futures = {}
+        for job in jobs:
+            kwargs = dict(job.kwargs, n_jobs=allocation[job.name]) if job.parallel else job.kwargs
+            futures[job.name] = pool.submit(_run_timed, job.train, job.args, kwargs)
+        for name, future in futures.items():
+            artifact, seconds, _ = future.result()
+            results[name] = {'artifact': artifact, 'seconds': seconds, 'cores': allocation[name]}
+    return results, time.perf_counter() - start
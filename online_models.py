@@ -0,0 +1,193 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score, mean_absolute_error
+
+from advanced_analytics_engine import MODEL_FEATURES, CATEGORICAL_FEATURES
+from batch_scoring import BatchScorer, ENCODED_COLUMNS
+from feature_store import StableLabelEncoder, order_features
+from model_cache import ModelCache, DEFAULT_CACHE_DIR, data_fingerprint
+from shared_dataset import DEFAULT_SOURCE, iter_manufacturing_chunks
+
+ONLINE_PARAMS = {
+    'trees_per_update': 20,     # trees added by each update, fitted on the new rows only
+    'max_trees': 200,           # oldest trees are dropped beyond this, bounding model size and scoring cost
+    'min_update_rows': 200,     # smaller batches are buffered until enough rows have arrived
+    'random_state': 42,
+}
+ONLINE_TARGETS = {'revenue': 'Value', 'profit_margin': 'Profit_Margin'}
+
+# Ledger columns hashed to check that already-learned rows have not been rewritten
+LEDGER_COLUMNS = CATEGORICAL_FEATURES + ['Date', 'Qty', 'Rate', 'Total_Target_Cost', 'Value', 'Profit_Margin']
+TAIL_ROWS = 1000
+
+
+class OnlineModel:
+    """Revenue or margin forest that grows with the ledger instead of being retrained.
+
+    Each update warm-starts the RandomForest with ``trees_per_update`` extra
+    trees fitted on the newly appended rows only, so a refresh costs
+    O(new rows). Beyond ``max_trees`` the oldest trees are dropped, which keeps
+    the model bounded and lets it follow recent pricing. Before the new trees
+    are fitted the current model scores the batch (test-then-train), giving an
+    honest accuracy on unseen rows for every update.
+    """
+
+    def __init__(self, target, params=ONLINE_PARAMS):
+        self.target = target
+        self.params = dict(params)
+        self.encoders = {col: StableLabelEncoder() for col in ENCODED_COLUMNS}
+        self.model = RandomForestRegressor(n_estimators=0, warm_start=True, random_state=params['random_state'])
+        self.pending = None
+        self.rows_learned = 0
+        self.history = []
+
+    @property
+    def is_fitted(self):
+        return hasattr(self.model, 'estimators_') and len(self.model.estimators_) > 0
+
+    def _inputs(self, features):
+        X = features.copy()
+        for col, encoded_col in ENCODED_COLUMNS.items():
+            X[encoded_col] = self.encoders[col].transform(features[col])
+        return X[MODEL_FEATURES]
+
+    def partial_fit(self, rows):
+        """Learn from newly appended ledger rows; returns the update summary, or None while buffering"""
+        features = order_features(rows)
+        features[self.target] = rows[self.target]
+        numeric = [col for col in MODEL_FEATURES if col not in ENCODED_COLUMNS.values()]
+        features = features.dropna(subset=numeric + [self.target])
+        for col in ENCODED_COLUMNS:
+            self.encoders[col].update(features[col])
+        self.pending = features if self.pending is None else pd.concat([self.pending, features])
+        if len(self.pending) < self.params['min_update_rows']:
+            return None
+
+        batch, self.pending = self.pending, None
+        X, y = self._inputs(batch), batch[self.target]
+        start = time.perf_counter()
+        summary = {'rows': len(batch), 'r2': np.nan, 'mae': np.nan}
+        if self.is_fitted:
+            y_pred = self.model.predict(X)
+            summary.update(r2=r2_score(y, y_pred), mae=mean_absolute_error(y, y_pred))
+
+        self.model.n_estimators += self.params['trees_per_update']
+        self.model.fit(X, y)
+        if len(self.model.estimators_) > self.params['max_trees']:
+            self.model.estimators_ = self.model.estimators_[-self.params['max_trees']:]
+            self.model.n_estimators = self.params['max_trees']
+
+        self.rows_learned += len(batch)
+        summary.update(seconds=time.perf_counter() - start, trees=len(self.model.estimators_))
+        self.history.append(summary)
+        return summary
+
+    def artifact(self):
+        """Artifact dict in the format BatchScorer reads (unscaled inputs, stable encoders)"""
+        return {'model': self.model, 'scaler': None, 'backend': 'online', 'encoders': self.encoders,
+                'features': list(MODEL_FEATURES), 'rows_learned': self.rows_learned}
+
+
+class OnlineModelSet:
+    """Online revenue and margin models plus how much of the append-only ledger they have seen"""
+
+    def __init__(self, params=ONLINE_PARAMS):
+        self.params = dict(params)
+        self.reset()
+
+    def reset(self):
+        self.models = {name: OnlineModel(target, self.params) for name, target in ONLINE_TARGETS.items()}
+        self.rows_seen = 0
+        self.new_rows = 0
+        self.tail = None
+
+    @classmethod
+    def load(cls, cache):
+        state = cache.load('online', 'state')
+        return state if state is not None else cls()
+
+    def save(self, cache):
+        return cache.save('online', 'state', self)
+
+    @property
+    def tail_start(self):
+        """First ledger row of the tail that is re-read to check the learned history is unchanged"""
+        return max(self.rows_seen - TAIL_ROWS, 0)
+
+    def _tail_fingerprint(self, data, offset):
+        return data_fingerprint(data.iloc[self.tail_start - offset:self.rows_seen - offset], LEDGER_COLUMNS)
+
+    def history_changed(self, data, offset=0):
+        """True if `data` (ledger rows from position `offset`) no longer matches what was learned"""
+        if not self.rows_seen:
+            return False
+        return offset > self.tail_start or offset + len(data) < self.rows_seen or \
+            self._tail_fingerprint(data, offset) != self.tail
+
+    def update(self, data, offset=0):
+        """Learn from the rows appended since the last update; returns {name: summary or None}.
+
+        ``data`` holds the ledger rows from position ``offset`` on and must
+        include the tail from ``tail_start``; pass the whole ledger with
+        ``offset=0`` after a reset.
+        """
+        if self.history_changed(data, offset):
+            if offset:
+                raise ValueError("Ledger history changed since the last update; relearn from offset 0")
+            print("Ledger history changed since the last update; relearning the online models from scratch")
+            self.reset()
+
+        new_rows = data.iloc[self.rows_seen - offset:]
+        self.new_rows = len(new_rows)
+        summaries = {name: model.partial_fit(new_rows) if len(new_rows) else None
+                     for name, model in self.models.items()}
+        self.rows_seen = offset + len(data)
+        self.tail = self._tail_fingerprint(data, offset)
+        return summaries
+
+    def scorer(self):
+        """BatchScorer over the current online models"""
+        return BatchScorer(self.models['revenue'].artifact(), self.models['profit_margin'].artifact())
+
+
+def _read_ledger(source, skip_rows, chunksize):
+    chunks = list(iter_manufacturing_chunks(source, chunksize=chunksize, skip_rows=skip_rows))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def refresh_online_models(source=DEFAULT_SOURCE, cache_dir=DEFAULT_CACHE_DIR, chunksize=100000):
+    """Nightly refresh: update the stored online models with the ledger rows added since the last run.
+
+    Only the rows after the learned history are cleaned, plus a short tail to
+    check that history is unchanged; if it changed, the whole ledger is
+    re-read and the models are relearned.
+    """
+    cache = ModelCache(cache_dir)
+    models = OnlineModelSet.load(cache)
+    offset = models.tail_start
+    recent = _read_ledger(source, offset, chunksize)
+    if offset and models.history_changed(recent, offset):
+        offset, recent = 0, _read_ledger(source, 0, chunksize)
+    summaries = models.update(recent, offset)
+    models.save(cache)
+
+    print(f"Online models: {models.new_rows:,} new row(s), {models.rows_seen:,} seen in total")
+    for name, summary in summaries.items():
+        model = models.models[name]
+        if summary is None:
+            buffered = 0 if model.pending is None else len(model.pending)
+            print(f"{name:<14}: no update ({buffered:,} row(s) buffered)")
+        else:
+            print(f"{name:<14}: learned {summary['rows']:,} rows in {summary['seconds']:.2f}s, "
+                  f"{summary['trees']} trees, R² on the new rows before update={summary['r2']:.3f}")
+    return models
+
+
+if __name__ == "__main__":
+    # Go through the module so the pickled state refers to online_models, not __main__
+    from online_models import refresh_online_models
+    refresh_online_models(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE)
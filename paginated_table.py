@@ -0,0 +1,120 @@
+import math
+
+import matplotlib
+import numpy as np
+import streamlit as st
+
+from top_n import sort_keys, top_positions
+
+
+def gradient_css(values, cmap='Blues', vmin=None, vmax=None, text_color_threshold=0.408):
+    """Vectorized equivalent of Styler.background_gradient for one column of values"""
+    values = np.asarray(values, dtype=float)
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+    span = vmax - vmin
+    norm = (values - vmin) / span if span else np.zeros_like(values)
+
+    rgba = matplotlib.colormaps[cmap](np.nan_to_num(norm, nan=0.0))
+    rgb = np.round(rgba[:, :3] * 255).astype(int)
+
+    # Relative luminance decides dark/light text, as background_gradient does
+    channel = rgba[:, :3]
+    linear = np.where(channel <= 0.04045, channel / 12.92, ((channel + 0.055) / 1.055) ** 2.4)
+    luminance = linear @ np.array([0.2126, 0.7152, 0.0722])
+    text = np.where(luminance < text_color_threshold, '#f1f1f1', '#000000')
+
+    return [f"background-color: #{r:02x}{g:02x}{b:02x}; color: {t}" if not np.isnan(v) else ''
+            for (r, g, b), t, v in zip(rgb, text, values)]
+
+
+class PaginatedTable:
+    """Server-side sorted, paginated view over an aggregate table.
+
+    Only the visible page is formatted and styled, so render cost depends on the
+    page size rather than on the number of customers or parts. Sorting uses
+    argpartition to select the rows up to the current page before ordering them.
+    """
+
+    def __init__(self, frame, key, formats=None, gradient=None, page_size=25,
+                 default_sort=None, ascending=False):
+        self.frame = frame.reset_index(drop=True)
+        self.key = key
+        self.formats = formats or {}
+        self.gradient = gradient or {}
+        self.page_size = page_size
+        self.default_sort = default_sort
+        self.default_ascending = ascending
+
+        # Color scales use the full column range so pages are comparable
+        self._gradient_range = {col: (np.nanmin(self.frame[col].to_numpy(dtype=float)),
+                                      np.nanmax(self.frame[col].to_numpy(dtype=float)))
+                                for col in self.gradient if len(self.frame)}
+        self._sort_keys = {}
+
+    @property
+    def page_count(self):
+        return max(1, math.ceil(len(self.frame) / self.page_size))
+
+    def sort_key(self, column, ascending):
+        """Numeric sort key for a column, NaN last, negated for descending order"""
+        cache_key = (column, ascending)
+        if cache_key not in self._sort_keys:
+            self._sort_keys[cache_key] = sort_keys(self.frame[column], ascending)
+        return self._sort_keys[cache_key]
+
+    def page_positions(self, page, column=None, ascending=False):
+        """Row positions for one page, selecting rather than fully sorting when possible"""
+        if column is None:
+            n = len(self.frame)
+            start = min(page * self.page_size, n)
+            return np.arange(start, min(start + self.page_size, n))
+        return top_positions(self.sort_key(column, ascending), self.page_size, start=page * self.page_size)
+
+    def page(self, page, column=None, ascending=False):
+        """The requested page as a DataFrame"""
+        return self.frame.iloc[self.page_positions(page, column, ascending)]
+
+    def style_page(self, page_frame):
+        """Apply number formats and precomputed color scales to a single page"""
+        styler = page_frame.style.format(self.formats, na_rep='–')
+        for col, cmap in self.gradient.items():
+            if col in page_frame.columns and col in self._gradient_range:
+                vmin, vmax = self._gradient_range[col]
+                colors = gradient_css(page_frame[col].to_numpy(dtype=float), cmap, vmin, vmax)
+                styler = styler.apply(lambda _, colors=colors: colors, subset=[col], axis=0)
+        return styler.hide(axis='index')
+
+    def render(self, height=400):
+        """Render sort and page controls plus the visible page"""
+        columns = list(self.frame.columns)
+        default_index = columns.index(self.default_sort) if self.default_sort in columns else 0
+
+        # A narrower filter can shrink the table below the page the user was on
+        page_key = f"{self.key}_page"
+        if st.session_state.get(page_key, 1) > self.page_count:
+            st.session_state[page_key] = self.page_count
+
+        control_cols = st.columns([3, 2, 2])
+        sort_column = control_cols[0].selectbox("Sort by", columns, index=default_index,
+                                                key=f"{self.key}_sort")
+        ascending = control_cols[1].toggle("Ascending", value=self.default_ascending,
+                                           key=f"{self.key}_ascending")
+        page_number = control_cols[2].number_input("Page", min_value=1, max_value=self.page_count,
+                                                   value=1, step=1, key=page_key)
+
+        page_index = min(int(page_number), self.page_count) - 1
+        page_frame = self.page(page_index, sort_column, ascending)
+        st.dataframe(self.style_page(page_frame), use_container_width=True, height=height)
+
+        first = page_index * self.page_size + 1 if len(self.frame) else 0
+        st.caption(f"Rows {first:,}–{first + len(page_frame) - 1:,} of {len(self.frame):,} · "
+                   f"page {page_index + 1} of {self.page_count}")
+
+
+@st.fragment
+def render_paginated_table(frame, key, formats=None, gradient=None, page_size=25,
+                           default_sort=None, ascending=False, height=400):
+    """Fragment wrapper: paging and sorting rerun only the table, reusing the aggregate passed in"""
+    PaginatedTable(frame, key, formats=formats, gradient=gradient, page_size=page_size,
+                   default_sort=default_sort, ascending=ascending).render(height=height)
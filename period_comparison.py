@@ -0,0 +1,90 @@
+import pandas as pd
+
+# Measure name -> (ledger column, aggregation); sums compare as % growth, means as point changes
+TOTAL_MEASURES = {
+    'Revenue': ('Value', 'sum'),
+    'Qty': ('Qty', 'sum'),
+    'Orders': ('Value', 'size'),
+}
+RATE_MEASURES = {
+    'Profit_Margin': ('Profit_Margin', 'mean'),
+    'Efficiency': ('Overall_Efficiency', 'mean'),
+    'Cost_Variance': ('Cost_Variance_Pct', 'mean'),
+    'Manpower_Variance': ('variation Manpower', 'mean'),
+    'Material_Variance': ('variation RawMaterial', 'mean'),
+    'Machine_Variance': ('variation Machine power', 'mean'),
+    'Overhead_Variance': ('variation overhead ', 'mean'),
+}
+MEASURES = {**TOTAL_MEASURES, **RATE_MEASURES}
+
+# Period frequency -> (label of the previous-period comparison, periods per year)
+FREQUENCIES = {'M': ('MoM', 12), 'Q': ('QoQ', 4), 'Y': ('YoY', 1)}
+
+
+def period_cube(data, key=None, freq='M'):
+    """Measures for every (key, period) on a full calendar grid, one groupby pass.
+
+    Returns a dict of measure -> (keys x periods) DataFrame. Periods without
+    orders are present with zero totals and NaN rates, so shifting along the
+    period axis always compares calendar-adjacent periods.
+    """
+    data = data[data['Date'].notna()]
+    periods = data['Date'].dt.to_period(freq).rename('Period')
+    keys = data[key] if key is not None else pd.Series('All', index=data.index, name='Key')
+    measures = {name: spec for name, spec in MEASURES.items() if spec[0] in data.columns}
+    cube = data.groupby([keys, periods]).agg(**measures).unstack('Period')
+    if cube.empty:
+        return {name: pd.DataFrame() for name in measures}
+
+    full_range = pd.period_range(periods.min(), periods.max(), freq=freq, name='Period')
+    matrices = {}
+    for name in measures:
+        matrix = cube[name].reindex(columns=full_range)
+        matrices[name] = matrix.fillna(0.0) if name in TOTAL_MEASURES else matrix
+    return matrices
+
+
+def compare_periods(data, key=None, freq='M'):
+    """Previous-period and year-over-year deltas for every measure, key and period at once.
+
+    Totals (Revenue, Qty, Orders) get percentage growth columns such as
+    ``Revenue_MoM_Pct`` and ``Revenue_YoY_Pct``; rates (margin, efficiency and
+    the cost-variance categories) get point changes such as
+    ``Profit_Margin_MoM_Change``. For quarterly data the previous-period label
+    is QoQ; for yearly data only YoY is produced.
+    """
+    label, per_year = FREQUENCIES[freq]
+    lags = {label: 1} if label == 'YoY' else {label: 1, 'YoY': per_year}
+    matrices = period_cube(data, key, freq)
+
+    columns = {}
+    for name, matrix in matrices.items():
+        columns[name] = matrix
+        for lag_label, lag in lags.items():
+            previous = matrix.shift(lag, axis=1)
+            if name in TOTAL_MEASURES:
+                columns[f'{name}_{lag_label}_Pct'] = (matrix - previous) / previous.where(previous != 0) * 100
+            else:
+                columns[f'{name}_{lag_label}_Change'] = matrix - previous
+
+    if not matrices or next(iter(matrices.values())).empty:
+        return pd.DataFrame(columns=list(columns))
+    # Flatten the (keys x periods) matrices into one long frame indexed by (key, period)
+    first = next(iter(columns.values()))
+    index = pd.MultiIndex.from_product([first.index, first.columns], names=[key or 'Key', 'Period'])
+    return pd.DataFrame({name: frame.to_numpy(dtype=float).ravel() for name, frame in columns.items()}, index=index)
+
+
+def latest_comparison(data, key=None, freq='M'):
+    """One row per key with the measures and deltas of the most recent period"""
+    comparison = compare_periods(data, key, freq)
+    if comparison.empty:
+        return comparison
+    latest = comparison.index.get_level_values('Period').max()
+    return comparison.xs(latest, level='Period')
+
+
+def business_comparison(data, freq='M'):
+    """Ledger-wide measures and deltas per period, indexed by period"""
+    comparison = compare_periods(data, None, freq)
+    return comparison.droplevel(0) if not comparison.empty else comparison
@@ -15,6 +15,10 @@ from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 import matplotlib.dates as mdates
 from io import BytesIO
 import warnings
+from top_n import top_n
+from concentration_engine import concentration_summary, concentration_series, customer_totals
+from rolling_kpi_engine import RollingKPIEngine, DEFAULT_WINDOWS
+from period_comparison import business_comparison, latest_comparison
 warnings.filterwarnings('ignore')
 
 class ProfessionalBIReportGenerator:
@@ -144,7 +148,8 @@ class ProfessionalBIReportGenerator:
             'total_orders': len(self.data),
             'avg_order_value': self.data['Value'].mean(),
             'revenue_growth': self.calculate_revenue_growth(),
-            'profit_trend': self.calculate_profit_trend()
+            'profit_trend': self.calculate_profit_trend(),
+            'rolling_kpis': RollingKPIEngine(key=None).fit(self.data).as_of().iloc[0]
         }
         
         # Customer Analysis
@@ -154,14 +159,18 @@ class ProfessionalBIReportGenerator:
             'Overall_Efficiency': 'mean'
         }).round(2)
         
-        customer_revenue = self.data.groupby('Customer')['Value'].sum().sort_values(ascending=False)
-        top_80_percent = customer_revenue.cumsum() / customer_revenue.sum() <= 0.8
-        customers_80_percent = top_80_percent.sum()
+        customer_revenue = customer_totals(self.data)
+        concentration = concentration_summary(customer_revenue)
+        customers_80_percent = concentration['customers_for_share']
         
         self.analysis_results['customer'] = {
             'analysis': customer_analysis,
-            'top_customers': customer_revenue.head(10),
+            'top_customers': top_n(customer_revenue, 10),
             'customer_concentration': customers_80_percent,
+            'hhi': concentration['hhi'],
+            'gini': concentration['gini'],
+            'concentration_trend': concentration_series(self.data, 'quarter'),
+            'growth': top_n(latest_comparison(self.data, 'Customer', 'M'), 10, by='Revenue'),
             'total_customers': self.data['Customer'].nunique()
         }
         
@@ -174,7 +183,7 @@ class ProfessionalBIReportGenerator:
         
         self.analysis_results['product'] = {
             'analysis': product_analysis,
-            'top_products': product_analysis['Value']['sum'].sort_values(ascending=False).head(10),
+            'top_products': top_n(product_analysis['Value']['sum'], 10),
             'total_products': self.data['Part description'].nunique()
         }
         
@@ -196,25 +205,17 @@ class ProfessionalBIReportGenerator:
     
     def calculate_revenue_growth(self):
         """Calculate revenue growth rate"""
-        try:
-            monthly_revenue = self.data.groupby(self.data['Date'].dt.to_period('M'))['Value'].sum()
-            if len(monthly_revenue) >= 2:
-                latest = monthly_revenue.iloc[-1]
-                previous = monthly_revenue.iloc[-2]
-                return ((latest - previous) / previous) * 100
-            return 0
-        except:
-            return 0
+        monthly = business_comparison(self.data, 'M')
+        if len(monthly) >= 2 and pd.notna(monthly['Revenue_MoM_Pct'].iloc[-1]):
+            return monthly['Revenue_MoM_Pct'].iloc[-1]
+        return 0
     
     def calculate_profit_trend(self):
         """Calculate profit margin trend"""
-        try:
-            monthly_profit = self.data.groupby(self.data['Date'].dt.to_period('M'))['Profit_Margin'].mean()
-            if len(monthly_profit) >= 2:
-                return 'Improving' if monthly_profit.iloc[-1] > monthly_profit.iloc[-2] else 'Declining'
-            return 'Stable'
-        except:
-            return 'Stable'
+        monthly = business_comparison(self.data, 'M')
+        if len(monthly) >= 2 and pd.notna(monthly['Profit_Margin_MoM_Change'].iloc[-1]):
+            return 'Improving' if monthly['Profit_Margin_MoM_Change'].iloc[-1] > 0 else 'Declining'
+        return 'Stable'
     
     def create_executive_summary(self):
         """Generate executive summary content"""
@@ -340,6 +341,34 @@ class ProfessionalBIReportGenerator:
             "Key focus areas include cost optimization, pricing strategy refinement, and operational efficiency enhancement.",
             self.body_style
         ))
+        content.append(Spacer(1, 15))
+        
+        # Trailing-window performance up to the latest order date
+        content.append(Paragraph("Rolling Performance Trends", self.subheading_style))
+        rolling = financial['rolling_kpis']
+        rolling_data = [['Window', 'Revenue', 'Orders', 'Avg Margin %', 'Efficiency %', 'Cost Variance %']]
+        for window in DEFAULT_WINDOWS:
+            rolling_data.append([
+                f"Last {window} days",
+                f"₹{rolling[f'Revenue_{window}d']:,.0f}",
+                f"{rolling[f'Orders_{window}d']:,.0f}",
+                f"{rolling[f'Profit_Margin_{window}d']:.2f}%",
+                f"{rolling[f'Efficiency_{window}d']:.1f}%",
+                f"{rolling[f'Cost_Variance_{window}d']:+.2f}%"
+            ])
+        
+        rolling_table = Table(rolling_data)
+        rolling_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2f5f8f')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        content.append(rolling_table)
         content.append(Spacer(1, 20))
         
         # Customer Intelligence Analysis
@@ -378,6 +407,55 @@ class ProfessionalBIReportGenerator:
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
         ]))
         content.append(customer_table)
+        content.append(Spacer(1, 15))
+        
+        # Concentration trend by quarter
+        content.append(Paragraph("Revenue Concentration Trend", self.subheading_style))
+        content.append(Paragraph(
+            f"Overall revenue concentration has a Herfindahl index of {customer['hhi']:,.0f} (0-10,000 scale) "
+            f"and a Gini coefficient of {customer['gini']:.2f} across active customers.",
+            self.body_style
+        ))
+        trend_data = [['Quarter', 'Revenue', 'Customers for 80%', 'HHI', 'Gini']]
+        for quarter, row in customer['concentration_trend'].iterrows():
+            trend_data.append([str(quarter), f"₹{row['Revenue']:,.0f}", f"{row['Customers_For_Share']:.0f}",
+                               f"{row['HHI']:,.0f}", f"{row['Gini']:.2f}"])
+        
+        trend_table = Table(trend_data)
+        trend_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2f5f8f')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        content.append(trend_table)
+        content.append(Spacer(1, 15))
+        
+        # Latest month against the previous month and the same month last year
+        content.append(Paragraph("Customer Growth - Latest Month", self.subheading_style))
+        growth_data = [['Customer', 'Revenue', 'MoM Growth', 'YoY Growth', 'Margin Change']]
+        for name, row in customer['growth'].iterrows():
+            growth_data.append([name[:20], f"₹{row['Revenue']:,.0f}",
+                                f"{row['Revenue_MoM_Pct']:+.1f}%" if pd.notna(row['Revenue_MoM_Pct']) else 'n/a',
+                                f"{row['Revenue_YoY_Pct']:+.1f}%" if pd.notna(row['Revenue_YoY_Pct']) else 'n/a',
+                                f"{row['Profit_Margin_MoM_Change']:+.2f} pts" if pd.notna(row['Profit_Margin_MoM_Change']) else 'n/a'])
+        
+        growth_table = Table(growth_data)
+        growth_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2f5f8f')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        content.append(growth_table)
         content.append(Spacer(1, 20))
         
         # Operational Excellence Analysis
@@ -13,6 +13,9 @@ from io import BytesIO
 import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
+from classification_engine import segment_customers, categorize_products, REPORT_CUSTOMER_SEGMENTS
+from top_n import top_n
+from period_comparison import business_comparison, latest_comparison
 warnings.filterwarnings('ignore')
 
 class ProfessionalExcelAnalytics:
@@ -149,7 +152,7 @@ class ProfessionalExcelAnalytics:
         ws.cell(row=current_row, column=2, value="TOP CUSTOMERS BY REVENUE").font = Font(name='Calibri', size=12, bold=True, color=self.colors['header'])
         current_row += 1
         
-        top_customers = data.groupby('Customer')['Value'].sum().sort_values(ascending=False).head(5)
+        top_customers = top_n(data.groupby('Customer')['Value'].sum(), 5)
         for i, (customer, value) in enumerate(top_customers.items()):
             ws.cell(row=current_row + i, column=2, value=f"{i+1}. {customer}")
             ws.cell(row=current_row + i, column=4, value=f"₹{value:,.0f}")
@@ -158,7 +161,7 @@ class ProfessionalExcelAnalytics:
         # Product Analysis Summary
         ws.cell(row=current_row, column=7, value="TOP PRODUCTS BY VOLUME").font = Font(name='Calibri', size=12, bold=True, color=self.colors['header'])
         
-        top_products = data.groupby('Part description')['Qty'].sum().sort_values(ascending=False).head(5)
+        top_products = top_n(data.groupby('Part description')['Qty'].sum(), 5)
         for i, (product, qty) in enumerate(top_products.items()):
             ws.cell(row=current_row + i, column=7, value=f"{i+1}. {product[:30]}...")
             ws.cell(row=current_row + i, column=9, value=f"{qty:,.0f}")
@@ -261,6 +264,67 @@ class ProfessionalExcelAnalytics:
         
         return ws
     
+    def create_period_comparison(self, data):
+        """Create Period Comparison Sheet (MoM, QoQ and YoY growth)"""
+        ws = self.wb.create_sheet("Period Comparison")
+        
+        ws['B2'] = "PERIOD-OVER-PERIOD PERFORMANCE COMPARISON"
+        ws['B2'].font = Font(name='Calibri', size=16, bold=True, color=self.colors['header'])
+        
+        def write_table(current_row, title, frame, label, columns):
+            ws.cell(row=current_row, column=2, value=title).font = Font(name='Calibri', size=12, bold=True, color=self.colors['header'])
+            current_row += 1
+            columns = [(header, col) for header, col in columns if col in frame.columns]
+            for i, header in enumerate([label] + [header for header, _ in columns]):
+                ws.cell(row=current_row, column=i+2, value=header).font = Font(bold=True, color=self.colors['header'])
+                ws.cell(row=current_row, column=i+2).fill = PatternFill(start_color=self.colors['accent'], 
+                                                                       end_color=self.colors['accent'], 
+                                                                       fill_type='solid')
+            first_row = current_row + 1
+            for index, row in frame.iterrows():
+                current_row += 1
+                ws.cell(row=current_row, column=2, value=str(index))
+                for i, (_, col) in enumerate(columns):
+                    value = row[col]
+                    ws.cell(row=current_row, column=i+3, value=None if pd.isna(value) else round(float(value), 2))
+            
+            # Green for growth, red for decline in every delta column
+            for i, (header, _) in enumerate(columns):
+                if 'Δ' in header or '%' in header:
+                    letter = get_column_letter(i + 3)
+                    delta_range = f"{letter}{first_row}:{letter}{current_row}"
+                    ws.conditional_formatting.add(delta_range,
+                                                CellIsRule(operator='greaterThan', formula=['0'], 
+                                                          fill=PatternFill(start_color=self.colors['positive'], 
+                                                                          end_color=self.colors['positive'], 
+                                                                          fill_type='solid')))
+                    ws.conditional_formatting.add(delta_range,
+                                                CellIsRule(operator='lessThan', formula=['0'], 
+                                                          fill=PatternFill(start_color=self.colors['negative'], 
+                                                                          end_color=self.colors['negative'], 
+                                                                          fill_type='solid')))
+            return current_row + 3
+        
+        monthly_columns = [('Revenue', 'Revenue'), ('Revenue MoM %', 'Revenue_MoM_Pct'), ('Revenue YoY %', 'Revenue_YoY_Pct'),
+                           ('Orders MoM %', 'Orders_MoM_Pct'), ('Profit Margin %', 'Profit_Margin'),
+                           ('Margin Δ pts', 'Profit_Margin_MoM_Change'), ('Cost Variance Δ pts', 'Cost_Variance_MoM_Change'),
+                           ('Manpower Var Δ', 'Manpower_Variance_MoM_Change'), ('Material Var Δ', 'Material_Variance_MoM_Change'),
+                           ('Machine Var Δ', 'Machine_Variance_MoM_Change'), ('Overhead Var Δ', 'Overhead_Variance_MoM_Change')]
+        current_row = write_table(5, "MONTH-OVER-MONTH BUSINESS TREND", business_comparison(data, 'M'), 'Month', monthly_columns)
+        
+        quarterly_columns = [('Revenue', 'Revenue'), ('Revenue QoQ %', 'Revenue_QoQ_Pct'), ('Revenue YoY %', 'Revenue_YoY_Pct'),
+                             ('Profit Margin %', 'Profit_Margin'), ('Margin Δ pts', 'Profit_Margin_QoQ_Change'),
+                             ('Cost Variance Δ pts', 'Cost_Variance_QoQ_Change')]
+        current_row = write_table(current_row, "QUARTER-OVER-QUARTER BUSINESS TREND", business_comparison(data, 'Q'), 'Quarter', quarterly_columns)
+        
+        customer_columns = [('Revenue', 'Revenue'), ('Revenue MoM %', 'Revenue_MoM_Pct'), ('Revenue YoY %', 'Revenue_YoY_Pct'),
+                            ('Orders', 'Orders'), ('Margin Δ pts', 'Profit_Margin_MoM_Change'),
+                            ('Cost Variance Δ pts', 'Cost_Variance_MoM_Change')]
+        customers = top_n(latest_comparison(data, 'Customer', 'M'), 50, by='Revenue')
+        write_table(current_row, "CUSTOMER GROWTH - LATEST MONTH", customers, 'Customer', customer_columns)
+        
+        return ws
+    
     def create_customer_analysis(self, data):
         """Create Customer Analysis Sheet"""
         ws = self.wb.create_sheet("Customer Analysis")
@@ -286,20 +350,9 @@ class ProfessionalExcelAnalytics:
         customer_analysis['Order_Frequency'] = customer_analysis['Value_count'] / (customer_analysis['Days_Active'] / 30 + 1)
         
         # Customer segmentation based on revenue and frequency
-        revenue_median = customer_analysis['Value_sum'].median()
-        frequency_median = customer_analysis['Order_Frequency'].median()
-        
-        def segment_customer(row):
-            if row['Value_sum'] > revenue_median and row['Order_Frequency'] > frequency_median:
-                return "Champions"
-            elif row['Value_sum'] > revenue_median and row['Order_Frequency'] <= frequency_median:
-                return "Loyal Customers"
-            elif row['Value_sum'] <= revenue_median and row['Order_Frequency'] > frequency_median:
-                return "Potential Loyalists"
-            else:
-                return "At Risk"
-        
-        customer_analysis['Segment'] = customer_analysis.apply(segment_customer, axis=1)
+        customer_analysis['Segment'] = segment_customers(customer_analysis['Value_sum'],
+                                                         customer_analysis['Order_Frequency'],
+                                                         labels=REPORT_CUSTOMER_SEGMENTS)
         
         # Write customer analysis to sheet
         current_row = 5
@@ -325,7 +378,7 @@ class ProfessionalExcelAnalytics:
         ws.cell(row=current_row, column=2, value="CUSTOMER SEGMENT SUMMARY").font = Font(name='Calibri', size=12, bold=True, color=self.colors['header'])
         current_row += 1
         
-        segment_summary = customer_analysis.groupby('Segment').agg({
+        segment_summary = customer_analysis.groupby('Segment', observed=True).agg({
             'Value_sum': 'sum',
             'Customer': 'count'
         }).reset_index()
@@ -365,21 +418,8 @@ class ProfessionalExcelAnalytics:
         product_analysis = product_analysis.reset_index()
         
         # Product portfolio analysis (BCG Matrix style)
-        revenue_median = product_analysis['Value_sum'].median()
-        volume_median = product_analysis['Qty_sum'].median()
-        
-        def categorize_product(row):
-            if row['Value_sum'] > revenue_median and row['Qty_sum'] > volume_median:
-                return "Star Products"
-            elif row['Value_sum'] > revenue_median and row['Qty_sum'] <= volume_median:
-                return "Cash Cows"
-            elif row['Value_sum'] <= revenue_median and row['Qty_sum'] > volume_median:
-                return "Question Marks"
-            else:
-                return "Dogs"
-        
-        product_analysis['Category'] = product_analysis.apply(categorize_product, axis=1)
-        product_analysis = product_analysis.sort_values('Value_sum', ascending=False)
+        product_analysis['Category'] = categorize_products(product_analysis['Value_sum'],
+                                                           product_analysis['Qty_sum'])
         
         # Write top products to sheet
         current_row = 5
@@ -390,7 +430,7 @@ class ProfessionalExcelAnalytics:
             ws.cell(row=current_row, column=i+2, value=header).font = Font(bold=True, color=self.colors['header'])
         
         # Show top 50 products
-        for i, row in product_analysis.head(50).iterrows():
+        for i, row in top_n(product_analysis, 50, by='Value_sum').iterrows():
             current_row += 1
             ws.cell(row=current_row, column=2, value=row['Part description'][:40])
             ws.cell(row=current_row, column=3, value=row['Value_sum'])
@@ -405,7 +445,7 @@ class ProfessionalExcelAnalytics:
         ws.cell(row=current_row, column=2, value="PRODUCT PORTFOLIO SUMMARY").font = Font(name='Calibri', size=12, bold=True, color=self.colors['header'])
         current_row += 1
         
-        category_summary = product_analysis.groupby('Category').agg({
+        category_summary = product_analysis.groupby('Category', observed=True).agg({
             'Value_sum': 'sum',
             'Part description': 'count',
             'Profit_Margin_mean': 'mean'
@@ -514,7 +554,7 @@ class ProfessionalExcelAnalytics:
     def add_charts_to_summary(self, ws, data):
         """Add charts to executive summary sheet"""
         # Customer sales chart
-        customer_data = data.groupby('Customer')['Value'].sum().sort_values(ascending=False).head(10)
+        customer_data = top_n(data.groupby('Customer')['Value'].sum(), 10)
         
         # Create chart data in sheet
         chart_start_row = 25
@@ -560,6 +600,9 @@ class ProfessionalExcelAnalytics:
         print("Creating Financial Analysis...")
         self.create_financial_analysis(data)
         
+        print("Creating Period Comparison...")
+        self.create_period_comparison(data)
+        
         print("Creating Customer Analysis...")
         self.create_customer_analysis(data)
         
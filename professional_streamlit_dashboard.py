@@ -3,12 +3,27 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import numpy as np
 from datetime import datetime, timedelta
 import seaborn as sns
 import matplotlib.pyplot as plt
 from io import BytesIO
-import base64
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from data_export import StreamingDataExporter
+from shared_dataset import SharedDataset, enable_copy_on_write
+from dataset_watcher import DatasetWatcher
+from render_profiler import RenderProfiler
+from paginated_table import render_paginated_table
+from classification_engine import segment_customers
+from top_n import top_n
+from concentration_engine import concentration_summary, concentration_series, customer_totals
+from rolling_kpi_engine import RollingKPIEngine, DEFAULT_WINDOWS
+from distinct_sketch import DistinctCountIndex
+from period_comparison import latest_comparison, FREQUENCIES
+from forecasting_engine import forecast_series, MIN_PERIODS
+
+# Sessions share one ledger frame; copy-on-write keeps their derived frames from writing into it
+enable_copy_on_write()
 
 # Configure page
 st.set_page_config(
@@ -130,79 +145,87 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+@st.cache_resource
+def get_shared_dataset():
+    """Process-wide cleaned dataset shared by every session without copying"""
+    return SharedDataset()
+
+@st.cache_resource
+def get_dataset_watcher():
+    """Background watcher that rebuilds the shared dataset when the source CSV changes"""
+    return DatasetWatcher(get_shared_dataset()).start()
+
 def load_and_clean_data():
     """Load and clean the manufacturing data"""
     try:
-        data = pd.read_csv('Main4 - Main3.csv')
-        
-        def clean_currency(x):
-            try:
-                if str(x).strip() in ['-', '', 'nan', 'NaN']:
-                    return 0.0
-                return float(str(x).replace(',', ''))
-            except (ValueError, AttributeError):
-                return 0.0
-        
-        # Clean numeric columns
-        numeric_columns = ['Qty', 'Rate', 'Value', 'Fwt',
-                         'Target  Manpower', 'variation Manpower', 'Actual Manpower',
-                         'Target RawMaterial(Cost)', 'variation RawMaterial', 'Actual RawMaterial',
-                         'Target Machinepower(Cost)', 'variation Machine power', 'Actual Machine power',
-                         'Target Overhead(Cost)or Profit', 'variation overhead ', 'Actual Overhead or profit']
-        
-        for col in numeric_columns:
-            if col in data.columns:
-                data[col] = data[col].apply(clean_currency)
-        
-        # Convert date
-        data['Date'] = pd.to_datetime(data['Date'], errors='coerce', dayfirst=True)
-        
-        # Calculate business metrics
-        data['Total_Target_Cost'] = (data['Target  Manpower'] + 
-                                   data['Target RawMaterial(Cost)'] + 
-                                   data['Target Machinepower(Cost)'] + 
-                                   data['Target Overhead(Cost)or Profit'])
-        
-        data['Total_Actual_Cost'] = (data['Actual Manpower'] + 
-                                   data['Actual RawMaterial'] + 
-                                   data['Actual Machine power'] + 
-                                   data['Actual Overhead or profit'])
-        
-        data['Cost_Variance'] = data['Total_Actual_Cost'] - data['Total_Target_Cost']
-        data['Cost_Variance_Pct'] = (data['Cost_Variance'] / data['Total_Target_Cost'].replace(0, 1)) * 100
-        data['Profit_Margin'] = ((data['Value'] - data['Total_Actual_Cost']) / data['Value'].replace(0, 1)) * 100
-        data['Unit_Profit'] = (data['Value'] - data['Total_Actual_Cost']) / data['Qty'].replace(0, 1)
-        data['ROI'] = (data['Value'] - data['Total_Target_Cost']) / data['Total_Target_Cost'].replace(0, 1) * 100
-        
-        # Efficiency metrics
-        data['Manpower_Efficiency'] = (data['Target  Manpower'] / data['Actual Manpower'].replace(0, 1)) * 100
-        data['Material_Efficiency'] = (data['Target RawMaterial(Cost)'] / data['Actual RawMaterial'].replace(0, 1)) * 100
-        data['Machine_Efficiency'] = (data['Target Machinepower(Cost)'] / data['Actual Machine power'].replace(0, 1)) * 100
-        data['Overall_Efficiency'] = (data['Manpower_Efficiency'] + data['Material_Efficiency'] + data['Machine_Efficiency']) / 3
-        
-        return data
-        
+        get_dataset_watcher()
+        return get_shared_dataset().snapshot
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        return pd.DataFrame()
+        return None
+
+# Ledger size above which date-range distinct counts come from the HyperLogLog day sketches
+APPROX_DISTINCT_MIN_ROWS = 1_000_000
 
-def create_download_link(df, filename, file_label):
-    """Create a download link for dataframe"""
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">{file_label}</a>'
-    return href
+@st.cache_resource(max_entries=2)
+def get_distinct_index(version, _snapshot):
+    """Per-day distinct customer and part sketches for one dataset version, shared by every session"""
+    return DistinctCountIndex.from_frame(_snapshot.data)
+
+@st.cache_resource
+def get_data_exporter():
+    """Shared streaming exporter for the Data Export tab"""
+    exporter = StreamingDataExporter()
+    # Only files old enough to belong to earlier server processes; sessions discard their own
+    exporter.cleanup()
+    return exporter
+
+def render_export_jobs():
+    """Show this session's export jobs, polling only while one of them is still running"""
+    jobs = st.session_state.get('export_jobs', [])
+    if any(not job['future'].done() for job in jobs):
+        poll_export_jobs()
+    else:
+        render_finished_exports(jobs)
+
+@st.fragment(run_every=2)
+def poll_export_jobs():
+    """Rerun every 2 seconds until the exports finish, then hand over to a full rerun"""
+    jobs = st.session_state.get('export_jobs', [])
+    if all(job['future'].done() for job in jobs):
+        st.rerun()
+    render_finished_exports(jobs)
+
+def render_finished_exports(jobs):
+    """Download buttons for finished exports; the payload is only read when a button is clicked"""
+    for job in jobs:
+        future = job['future']
+        if not future.done():
+            st.info(f"⏳ Building {job['label']}...")
+        elif future.exception() is not None:
+            st.error(f"Export failed for {job['label']}: {future.exception()}")
+        else:
+            result = future.result()
+            if not result.exists():
+                st.warning(f"{job['label']} has expired; generate the export package again.")
+                continue
+            st.download_button(
+                label=f"{job['label']} ({result.rows:,} rows, {result.size_bytes / 1024:,.0f} KB)",
+                data=result.read,
+                file_name=result.file_name,
+                mime=result.mime,
+                on_click='ignore',
+                key=f"download_{job['key']}"
+            )
 
 def generate_executive_insights(data):
     """Generate executive-level insights"""
     total_revenue = data['Value'].sum()
     avg_profit_margin = data['Profit_Margin'].mean()
-    customer_revenue = data.groupby('Customer')['Value'].sum().sort_values(ascending=False)
     
     # Customer concentration analysis
-    top_80_percent = customer_revenue.cumsum() / customer_revenue.sum() <= 0.8
-    customers_80_percent = top_80_percent.sum()
+    concentration = concentration_summary(customer_totals(data))
+    customers_80_percent = concentration['customers_for_share']
     
     insights = []
     
@@ -216,7 +239,7 @@ def generate_executive_insights(data):
     
     # Customer concentration
     if customers_80_percent <= 3:
-        insights.append(("error", "⚠️ High Customer Concentration Risk", f"Only {customers_80_percent} customers generate 80% of revenue. Diversification critical."))
+        insights.append(("error", "⚠️ High Customer Concentration Risk", f"Only {customers_80_percent} customers generate 80% of revenue (HHI {concentration['hhi']:,.0f}). Diversification critical."))
     elif customers_80_percent <= 5:
         insights.append(("warning", "⚠️ Moderate Customer Risk", f"{customers_80_percent} customers generate 80% of revenue. Consider diversification."))
     else:
@@ -241,168 +264,64 @@ def generate_executive_insights(data):
     
     return insights
 
-# Load data
-data = load_and_clean_data()
+@st.cache_resource
+def get_render_executor():
+    """Worker pool that builds the tab aggregates and figures while the KPIs are on screen"""
+    return ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2), thread_name_prefix='bdm-render')
 
-if data.empty:
-    st.error("Failed to load data. Please check the CSV file.")
-    st.stop()
+# Columns of the rolling KPI tables, as produced by RollingKPIEngine.as_of()
+ROLLING_TABLE_COLUMNS = ['Revenue_7d', 'Revenue_30d', 'Revenue_90d', 'Orders_30d',
+                         'Profit_Margin_30d', 'Efficiency_30d', 'Cost_Variance_30d']
+ROLLING_TABLE_FORMATS = {
+    'Revenue_7d': '₹{:,.0f}',
+    'Revenue_30d': '₹{:,.0f}',
+    'Revenue_90d': '₹{:,.0f}',
+    'Orders_30d': '{:,.0f}',
+    'Profit_Margin_30d': '{:.2f}%',
+    'Efficiency_30d': '{:.1f}%',
+    'Cost_Variance_30d': '{:+.2f}%'
+}
 
-# Header
-st.markdown('<h1 class="main-header">🏭 Professional Manufacturing Analytics Dashboard</h1>', unsafe_allow_html=True)
+def rolling_kpi_table(data, key):
+    """7/30/90-day KPIs per customer or part, ending on the last date in the selection"""
+    engine = RollingKPIEngine(key).fit(data)
+    return engine.as_of()[[key] + ROLLING_TABLE_COLUMNS], engine.last_date
 
-# Sidebar
-st.sidebar.markdown("## 🔍 Analytics Controls")
-st.sidebar.markdown("---")
-
-# Filters
-customers = st.sidebar.multiselect(
-    "Select Customers", 
-    data['Customer'].unique(), 
-    default=data['Customer'].unique(),
-    help="Filter data by customer companies"
-)
+# Period-over-period growth tables: latest month or quarter against the previous one and a year earlier
+GROWTH_TABLE_FORMATS = {
+    'Revenue': '₹{:,.0f}',
+    'Revenue_Growth_%': '{:+.1f}%',
+    'Revenue_YoY_%': '{:+.1f}%',
+    'Orders': '{:,.0f}',
+    'Margin_Change_pts': '{:+.2f}',
+    'Efficiency_Change_pts': '{:+.2f}',
+    'Cost_Variance_Change_pts': '{:+.2f}'
+}
 
-date_range = st.sidebar.date_input(
-    "Select Date Range", 
-    value=(data['Date'].min(), data['Date'].max()),
-    min_value=data['Date'].min(),
-    max_value=data['Date'].max(),
-    help="Choose the analysis period"
-)
-
-# Advanced filters
-st.sidebar.markdown("### Advanced Filters")
-min_order_value = st.sidebar.slider(
-    "Minimum Order Value (₹)", 
-    min_value=0, 
-    max_value=int(data['Value'].max()), 
-    value=0,
-    help="Filter orders by minimum value"
-)
-
-profit_margin_filter = st.sidebar.slider(
-    "Profit Margin Range (%)", 
-    min_value=float(data['Profit_Margin'].min()), 
-    max_value=float(data['Profit_Margin'].max()), 
-    value=(float(data['Profit_Margin'].min()), float(data['Profit_Margin'].max())),
-    help="Filter by profit margin range"
-)
-
-# Filter data
-filtered_data = data[
-    (data['Customer'].isin(customers)) &
-    (data['Date'] >= pd.to_datetime(date_range[0])) &
-    (data['Date'] <= pd.to_datetime(date_range[1])) &
-    (data['Value'] >= min_order_value) &
-    (data['Profit_Margin'] >= profit_margin_filter[0]) &
-    (data['Profit_Margin'] <= profit_margin_filter[1])
-]
-
-# Executive Dashboard
-st.markdown("## 📊 Executive Dashboard")
+def growth_table(data, key, freq):
+    """Latest-period measures and growth for every customer or part, with display column names"""
+    label = FREQUENCIES[freq][0]
+    comparison = latest_comparison(data, key, freq)
+    columns = {
+        'Revenue': 'Revenue',
+        f'Revenue_{label}_Pct': 'Revenue_Growth_%',
+        'Revenue_YoY_Pct': 'Revenue_YoY_%',
+        'Orders': 'Orders',
+        f'Profit_Margin_{label}_Change': 'Margin_Change_pts',
+        f'Efficiency_{label}_Change': 'Efficiency_Change_pts',
+        f'Cost_Variance_{label}_Change': 'Cost_Variance_Change_pts',
+    }
+    return comparison.reindex(columns=list(columns)).rename(columns=columns).rename_axis(key).reset_index()
 
-# Key metrics row
-col1, col2, col3, col4, col5 = st.columns(5)
-
-with col1:
-    total_revenue = filtered_data['Value'].sum()
-    st.markdown(f"""
-    <div class="metric-container">
-        <h3>💰 Total Revenue</h3>
-        <h2>₹{total_revenue:,.0f}</h2>
-        <p>YTD Performance</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col2:
-    avg_margin = filtered_data['Profit_Margin'].mean()
-    st.markdown(f"""
-    <div class="metric-container">
-        <h3>📈 Avg Profit Margin</h3>
-        <h2>{avg_margin:.1f}%</h2>
-        <p>Current Period</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col3:
-    total_orders = len(filtered_data)
-    st.markdown(f"""
-    <div class="metric-container">
-        <h3>📦 Total Orders</h3>
-        <h2>{total_orders:,}</h2>
-        <p>Active Orders</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col4:
-    efficiency = filtered_data['Overall_Efficiency'].mean()
-    st.markdown(f"""
-    <div class="metric-container">
-        <h3>⚙️ Efficiency</h3>
-        <h2>{efficiency:.1f}%</h2>
-        <p>Operational</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-with col5:
-    customers_count = filtered_data['Customer'].nunique()
-    st.markdown(f"""
-    <div class="metric-container">
-        <h3>🏢 Active Customers</h3>
-        <h2>{customers_count}</h2>
-        <p>Current Period</p>
-    </div>
-    """, unsafe_allow_html=True)
+# Section builders run on the render pool: they aggregate and build figures but never call Streamlit
 
-# Executive Insights
-st.markdown("## 🎯 Executive Insights")
-insights = generate_executive_insights(filtered_data)
-
-insight_cols = st.columns(2)
-for i, (level, title, description) in enumerate(insights):
-    with insight_cols[i % 2]:
-        if level == "success":
-            st.markdown(f"""
-            <div class="success-item">
-                <h4>{title}</h4>
-                <p>{description}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        elif level == "warning":
-            st.markdown(f"""
-            <div class="warning-item">
-                <h4>{title}</h4>
-                <p>{description}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="warning-item">
-                <h4>{title}</h4>
-                <p>{description}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-# Main content with tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-    "📊 Revenue Analysis", 
-    "👥 Customer Intelligence", 
-    "📦 Product Performance", 
-    "⚙️ Operational Excellence", 
-    "🔮 Predictive Analytics",
-    "📋 Data Export"
-])
-
-with tab1:
-    st.subheader("Revenue Performance Analysis")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Monthly revenue trend
+def build_revenue_section(filtered_data, profiler):
+    """Aggregate and build the Revenue Analysis figures"""
+    # Monthly revenue trend
+    with profiler.stage('revenue.aggregate.monthly', rows=len(filtered_data)):
         monthly_revenue = filtered_data.groupby(filtered_data['Date'].dt.to_period('M'))['Value'].sum()
-        
+    
+    with profiler.stage('revenue.figure.monthly_trend'):
         fig_trend = go.Figure()
         fig_trend.add_trace(go.Scatter(
             x=[str(x) for x in monthly_revenue.index], 
@@ -412,7 +331,7 @@ with tab1:
             line=dict(color='#1f77b4', width=3),
             marker=dict(size=8)
         ))
-        
+    
         fig_trend.update_layout(
             title="Monthly Revenue Trend",
             xaxis_title="Month",
@@ -420,12 +339,12 @@ with tab1:
             height=400,
             template="plotly_white"
         )
-        st.plotly_chart(fig_trend, use_container_width=True)
     
-    with col2:
-        # Customer revenue distribution
-        customer_revenue = filtered_data.groupby('Customer')['Value'].sum().sort_values(ascending=False).head(10)
-        
+    # Customer revenue distribution
+    with profiler.stage('revenue.aggregate.top_customers', rows=len(filtered_data)):
+        customer_revenue = top_n(filtered_data.groupby('Customer')['Value'].sum(), 10)
+    
+    with profiler.stage('revenue.figure.top_customers'):
         fig_customer = px.bar(
             x=customer_revenue.values, 
             y=customer_revenue.index,
@@ -436,86 +355,114 @@ with tab1:
             color_continuous_scale='viridis'
         )
         fig_customer.update_layout(height=400, template="plotly_white")
-        st.plotly_chart(fig_customer, use_container_width=True)
-    
-    # Revenue breakdown analysis
-    st.subheader("Revenue Composition Analysis")
-    
-    col1, col2 = st.columns(2)
     
-    with col1:
-        # Quarterly performance
+    # Quarterly performance
+    with profiler.stage('revenue.aggregate.quarterly', rows=len(filtered_data)):
         quarterly_data = filtered_data.groupby(filtered_data['Date'].dt.quarter).agg({
             'Value': 'sum',
             'Profit_Margin': 'mean'
         }).reset_index()
-        
+    
+    with profiler.stage('revenue.figure.quarterly'):
         fig_quarterly = make_subplots(specs=[[{"secondary_y": True}]])
-        
+    
         fig_quarterly.add_trace(
             go.Bar(x=[f"Q{q}" for q in quarterly_data['Date']], y=quarterly_data['Value'], name="Revenue"),
             secondary_y=False,
         )
-        
+    
         fig_quarterly.add_trace(
             go.Scatter(x=[f"Q{q}" for q in quarterly_data['Date']], y=quarterly_data['Profit_Margin'], 
                       mode='lines+markers', name="Profit Margin %"),
             secondary_y=True,
         )
-        
+    
         fig_quarterly.update_xaxes(title_text="Quarter")
         fig_quarterly.update_yaxes(title_text="Revenue (₹)", secondary_y=False)
         fig_quarterly.update_yaxes(title_text="Profit Margin (%)", secondary_y=True)
         fig_quarterly.update_layout(title="Quarterly Performance", height=400)
-        
-        st.plotly_chart(fig_quarterly, use_container_width=True)
     
-    with col2:
-        # Revenue by product category (top products)
-        product_revenue = filtered_data.groupby('Part description')['Value'].sum().sort_values(ascending=False).head(8)
-        
+    # Revenue by product category (top products)
+    with profiler.stage('revenue.aggregate.top_products', rows=len(filtered_data)):
+        product_revenue = top_n(filtered_data.groupby('Part description')['Value'].sum(), 8)
+    
+    with profiler.stage('revenue.figure.product_mix'):
         fig_products = px.pie(
             values=product_revenue.values, 
             names=[name[:25] + "..." if len(name) > 25 else name for name in product_revenue.index],
             title="Revenue Distribution by Top Products"
         )
         fig_products.update_layout(height=400)
-        st.plotly_chart(fig_products, use_container_width=True)
+    
+    # Growth of every customer and part in the latest month and quarter
+    with profiler.stage('revenue.aggregate.period_comparison', rows=len(filtered_data)):
+        growth_tables = {(freq, key): growth_table(filtered_data, key, freq)
+                         for freq in ('M', 'Q') for key in ('Customer', 'Part description')}
+    
+    return {
+        'fig_trend': fig_trend,
+        'fig_customer': fig_customer,
+        'fig_quarterly': fig_quarterly,
+        'fig_products': fig_products,
+        'growth_tables': growth_tables,
+    }
 
-with tab2:
-    st.subheader("Customer Intelligence Dashboard")
+def render_revenue_section(section):
+    """Lay out the Revenue Analysis tab"""
+    st.subheader("Revenue Performance Analysis")
     
-    # Customer performance matrix
-    customer_analysis = filtered_data.groupby('Customer').agg({
-        'Value': ['count', 'sum', 'mean'],
-        'Qty': 'sum',
-        'Profit_Margin': 'mean',
-        'Overall_Efficiency': 'mean'
-    }).round(2)
-    
-    customer_analysis.columns = ['Order_Count', 'Total_Revenue', 'Avg_Order_Value', 'Total_Qty', 'Avg_Profit_Margin', 'Avg_Efficiency']
-    customer_analysis = customer_analysis.reset_index()
-    
-    # Customer segmentation
-    revenue_median = customer_analysis['Total_Revenue'].median()
-    frequency_median = customer_analysis['Order_Count'].median()
-    
-    def segment_customer(row):
-        if row['Total_Revenue'] > revenue_median and row['Order_Count'] > frequency_median:
-            return "💎 Champions"
-        elif row['Total_Revenue'] > revenue_median:
-            return "🏆 High Value"
-        elif row['Order_Count'] > frequency_median:
-            return "🔄 Frequent"
-        else:
-            return "🔍 Potential"
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(section['fig_trend'], use_container_width=True)
+    with col2:
+        st.plotly_chart(section['fig_customer'], use_container_width=True)
     
-    customer_analysis['Segment'] = customer_analysis.apply(segment_customer, axis=1)
+    # Revenue breakdown analysis
+    st.subheader("Revenue Composition Analysis")
     
     col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(section['fig_quarterly'], use_container_width=True)
+    with col2:
+        st.plotly_chart(section['fig_products'], use_container_width=True)
     
+    st.subheader("Period-over-Period Growth")
+    col1, col2 = st.columns(2)
     with col1:
-        # Customer scatter plot
+        period = st.radio("Compare", ["Month over month", "Quarter over quarter"], horizontal=True, key='growth_period')
+    with col2:
+        dimension = st.radio("By", ["Customer", "Part description"], horizontal=True, key='growth_dimension')
+    freq = 'M' if period == "Month over month" else 'Q'
+    st.caption("Latest period in the selection against the previous period and the same period a year earlier; "
+               "margin, efficiency and cost variance changes are in percentage points")
+    render_paginated_table(
+        section['growth_tables'][(freq, dimension)],
+        key=f'growth_{freq}_{dimension}',
+        formats=GROWTH_TABLE_FORMATS,
+        gradient={'Revenue_Growth_%': 'RdYlGn'},
+        default_sort='Revenue'
+    )
+
+def build_customer_section(filtered_data, profiler):
+    """Aggregate, segment and chart customer performance"""
+    # Customer performance matrix
+    with profiler.stage('customers.aggregate', rows=len(filtered_data)):
+        customer_analysis = filtered_data.groupby('Customer').agg({
+            'Value': ['count', 'sum', 'mean'],
+            'Qty': 'sum',
+            'Profit_Margin': 'mean',
+            'Overall_Efficiency': 'mean'
+        }).round(2)
+    
+        customer_analysis.columns = ['Order_Count', 'Total_Revenue', 'Avg_Order_Value', 'Total_Qty', 'Avg_Profit_Margin', 'Avg_Efficiency']
+        customer_analysis = customer_analysis.reset_index()
+    
+        # Customer segmentation
+        customer_analysis['Segment'] = segment_customers(customer_analysis['Total_Revenue'],
+                                                         customer_analysis['Order_Count'])
+    
+    # Customer scatter plot
+    with profiler.stage('customers.figure.segmentation_matrix'):
         fig_scatter = px.scatter(
             customer_analysis, 
             x='Order_Count', 
@@ -526,55 +473,124 @@ with tab2:
             title="Customer Segmentation Matrix"
         )
         fig_scatter.update_layout(height=400)
-        st.plotly_chart(fig_scatter, use_container_width=True)
     
-    with col2:
-        # Customer segment distribution
+    # Customer segment distribution
+    with profiler.stage('customers.figure.segment_mix'):
         segment_counts = customer_analysis['Segment'].value_counts()
-        
+    
         fig_segments = px.pie(
             values=segment_counts.values, 
             names=segment_counts.index,
             title="Customer Segment Distribution"
         )
         fig_segments.update_layout(height=400)
-        st.plotly_chart(fig_segments, use_container_width=True)
+    
+    # Concentration risk over time
+    with profiler.stage('customers.aggregate.concentration', rows=len(filtered_data)):
+        concentration = concentration_series(filtered_data, 'month')
+    
+    with profiler.stage('customers.figure.concentration'):
+        fig_concentration = make_subplots(specs=[[{"secondary_y": True}]])
+    
+        fig_concentration.add_trace(
+            go.Bar(x=[str(x) for x in concentration.index], y=concentration['Customers_For_Share'],
+                   name="Customers for 80% Revenue"),
+            secondary_y=False,
+        )
+    
+        fig_concentration.add_trace(
+            go.Scatter(x=[str(x) for x in concentration.index], y=concentration['HHI'],
+                      mode='lines+markers', name="HHI"),
+            secondary_y=True,
+        )
+    
+        fig_concentration.update_xaxes(title_text="Month")
+        fig_concentration.update_yaxes(title_text="Customers", secondary_y=False)
+        fig_concentration.update_yaxes(title_text="HHI (0-10,000)", secondary_y=True)
+        fig_concentration.update_layout(title="Monthly Customer Concentration", height=400)
+    
+    # Trailing-window KPIs per customer
+    with profiler.stage('customers.aggregate.rolling_kpis', rows=len(filtered_data)):
+        rolling_customers, rolling_as_of = rolling_kpi_table(filtered_data, 'Customer')
+    
+    return {
+        'customer_analysis': customer_analysis,
+        'fig_scatter': fig_scatter,
+        'fig_segments': fig_segments,
+        'fig_concentration': fig_concentration,
+        'rolling_kpis': rolling_customers,
+        'rolling_as_of': rolling_as_of,
+    }
+
+def render_rolling_kpis(section, key, table_key):
+    """Paginated 7/30/90-day KPI table under a customer or product section"""
+    as_of = section['rolling_as_of']
+    st.subheader("Rolling 7/30/90-Day KPIs")
+    if as_of is None:
+        st.info("No dated orders in the current selection.")
+        return
+    st.caption(f"Trailing windows ending {as_of.strftime('%Y-%m-%d')}; margin, efficiency and variance are 30-day order averages")
+    render_paginated_table(
+        section['rolling_kpis'],
+        key=table_key,
+        formats=ROLLING_TABLE_FORMATS,
+        gradient={'Revenue_30d': 'Purples'},
+        default_sort='Revenue_30d'
+    )
+
+def render_customer_section(section):
+    """Lay out the Customer Intelligence tab"""
+    st.subheader("Customer Intelligence Dashboard")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(section['fig_scatter'], use_container_width=True)
+    with col2:
+        st.plotly_chart(section['fig_segments'], use_container_width=True)
+    
+    # Concentration trend
+    st.subheader("Customer Concentration Trend")
+    st.plotly_chart(section['fig_concentration'], use_container_width=True)
     
     # Customer details table
     st.subheader("Customer Performance Details")
     
-    # Add styling to dataframe
-    styled_customer_df = customer_analysis.style.format({
-        'Total_Revenue': '₹{:,.0f}',
-        'Avg_Order_Value': '₹{:,.0f}',
-        'Total_Qty': '{:,.0f}',
-        'Avg_Profit_Margin': '{:.2f}%',
-        'Avg_Efficiency': '{:.1f}%'
-    }).background_gradient(subset=['Total_Revenue'], cmap='Blues')
+    # Paginated table: only the visible page is formatted and color-scaled
+    render_paginated_table(
+        section['customer_analysis'],
+        key='customer_table',
+        formats={
+            'Total_Revenue': '₹{:,.0f}',
+            'Avg_Order_Value': '₹{:,.0f}',
+            'Total_Qty': '{:,.0f}',
+            'Avg_Profit_Margin': '{:.2f}%',
+            'Avg_Efficiency': '{:.1f}%'
+        },
+        gradient={'Total_Revenue': 'Blues'},
+        default_sort='Total_Revenue'
+    )
     
-    st.dataframe(styled_customer_df, use_container_width=True, height=400)
+    render_rolling_kpis(section, 'Customer', 'customer_rolling_table')
 
-with tab3:
-    st.subheader("Product Performance Analytics")
-    
+def build_product_section(filtered_data, profiler):
+    """Aggregate and chart product performance"""
     # Product analysis
-    product_analysis = filtered_data.groupby('Part description').agg({
-        'Value': ['sum', 'count'],
-        'Qty': 'sum',
-        'Profit_Margin': 'mean',
-        'Rate': 'mean'
-    }).round(2)
+    with profiler.stage('products.aggregate', rows=len(filtered_data)):
+        product_analysis = filtered_data.groupby('Part description').agg({
+            'Value': ['sum', 'count'],
+            'Qty': 'sum',
+            'Profit_Margin': 'mean',
+            'Rate': 'mean'
+        }).round(2)
     
-    product_analysis.columns = ['Total_Revenue', 'Order_Count', 'Total_Qty', 'Avg_Profit_Margin', 'Avg_Rate']
-    product_analysis = product_analysis.reset_index()
-    product_analysis = product_analysis.sort_values('Total_Revenue', ascending=False)
+        product_analysis.columns = ['Total_Revenue', 'Order_Count', 'Total_Qty', 'Avg_Profit_Margin', 'Avg_Rate']
+        product_analysis = product_analysis.reset_index()
+        top_20_products = top_n(product_analysis, 20, by='Total_Revenue')
     
-    col1, col2 = st.columns(2)
+    # Top products by revenue
+    with profiler.stage('products.figure.top_products'):
+        top_products = top_20_products.head(10)
     
-    with col1:
-        # Top products by revenue
-        top_products = product_analysis.head(10)
-        
         fig_top_products = px.bar(
             top_products, 
             x='Total_Revenue', 
@@ -585,12 +601,11 @@ with tab3:
             color_continuous_scale='RdYlBu_r'
         )
         fig_top_products.update_layout(height=500)
-        st.plotly_chart(fig_top_products, use_container_width=True)
     
-    with col2:
-        # Product performance matrix
+    # Product performance matrix
+    with profiler.stage('products.figure.performance_matrix'):
         fig_matrix = px.scatter(
-            product_analysis.head(20), 
+            top_20_products, 
             x='Total_Qty', 
             y='Total_Revenue',
             color='Avg_Profit_Margin',
@@ -600,38 +615,67 @@ with tab3:
             color_continuous_scale='viridis'
         )
         fig_matrix.update_layout(height=500)
-        st.plotly_chart(fig_matrix, use_container_width=True)
-    
-    # Product performance table
-    st.subheader("Product Performance Details")
     
     # Format product names for better display
-    display_products = product_analysis.head(20).copy()
-    display_products['Product'] = display_products['Part description'].apply(lambda x: x[:50] + "..." if len(x) > 50 else x)
+    with profiler.stage('products.table.display_names', rows=len(product_analysis)):
+        names = product_analysis['Part description']
+        display_products = product_analysis.assign(
+            Product=names.str.slice(0, 50).where(names.str.len() <= 50, names.str.slice(0, 50) + "...")
+        )
     
-    styled_product_df = display_products[['Product', 'Total_Revenue', 'Order_Count', 'Total_Qty', 'Avg_Profit_Margin', 'Avg_Rate']].style.format({
-        'Total_Revenue': '₹{:,.0f}',
-        'Total_Qty': '{:,.0f}',
-        'Avg_Profit_Margin': '{:.2f}%',
-        'Avg_Rate': '₹{:,.0f}'
-    }).background_gradient(subset=['Total_Revenue'], cmap='Greens')
+    # Trailing-window KPIs per part
+    with profiler.stage('products.aggregate.rolling_kpis', rows=len(filtered_data)):
+        rolling_products, rolling_as_of = rolling_kpi_table(filtered_data, 'Part description')
     
-    st.dataframe(styled_product_df, use_container_width=True, height=400)
+    return {
+        'product_analysis': product_analysis,
+        'display_products': display_products[['Product', 'Total_Revenue', 'Order_Count', 'Total_Qty', 'Avg_Profit_Margin', 'Avg_Rate']],
+        'fig_top_products': fig_top_products,
+        'fig_matrix': fig_matrix,
+        'rolling_kpis': rolling_products,
+        'rolling_as_of': rolling_as_of,
+    }
 
-with tab4:
-    st.subheader("Operational Excellence Dashboard")
+def render_product_section(section):
+    """Lay out the Product Performance tab"""
+    st.subheader("Product Performance Analytics")
     
     col1, col2 = st.columns(2)
-    
     with col1:
-        # Efficiency metrics
+        st.plotly_chart(section['fig_top_products'], use_container_width=True)
+    with col2:
+        st.plotly_chart(section['fig_matrix'], use_container_width=True)
+    
+    # Product performance table
+    st.subheader("Product Performance Details")
+    
+    render_paginated_table(
+        section['display_products'],
+        key='product_table',
+        formats={
+            'Total_Revenue': '₹{:,.0f}',
+            'Total_Qty': '{:,.0f}',
+            'Avg_Profit_Margin': '{:.2f}%',
+            'Avg_Rate': '₹{:,.0f}'
+        },
+        gradient={'Total_Revenue': 'Greens'},
+        default_sort='Total_Revenue'
+    )
+    
+    render_rolling_kpis(section, 'Part description', 'product_rolling_table')
+
+def build_operations_section(filtered_data, profiler):
+    """Aggregate and chart efficiency and cost variance"""
+    # Efficiency metrics
+    with profiler.stage('operations.aggregate.efficiency', rows=len(filtered_data)):
         efficiency_metrics = {
             'Manpower': filtered_data['Manpower_Efficiency'].mean(),
             'Material': filtered_data['Material_Efficiency'].mean(),
             'Machine': filtered_data['Machine_Efficiency'].mean(),
             'Overall': filtered_data['Overall_Efficiency'].mean()
         }
-        
+    
+    with profiler.stage('operations.figure.efficiency'):
         fig_efficiency = go.Figure(data=[
             go.Bar(
                 x=list(efficiency_metrics.keys()), 
@@ -639,7 +683,7 @@ with tab4:
                 marker_color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
             )
         ])
-        
+    
         fig_efficiency.update_layout(
             title="Operational Efficiency Metrics",
             yaxis_title="Efficiency (%)",
@@ -647,20 +691,19 @@ with tab4:
         )
         fig_efficiency.add_hline(y=100, line_dash="dash", line_color="red", 
                                 annotation_text="Target (100%)")
-        
-        st.plotly_chart(fig_efficiency, use_container_width=True)
     
-    with col2:
-        # Cost variance analysis
+    # Cost variance analysis
+    with profiler.stage('operations.aggregate.cost_variance', rows=len(filtered_data)):
         variance_data = {
             'Manpower': filtered_data['variation Manpower'].mean(),
             'Material': filtered_data['variation RawMaterial'].mean(),
             'Machine': filtered_data['variation Machine power'].mean(),
             'Overhead': filtered_data['variation overhead '].mean()
         }
-        
+    
+    with profiler.stage('operations.figure.cost_variance'):
         colors = ['green' if v <= 0 else 'red' for v in variance_data.values()]
-        
+    
         fig_variance = go.Figure(data=[
             go.Bar(
                 x=list(variance_data.keys()), 
@@ -668,108 +711,207 @@ with tab4:
                 marker_color=colors
             )
         ])
-        
+    
         fig_variance.update_layout(
             title="Cost Variance by Category",
             yaxis_title="Variance (%)",
             height=400
         )
         fig_variance.add_hline(y=0, line_dash="dash", line_color="black")
-        
-        st.plotly_chart(fig_variance, use_container_width=True)
     
     # Efficiency trends
-    st.subheader("Efficiency Trend Analysis")
+    with profiler.stage('operations.aggregate.monthly_trends', rows=len(filtered_data)):
+        monthly_efficiency = filtered_data.groupby(filtered_data['Date'].dt.to_period('M')).agg({
+            'Overall_Efficiency': 'mean',
+            'Cost_Variance_Pct': 'mean'
+        }).reset_index()
     
-    monthly_efficiency = filtered_data.groupby(filtered_data['Date'].dt.to_period('M')).agg({
-        'Overall_Efficiency': 'mean',
-        'Cost_Variance_Pct': 'mean'
-    }).reset_index()
+    with profiler.stage('operations.figure.monthly_trends'):
+        fig_trends = make_subplots(specs=[[{"secondary_y": True}]])
     
-    fig_trends = make_subplots(specs=[[{"secondary_y": True}]])
+        fig_trends.add_trace(
+            go.Scatter(x=[str(x) for x in monthly_efficiency['Date']], 
+                      y=monthly_efficiency['Overall_Efficiency'], 
+                      name="Efficiency %", mode='lines+markers'),
+            secondary_y=False,
+        )
     
-    fig_trends.add_trace(
-        go.Scatter(x=[str(x) for x in monthly_efficiency['Date']], 
-                  y=monthly_efficiency['Overall_Efficiency'], 
-                  name="Efficiency %", mode='lines+markers'),
-        secondary_y=False,
-    )
+        fig_trends.add_trace(
+            go.Scatter(x=[str(x) for x in monthly_efficiency['Date']], 
+                      y=monthly_efficiency['Cost_Variance_Pct'], 
+                      name="Cost Variance %", mode='lines+markers'),
+            secondary_y=True,
+        )
+    
+        fig_trends.update_xaxes(title_text="Month")
+        fig_trends.update_yaxes(title_text="Efficiency (%)", secondary_y=False)
+        fig_trends.update_yaxes(title_text="Cost Variance (%)", secondary_y=True)
+        fig_trends.update_layout(title="Monthly Efficiency and Cost Variance Trends", height=400)
+    
+    # Ledger-wide rolling KPIs on every calendar day
+    with profiler.stage('operations.aggregate.rolling_kpis', rows=len(filtered_data)):
+        rolling_daily = RollingKPIEngine(key=None).fit(filtered_data).daily()
+    
+    with profiler.stage('operations.figure.rolling_kpis'):
+        fig_rolling = make_subplots(specs=[[{"secondary_y": True}]])
+    
+        for window, color in zip(DEFAULT_WINDOWS, ['#9ecae1', '#3182bd', '#08519c']):
+            fig_rolling.add_trace(
+                go.Scatter(x=rolling_daily.index, y=rolling_daily[f'Revenue_{window}d'],
+                          name=f"Revenue ({window}d)", mode='lines', line=dict(color=color)),
+                secondary_y=False,
+            )
+    
+        fig_rolling.add_trace(
+            go.Scatter(x=rolling_daily.index, y=rolling_daily['Efficiency_30d'],
+                      name="Efficiency % (30d)", mode='lines', line=dict(color='#d62728', dash='dot')),
+            secondary_y=True,
+        )
+    
+        fig_rolling.update_xaxes(title_text="Date")
+        fig_rolling.update_yaxes(title_text="Revenue (₹)", secondary_y=False)
+        fig_rolling.update_yaxes(title_text="Efficiency (%)", secondary_y=True)
+        fig_rolling.update_layout(title="Rolling 7/30/90-Day Revenue and 30-Day Efficiency", height=400)
+    
+    return {
+        'fig_efficiency': fig_efficiency,
+        'fig_variance': fig_variance,
+        'fig_trends': fig_trends,
+        'fig_rolling': fig_rolling,
+    }
+
+def render_operations_section(section):
+    """Lay out the Operational Excellence tab"""
+    st.subheader("Operational Excellence Dashboard")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(section['fig_efficiency'], use_container_width=True)
+    with col2:
+        st.plotly_chart(section['fig_variance'], use_container_width=True)
     
-    fig_trends.add_trace(
-        go.Scatter(x=[str(x) for x in monthly_efficiency['Date']], 
-                  y=monthly_efficiency['Cost_Variance_Pct'], 
-                  name="Cost Variance %", mode='lines+markers'),
-        secondary_y=True,
+    # Efficiency trends
+    st.subheader("Efficiency Trend Analysis")
+    st.plotly_chart(section['fig_trends'], use_container_width=True)
+    st.plotly_chart(section['fig_rolling'], use_container_width=True)
+
+def forecast_figure(forecasts, name, title, period_label="Month"):
+    """Actuals, forecast and prediction interval of one series as a line chart with a shaded band"""
+    series = forecasts.series(name)
+    periods = [str(period) for period in series.index]
+    actual = series['Actual'].dropna()
+    future = series['Forecast'].dropna()
+    future_periods = [str(period) for period in future.index]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=[str(period) for period in actual.index],
+        y=actual,
+        mode='lines+markers',
+        name='Historical',
+        line=dict(color='blue')
+    ))
+    fig.add_trace(go.Scatter(
+        x=future_periods + future_periods[::-1],
+        y=list(series['Upper'].dropna()) + list(series['Lower'].dropna())[::-1],
+        fill='toself',
+        fillcolor='rgba(255, 0, 0, 0.12)',
+        line=dict(color='rgba(255, 0, 0, 0)'),
+        hoverinfo='skip',
+        name=f"{forecasts.level:.0%} interval"
+    ))
+    fig.add_trace(go.Scatter(
+        x=future_periods,
+        y=future,
+        mode='lines+markers',
+        name='Forecast',
+        line=dict(color='red', dash='dash')
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=period_label,
+        yaxis_title="Revenue (₹)",
+        xaxis=dict(categoryorder='array', categoryarray=periods),
+        height=400
     )
+    return fig
+
+@st.cache_resource(max_entries=4)
+def get_series_forecasts(version, key, freq, _snapshot):
+    """Revenue forecasts for every customer or part of one dataset version, fitted in one batch and shared"""
+    return forecast_series(_snapshot.data, key, freq)
+
+def build_forecast_section(filtered_data, profiler):
+    """Fit the monthly revenue trend and build the forecast chart"""
+    with profiler.stage('forecast.aggregate.monthly', rows=len(filtered_data)):
+        monthly_data = filtered_data.groupby(filtered_data['Date'].dt.to_period('M')).agg({
+            'Value': 'sum',
+            'Profit_Margin': 'mean'
+        }).reset_index()
     
-    fig_trends.update_xaxes(title_text="Month")
-    fig_trends.update_yaxes(title_text="Efficiency (%)", secondary_y=False)
-    fig_trends.update_yaxes(title_text="Cost Variance (%)", secondary_y=True)
-    fig_trends.update_layout(title="Monthly Efficiency and Cost Variance Trends", height=400)
+    section = {'monthly_data': monthly_data, 'fig_forecast': None}
     
-    st.plotly_chart(fig_trends, use_container_width=True)
+    # Trend plus seasonality (once two years are available) for the selection as a whole
+    with profiler.stage('forecast.model.series', rows=len(filtered_data)):
+        forecasts = forecast_series(filtered_data)
+    if forecasts.forecast.empty or forecasts.forecast.iloc[0].isna().all():
+        return section
+    
+    with profiler.stage('forecast.figure.revenue_forecast'):
+        fig_forecast = forecast_figure(forecasts, forecasts.forecast.index[0], "Revenue Forecast (Next 3 Months)")
+    
+    section.update(fig_forecast=fig_forecast, forecast_revenue=list(forecasts.forecast.iloc[0]))
+    return section
 
-with tab5:
+def render_series_forecasts():
+    """Forecast of any single customer or part, from the cached batch fit of the whole dataset"""
+    st.markdown("### 🔎 Customer & Part Forecasts")
+    col1, col2 = st.columns(2)
+    with col1:
+        key = st.radio("Forecast by", ['Customer', 'Part description'], horizontal=True, key='series_forecast_key')
+    with col2:
+        # Monthly series need MIN_PERIODS months of history; shorter ledgers default to weekly
+        freq = st.radio("Granularity", ['M', 'W'], index=0 if snapshot.month_count >= MIN_PERIODS else 1,
+                        horizontal=True, format_func={'M': 'Monthly', 'W': 'Weekly'}.get,
+                        key='series_forecast_freq')
+    
+    forecasts = get_series_forecasts(snapshot.version, key, freq, snapshot)
+    summary = forecasts.summary().dropna(subset=['Next_Forecast']).sort_values('Horizon_Total', ascending=False)
+    if summary.empty:
+        st.warning(f"No {key.lower()} has {MIN_PERIODS} periods of history at this granularity yet.")
+        return
+    
+    name = st.selectbox(key, summary.index, key='series_forecast_name')
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        period_label = 'Month' if freq == 'M' else 'Week'
+        st.plotly_chart(forecast_figure(forecasts, name, f"{name}: Revenue Forecast", period_label),
+                        use_container_width=True)
+    with col2:
+        row = summary.loc[name]
+        st.metric("Next Period Forecast", f"₹{row['Next_Forecast']:,.0f}")
+        st.write(f"{forecasts.level:.0%} interval: ₹{row['Next_Lower']:,.0f} – ₹{row['Next_Upper']:,.0f}")
+        st.metric("Projected Horizon Revenue", f"₹{row['Horizon_Total']:,.0f}")
+        st.metric("Trend per Period", f"₹{row['Trend_Per_Period']:+,.0f}")
+    st.caption(f"{len(summary):,} {key.lower()} forecasts for dataset version {snapshot.version} "
+               f"(whole dataset, independent of the sidebar filters)")
+
+def render_forecast_section(section):
+    """Lay out the Predictive Analytics tab"""
     st.subheader("Predictive Analytics & Forecasting")
     
     st.info("🔮 **Predictive Models**: Revenue forecasting and trend analysis based on historical patterns")
     
-    # Simple trend analysis and forecasting
-    monthly_data = filtered_data.groupby(filtered_data['Date'].dt.to_period('M')).agg({
-        'Value': 'sum',
-        'Profit_Margin': 'mean'
-    }).reset_index()
-    
-    if len(monthly_data) > 3:
-        # Simple linear trend for next 3 months
-        from datetime import datetime, timedelta
-        import numpy as np
-        
-        # Calculate trend
-        revenue_trend = np.polyfit(range(len(monthly_data)), monthly_data['Value'], 1)
-        
-        # Forecast next 3 months
-        last_date = pd.to_datetime(monthly_data['Date'].iloc[-1].to_timestamp())
-        forecast_months = []
-        forecast_revenue = []
-        
-        for i in range(1, 4):
-            next_month = last_date + pd.DateOffset(months=i)
-            forecast_months.append(next_month.strftime('%Y-%m'))
-            forecast_value = revenue_trend[0] * (len(monthly_data) + i - 1) + revenue_trend[1]
-            forecast_revenue.append(max(0, forecast_value))
+    if section['fig_forecast'] is None:
+        st.warning(f"Insufficient data for reliable forecasting. Need at least {MIN_PERIODS} months of data.")
+    else:
+        monthly_data = section['monthly_data']
+        forecast_revenue = section['forecast_revenue']
         
         col1, col2 = st.columns(2)
         
         with col1:
-            # Revenue forecast
-            fig_forecast = go.Figure()
-            
-            # Historical data
-            fig_forecast.add_trace(go.Scatter(
-                x=[str(x) for x in monthly_data['Date']], 
-                y=monthly_data['Value'],
-                mode='lines+markers',
-                name='Historical',
-                line=dict(color='blue')
-            ))
-            
-            # Forecast
-            fig_forecast.add_trace(go.Scatter(
-                x=forecast_months, 
-                y=forecast_revenue,
-                mode='lines+markers',
-                name='Forecast',
-                line=dict(color='red', dash='dash')
-            ))
-            
-            fig_forecast.update_layout(
-                title="Revenue Forecast (Next 3 Months)",
-                xaxis_title="Month",
-                yaxis_title="Revenue (₹)",
-                height=400
-            )
-            st.plotly_chart(fig_forecast, use_container_width=True)
+            st.plotly_chart(section['fig_forecast'], use_container_width=True)
         
         with col2:
             # Forecast summary
@@ -791,8 +933,221 @@ with tab5:
             st.write("• Operational efficiency variations")
             st.write("• Cost variance impact")
     
-    else:
-        st.warning("Insufficient data for reliable forecasting. Need at least 4 months of data.")
+    render_series_forecasts()
+
+# Tab sections in display order: (name, builder, renderer)
+TAB_SECTIONS = [
+    ('revenue', build_revenue_section, render_revenue_section),
+    ('customers', build_customer_section, render_customer_section),
+    ('products', build_product_section, render_product_section),
+    ('operations', build_operations_section, render_operations_section),
+    ('forecast', build_forecast_section, render_forecast_section),
+]
+
+# Render instrumentation; memory tracing is only switched on with the sidebar panel
+profiler = RenderProfiler(
+    'professional_streamlit_dashboard',
+    trace_memory=st.session_state.get('show_performance_panel', False)
+)
+
+# Load data
+with profiler.stage('load'):
+    snapshot = load_and_clean_data()
+
+if snapshot is None or snapshot.data.empty:
+    st.error("Failed to load data. Please check the CSV file.")
+    st.stop()
+
+data = snapshot.data
+
+# Header
+st.markdown('<h1 class="main-header">🏭 Professional Manufacturing Analytics Dashboard</h1>', unsafe_allow_html=True)
+
+# Sidebar
+st.sidebar.markdown("## 🔍 Analytics Controls")
+st.sidebar.markdown("---")
+
+# Filters
+customers = st.sidebar.multiselect(
+    "Select Customers", 
+    data['Customer'].unique(), 
+    default=data['Customer'].unique(),
+    help="Filter data by customer companies"
+)
+
+date_range = st.sidebar.date_input(
+    "Select Date Range", 
+    value=(data['Date'].min(), data['Date'].max()),
+    min_value=data['Date'].min(),
+    max_value=data['Date'].max(),
+    help="Choose the analysis period"
+)
+
+# Advanced filters
+st.sidebar.markdown("### Advanced Filters")
+min_order_value = st.sidebar.slider(
+    "Minimum Order Value (₹)", 
+    min_value=0, 
+    max_value=int(data['Value'].max()), 
+    value=0,
+    help="Filter orders by minimum value"
+)
+
+profit_margin_filter = st.sidebar.slider(
+    "Profit Margin Range (%)", 
+    min_value=float(data['Profit_Margin'].min()), 
+    max_value=float(data['Profit_Margin'].max()), 
+    value=(float(data['Profit_Margin'].min()), float(data['Profit_Margin'].max())),
+    help="Filter by profit margin range"
+)
+
+# Filter data
+with profiler.stage('filter', rows=len(data)):
+    selected_data = snapshot.select(
+        customers=customers,
+        start=pd.to_datetime(date_range[0]),
+        end=pd.to_datetime(date_range[1])
+    )
+    filtered_data = selected_data[
+        (selected_data['Value'] >= min_order_value) &
+        (selected_data['Profit_Margin'] >= profit_margin_filter[0]) &
+        (selected_data['Profit_Margin'] <= profit_margin_filter[1])
+    ]
+
+# Only the date range narrows the selection, so day sketches can answer distinct counts
+date_only_selection = len(set(customers)) == len(snapshot.customer_index) and len(filtered_data) == len(selected_data)
+
+def distinct_count(field):
+    """Distinct values of a column in the selection, estimated from the day sketches on large ledgers"""
+    if date_only_selection and len(date_range) == 2 and len(snapshot) >= APPROX_DISTINCT_MIN_ROWS:
+        estimate = get_distinct_index(snapshot.version, snapshot).count(field, date_range[0], date_range[1])
+        return f"≈{estimate:,}"
+    return f"{filtered_data[field].nunique():,}"
+
+# Executive Dashboard
+st.markdown("## 📊 Executive Dashboard")
+
+# Key metrics row
+with profiler.stage('kpis', rows=len(filtered_data)):
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    with col1:
+        total_revenue = filtered_data['Value'].sum()
+        st.markdown(f"""
+        <div class="metric-container">
+            <h3>💰 Total Revenue</h3>
+            <h2>₹{total_revenue:,.0f}</h2>
+            <p>YTD Performance</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        avg_margin = filtered_data['Profit_Margin'].mean()
+        st.markdown(f"""
+        <div class="metric-container">
+            <h3>📈 Avg Profit Margin</h3>
+            <h2>{avg_margin:.1f}%</h2>
+            <p>Current Period</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        total_orders = len(filtered_data)
+        st.markdown(f"""
+        <div class="metric-container">
+            <h3>📦 Total Orders</h3>
+            <h2>{total_orders:,}</h2>
+            <p>Active Orders</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        efficiency = filtered_data['Overall_Efficiency'].mean()
+        st.markdown(f"""
+        <div class="metric-container">
+            <h3>⚙️ Efficiency</h3>
+            <h2>{efficiency:.1f}%</h2>
+            <p>Operational</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col5:
+        customers_count = distinct_count('Customer')
+        st.markdown(f"""
+        <div class="metric-container">
+            <h3>🏢 Active Customers</h3>
+            <h2>{customers_count}</h2>
+            <p>Current Period</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+# Executive Insights
+st.markdown("## 🎯 Executive Insights")
+with profiler.stage('insights', rows=len(filtered_data)):
+    insights = generate_executive_insights(filtered_data)
+
+    insight_cols = st.columns(2)
+    for i, (level, title, description) in enumerate(insights):
+        with insight_cols[i % 2]:
+            if level == "success":
+                st.markdown(f"""
+                <div class="success-item">
+                    <h4>{title}</h4>
+                    <p>{description}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            elif level == "warning":
+                st.markdown(f"""
+                <div class="warning-item">
+                    <h4>{title}</h4>
+                    <p>{description}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                st.markdown(f"""
+                <div class="warning-item">
+                    <h4>{title}</h4>
+                    <p>{description}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+# Main content with tabs
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    "📊 Revenue Analysis", 
+    "👥 Customer Intelligence", 
+    "📦 Product Performance", 
+    "⚙️ Operational Excellence", 
+    "🔮 Predictive Analytics",
+    "📋 Data Export"
+])
+
+# KPIs are already on screen; build the heavy tab content in parallel and fill
+# each tab as soon as its section is ready
+executor = get_render_executor()
+slots = {}
+futures = {}
+for tab, (name, build, render) in zip([tab1, tab2, tab3, tab4, tab5], TAB_SECTIONS):
+    with tab:
+        slots[name] = st.empty()
+        slots[name].info("⏳ Building charts...")
+    futures[executor.submit(build, filtered_data, profiler)] = (name, render)
+
+sections = {}
+try:
+    for future in as_completed(futures):
+        name, render = futures[future]
+        with profiler.stage(f'{name}.render'):
+            with slots[name].container():
+                try:
+                    sections[name] = future.result()
+                except Exception as e:
+                    st.error(f"Error building this section: {e}")
+                    continue
+                render(sections[name])
+finally:
+    # A rerun interrupts the script here; don't leave stale work queued on the pool
+    for future in futures:
+        future.cancel()
 
 with tab6:
     st.subheader("Data Export & Reports")
@@ -803,21 +1158,22 @@ with tab6:
         st.markdown("### 📊 Analytics Reports")
         
         # Summary statistics
-        summary_stats = {
-            'Metric': ['Total Revenue', 'Average Order Value', 'Total Orders', 
-                      'Average Profit Margin', 'Operational Efficiency', 'Active Customers'],
-            'Value': [
-                f"₹{filtered_data['Value'].sum():,.0f}",
-                f"₹{filtered_data['Value'].mean():,.0f}",
-                f"{len(filtered_data):,}",
-                f"{filtered_data['Profit_Margin'].mean():.2f}%",
-                f"{filtered_data['Overall_Efficiency'].mean():.1f}%",
-                f"{filtered_data['Customer'].nunique()}"
-            ]
-        }
+        with profiler.stage('export.summary_table', rows=len(filtered_data)):
+            summary_stats = {
+                'Metric': ['Total Revenue', 'Average Order Value', 'Total Orders', 
+                          'Average Profit Margin', 'Operational Efficiency', 'Active Customers'],
+                'Value': [
+                    f"₹{filtered_data['Value'].sum():,.0f}",
+                    f"₹{filtered_data['Value'].mean():,.0f}",
+                    f"{len(filtered_data):,}",
+                    f"{filtered_data['Profit_Margin'].mean():.2f}%",
+                    f"{filtered_data['Overall_Efficiency'].mean():.1f}%",
+                    distinct_count('Customer')
+                ]
+            }
         
-        summary_df = pd.DataFrame(summary_stats)
-        st.dataframe(summary_df, use_container_width=True)
+            summary_df = pd.DataFrame(summary_stats)
+            st.dataframe(summary_df, use_container_width=True)
         
         # Download links
         st.markdown("### 💾 Download Reports")
@@ -845,23 +1201,40 @@ with tab6:
             default=["Filtered Data"]
         )
         
+        exporter = get_data_exporter()
+        format_labels = {'csv': "CSV", 'csv.gz': "CSV (gzip)", 'parquet': "Parquet"}
+        export_format = st.selectbox(
+            "Export format:",
+            exporter.available_formats(),
+            format_func=lambda fmt: format_labels[fmt],
+            help="Large exports are streamed to a temporary file in the background"
+        )
+        
         if st.button("Generate Export Package"):
-            if "Filtered Data" in export_options:
-                st.download_button(
-                    label="📊 Download Filtered Data",
-                    data=filtered_data.to_csv(index=False),
-                    file_name=f"bdm_filtered_data_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
-            
-            if "Customer Analysis" in export_options:
-                customer_export = customer_analysis
-                st.download_button(
-                    label="👥 Download Customer Analysis",
-                    data=customer_export.to_csv(index=False),
-                    file_name=f"customer_analysis_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
+            export_sources = {
+                "Filtered Data": ("📊 Download Filtered Data", "bdm_filtered_data", lambda: filtered_data),
+                "Customer Analysis": ("👥 Download Customer Analysis", "customer_analysis",
+                                      lambda: sections['customers']['customer_analysis']),
+                "Product Analysis": ("📦 Download Product Analysis", "product_analysis",
+                                     lambda: sections['products']['product_analysis'].sort_values(
+                                         'Total_Revenue', ascending=False)),
+                "Monthly Summary": ("📅 Download Monthly Summary", "monthly_summary",
+                                    lambda: sections['forecast']['monthly_data'].assign(
+                                        Date=sections['forecast']['monthly_data']['Date'].astype(str))),
+            }
+            stamp = datetime.now().strftime('%Y%m%d')
+            exporter.discard(job['future'] for job in st.session_state.get('export_jobs', []))
+            st.session_state['export_jobs'] = [
+                {
+                    'key': f"{option}_{export_format}",
+                    'label': label,
+                    'future': exporter.submit(build_frame(), f"{file_stem}_{stamp}", fmt=export_format)
+                }
+                for option, (label, file_stem, build_frame) in export_sources.items()
+                if option in export_options
+            ]
+        
+        render_export_jobs()
         
         st.markdown("### 📋 Report Features")
         st.info("""
@@ -891,9 +1264,23 @@ st.sidebar.info(f"""
 **Data Summary:**
 - Records: {len(filtered_data):,}
 - Date Range: {filtered_data['Date'].min().strftime('%Y-%m-%d')} to {filtered_data['Date'].max().strftime('%Y-%m-%d')}
-- Customers: {filtered_data['Customer'].nunique()}
-- Products: {filtered_data['Part description'].nunique()}
+- Customers: {distinct_count('Customer')}
+- Products: {distinct_count('Part description')}
 """)
 
+st.sidebar.caption(f"Dataset version {snapshot.version} · loaded {snapshot.loaded_at.strftime('%Y-%m-%d %H:%M:%S')}")
+
 if st.sidebar.button("🔄 Refresh Dashboard"):
-    st.rerun()
\ No newline at end of file
+    get_dataset_watcher().trigger()
+    st.toast("Reloading data in the background; new data appears on the next refresh.")
+    st.rerun()
+
+show_performance_panel = st.sidebar.checkbox(
+    "⏱️ Show performance panel",
+    key='show_performance_panel',
+    help="Per-stage render timings, rows processed and peak memory for this rerun"
+)
+
+profiler.finish()
+if show_performance_panel:
+    profiler.render_panel(st.sidebar)
\ No newline at end of file
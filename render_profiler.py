@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Set BDM_RENDER_LOG to a file path to append one JSON line per dashboard rerun (default: stderr)
+RENDER_LOG_PATH = os.environ.get('BDM_RENDER_LOG')
+
+_logger_lock = threading.Lock()
+
+# tracemalloc is process-wide: traced stages run one at a time, and tracing stays on while any profiler needs it
+_trace_lock = threading.RLock()
+_trace_stack = []  # [base, peak] of the traced stages open on the thread holding _trace_lock
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def get_render_logger():
+    """Logger for structured render timings: JSON lines to BDM_RENDER_LOG, or stderr by default"""
+    logger = logging.getLogger('bdm.render')
+    with _logger_lock:
+        if not getattr(logger, '_bdm_configured', False):
+            if RENDER_LOG_PATH:
+                handler = logging.FileHandler(RENDER_LOG_PATH, encoding='utf-8')
+            else:
+                handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger._bdm_configured = True
+    return logger
+
+
+def _start_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    """Release one profiler's use of tracemalloc; the last one stops it if a profiler started it"""
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+@contextmanager
+def _traced_peak(record):
+    """Peak of traced allocations above the starting level while the block runs, in MB"""
+    with _trace_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        # Resetting the peak would lose it for enclosing stages, so fold it into theirs first
+        for frame in _trace_stack:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        _trace_stack.append(frame)
+        try:
+            yield
+        finally:
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+            _trace_stack.pop()
+            for outer in _trace_stack:
+                outer[1] = max(outer[1], peak)
+            record['peak_mb'] = max(peak - frame[0], 0) / (1024 * 1024)
+
+
+def _peak_rss_mb():
+    """Process high-water resident memory in MB (cheap, always available on POSIX)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class RenderProfiler:
+    """Time each stage of a dashboard rerun and track rows processed and peak memory.
+
+    Wrap work in ``with profiler.stage('name', rows=n):``. Stages may run on worker
+    threads. With ``trace_memory=True`` the per-stage peak of Python allocations is
+    measured with tracemalloc (accurate but slower: tracemalloc is process-wide,
+    so traced stages are serialized; it is only enabled for the debug panel).
+    Otherwise each stage records ``process_peak_mb``, the process high-water RSS
+    when it ended, which is not attributable to the stage itself.
+    """
+
+    def __init__(self, page, trace_memory=False):
+        self.page = page
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now()
+        self.trace_memory = trace_memory
+        self.records = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._tracing = trace_memory
+
+        if trace_memory:
+            _start_tracing()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time a block; the yielded record can be updated, e.g. record['rows'] = len(df)"""
+        record = {'stage': name, 'rows': rows, 'thread': threading.current_thread().name}
+        start = time.perf_counter()
+        try:
+            if self.trace_memory:
+                with _traced_peak(record):
+                    start = time.perf_counter()
+                    yield record
+            else:
+                yield record
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            if not self.trace_memory:
+                record['process_peak_mb'] = _peak_rss_mb()
+            with self._lock:
+                self.records.append(record)
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def to_frame(self):
+        """Stage records as a DataFrame, slowest first"""
+        with self._lock:
+            frame = pd.DataFrame(self.records, columns=['stage', 'ms', 'rows', 'peak_mb', 'process_peak_mb', 'thread'])
+        return frame.sort_values('ms', ascending=False).reset_index(drop=True)
+
+    def finish(self):
+        """Write the run to the structured render log and release this profiler's use of tracing"""
+        with self._lock:
+            stages = [dict(record) for record in self.records]
+        payload = {
+            'event': 'dashboard_render',
+            'page': self.page,
+            'run_id': self.run_id,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_ms': round(self.total_ms, 2),
+            'peak_rss_mb': _peak_rss_mb(),
+            'stages': [{key: (round(value, 3) if isinstance(value, float) else value)
+                        for key, value in record.items()} for record in stages],
+        }
+        get_render_logger().info(json.dumps(payload, default=str))
+
+        if self._tracing:
+            self._tracing = False
+            _stop_tracing()
+        return payload
+
+    def render_panel(self, container):
+        """Render the timing table into a Streamlit container such as st.sidebar"""
+        frame = self.to_frame()
+        container.markdown("### ⏱️ Render Performance")
+        container.caption(f"Run {self.run_id} · total {self.total_ms:,.0f} ms · "
+                          f"{len(frame)} stages · process peak RSS {(_peak_rss_mb() or 0):,.0f} MB")
+        # Only one memory column is filled, depending on whether tracing was on
+        frame = frame.drop(columns=['thread', 'process_peak_mb' if self.trace_memory else 'peak_mb'])
+        container.dataframe(
+            frame.style.format({'ms': '{:,.1f}', 'rows': '{:,.0f}', 'peak_mb': '{:,.2f}',
+                                'process_peak_mb': '{:,.0f}'}, na_rep='–'),
+            use_container_width=True,
+            height=min(38 + 35 * len(frame), 420)
+        )
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOWS = (7, 30, 90)
+
+# KPI name -> ledger column summed per day; averages are divided by the order count
+SUM_MEASURES = {
+    'Revenue': 'Value',
+    'Qty': 'Qty',
+    'Profit_Margin': 'Profit_Margin',
+    'Efficiency': 'Overall_Efficiency',
+    'Cost_Variance': 'Cost_Variance_Pct',
+}
+AVERAGE_KPIS = ('Profit_Margin', 'Efficiency', 'Cost_Variance')
+KPI_COLUMNS = ['Revenue', 'Qty', 'Orders', 'Profit_Margin', 'Efficiency', 'Cost_Variance']
+
+# Spacing between keys in the encoded (key, day) axis; larger than any day number
+_KEY_STRIDE = np.int64(1) << 32
+
+
+def _day_numbers(dates):
+    return pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def _day_dates(days):
+    return pd.to_datetime(np.asarray(days, dtype=np.int64).astype('datetime64[D]'))
+
+
+def _per_key_cumsum(codes, sums, initial=None):
+    """Cumulative sums that restart at every change of key, optionally offset per row's key"""
+    if not len(codes):
+        return np.zeros_like(sums)
+    cums = np.cumsum(sums, axis=0)
+    new_key = np.r_[True, codes[1:] != codes[:-1]]
+    starts = np.flatnonzero(new_key)
+    group = np.cumsum(new_key) - 1
+    before = np.vstack([np.zeros((1, sums.shape[1])), cums[starts[1:] - 1]])
+    cums = cums - before[group]
+    if initial is not None:
+        cums = cums + initial[starts][group]
+    return cums
+
+
+class RollingKPIEngine:
+    """Trailing-window KPIs (7/30/90 days by default) for every customer or part at once.
+
+    The ledger is reduced to one row of daily sums per (key, day), sorted by key
+    and day, with a running cumulative sum inside each key. Any window total is
+    then the difference of two cumulative sums found by binary search, so the
+    series for every key and window come out of a few vectorized lookups.
+    ``extend()`` appends newer days to the existing sums without re-reading
+    the history. Use ``key=None`` for ledger-wide KPIs.
+    """
+
+    def __init__(self, key='Customer', windows=DEFAULT_WINDOWS):
+        self.key = key
+        self.windows = tuple(windows)
+        self.labels = []
+        self._codes_by_label = {}
+        self._reset()
+
+    def _reset(self):
+        self.codes = np.array([], dtype=np.int64)
+        self.days = np.array([], dtype=np.int64)
+        self.sums = np.zeros((0, len(SUM_MEASURES) + 1))
+        self.cums = np.zeros((0, len(SUM_MEASURES) + 1))
+        self._encoded = np.array([], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def last_date(self):
+        return _day_dates([self.days.max()])[0] if len(self.days) else None
+
+    def _key_codes(self, values):
+        """Stable integer codes for key labels; unseen labels get new codes at the end"""
+        if self.key is None:
+            return np.zeros(len(values), dtype=np.int64)
+        uniques, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+        for label in uniques:
+            if label not in self._codes_by_label:
+                self._codes_by_label[label] = len(self.labels)
+                self.labels.append(label)
+        lookup = np.array([self._codes_by_label[label] for label in uniques], dtype=np.int64)
+        return lookup[inverse]
+
+    def _daily_sums(self, data):
+        """Collapse ledger rows to sorted (code, day) rows of measure sums plus an order count"""
+        data = data[data['Date'].notna()]
+        if self.key is None:
+            keys = np.zeros(len(data), dtype=np.int64)
+        else:
+            keys = self._key_codes(data[self.key].to_numpy())
+        frame = pd.DataFrame({kpi: data[col].to_numpy(dtype=float) for kpi, col in SUM_MEASURES.items()})
+        frame['Orders'] = 1.0
+        frame['code'] = keys
+        frame['day'] = _day_numbers(data['Date'])
+        daily = frame.groupby(['code', 'day'], sort=True).sum()
+        codes = daily.index.get_level_values('code').to_numpy(dtype=np.int64)
+        days = daily.index.get_level_values('day').to_numpy(dtype=np.int64)
+        return codes, days, daily.to_numpy(dtype=float)
+
+    def _rebuild(self, codes, days, sums):
+        """Store sorted daily sums and recompute the per-key cumulative sums"""
+        self.codes, self.days, self.sums = codes, days, sums
+        self._encoded = codes * _KEY_STRIDE + days
+        self.cums = _per_key_cumsum(codes, sums)
+
+    def fit(self, data):
+        """Build the daily sums from a ledger frame, replacing any previous state"""
+        self._reset()
+        self._rebuild(*self._daily_sums(data))
+        return self
+
+    def extend(self, data):
+        """Add ledger rows for newer days, reusing the cumulative sums already built.
+
+        Days after each key's latest stored day are spliced in and only their
+        running totals are computed. Rows for a day that is already stored (or
+        earlier) are merged into the daily sums and the running totals rebuilt.
+        """
+        codes, days, sums = self._daily_sums(data)
+        if not len(codes):
+            return self
+        if not len(self.codes):
+            self._rebuild(codes, days, sums)
+            return self
+
+        encoded = codes * _KEY_STRIDE + days
+        positions = np.searchsorted(self._encoded, encoded, side='right')
+        previous = np.maximum(positions - 1, 0)
+        following = np.minimum(positions, len(self.codes) - 1)
+        has_previous = (positions > 0) & (self.codes[previous] == codes)
+        has_following = (positions < len(self.codes)) & (self.codes[following] == codes)
+
+        if has_following.any() or (has_previous & (self.days[previous] == days)).any():
+            merged = pd.DataFrame(np.vstack([self.sums, sums]))
+            merged['code'] = np.r_[self.codes, codes]
+            merged['day'] = np.r_[self.days, days]
+            merged = merged.groupby(['code', 'day'], sort=True).sum()
+            self._rebuild(merged.index.get_level_values('code').to_numpy(dtype=np.int64),
+                          merged.index.get_level_values('day').to_numpy(dtype=np.int64),
+                          merged.to_numpy(dtype=float))
+            return self
+
+        # Continue each key's running total from its last stored row
+        initial = np.where(has_previous[:, None], self.cums[previous], 0.0)
+        new_cums = _per_key_cumsum(codes, sums, initial)
+
+        self.codes = np.insert(self.codes, positions, codes)
+        self.days = np.insert(self.days, positions, days)
+        self.sums = np.insert(self.sums, positions, sums, axis=0)
+        self.cums = np.insert(self.cums, positions, new_cums, axis=0)
+        self._encoded = np.insert(self._encoded, positions, encoded)
+        return self
+
+    def _cumulative_at(self, codes, days):
+        """Running totals for each key up to and including each day (zero before its first day)"""
+        if not len(self.codes):
+            return np.zeros((len(codes), len(SUM_MEASURES) + 1))
+        idx = np.searchsorted(self._encoded, codes * _KEY_STRIDE + days, side='right') - 1
+        valid = (idx >= 0) & (self.codes[np.maximum(idx, 0)] == codes)
+        return np.where(valid[:, None], self.cums[np.maximum(idx, 0)], 0.0)
+
+    def window_kpis(self, codes, days, window):
+        """KPIs over the `window` days ending on each (code, day) query point"""
+        codes = np.asarray(codes, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        totals = self._cumulative_at(codes, days) - self._cumulative_at(codes, days - window)
+        kpis = pd.DataFrame(totals, columns=list(SUM_MEASURES) + ['Orders'])
+        orders = kpis['Orders'].where(kpis['Orders'] > 0.5)
+        for kpi in AVERAGE_KPIS:
+            kpis[kpi] = kpis[kpi] / orders
+        return kpis[KPI_COLUMNS]
+
+    def _with_windows(self, codes, days, windows):
+        windows = self.windows if windows is None else windows
+        parts = [self.window_kpis(codes, days, window).add_suffix(f'_{window}d') for window in windows]
+        return pd.concat(parts, axis=1)
+
+    def _label_column(self, codes, frame):
+        if self.key is not None:
+            frame.insert(0, self.key, np.asarray(self.labels, dtype=object)[codes] if len(codes) else [])
+        return frame
+
+    def series(self, windows=None):
+        """Rolling KPIs at every (key, day) that has orders, for all keys and windows"""
+        frame = self._with_windows(self.codes, self.days, windows)
+        frame.insert(0, 'Date', _day_dates(self.days))
+        return self._label_column(self.codes, frame)
+
+    def as_of(self, date=None, windows=None):
+        """One row per key: KPIs over the windows ending on `date` (default: latest day)"""
+        if not len(self.days):
+            return self._label_column(np.array([], dtype=np.int64), self._with_windows([], [], windows))
+        day = self.days.max() if date is None else _day_numbers([pd.Timestamp(date)])[0]
+        codes = np.unique(self.codes)
+        frame = self._with_windows(codes, np.full(len(codes), day), windows)
+        return self._label_column(codes, frame)
+
+    def daily(self, label=None, windows=None, start=None, end=None):
+        """Calendar-day rolling KPIs for one key (or the whole ledger when key is None)"""
+        if not len(self.days):
+            return self._with_windows([], [], windows).assign(Date=pd.DatetimeIndex([])).set_index('Date')
+        code = 0 if self.key is None else self._codes_by_label[str(label)]
+        first = self.days.min() if start is None else _day_numbers([pd.Timestamp(start)])[0]
+        last = self.days.max() if end is None else _day_numbers([pd.Timestamp(end)])[0]
+        days = np.arange(first, last + 1, dtype=np.int64)
+        frame = self._with_windows(np.full(len(days), code), days, windows)
+        frame.index = pd.DatetimeIndex(_day_dates(days), name='Date')
+        return frame
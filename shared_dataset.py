@@ -0,0 +1,207 @@
+import glob
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Source file or directory of CSV files; override with the BDM_DATA_SOURCE environment variable
+DEFAULT_SOURCE = os.environ.get('BDM_DATA_SOURCE', 'Main4 - Main3.csv')
+
+NUMERIC_COLUMNS = ['Qty', 'Rate', 'Value', 'Fwt',
+                   'Target  Manpower', 'variation Manpower', 'Actual Manpower',
+                   'Target RawMaterial(Cost)', 'variation RawMaterial', 'Actual RawMaterial',
+                   'Target Machinepower(Cost)', 'variation Machine power', 'Actual Machine power',
+                   'Target Overhead(Cost)or Profit', 'variation overhead ', 'Actual Overhead or profit']
+
+
+def clean_numeric_column(series):
+    """Vectorized equivalent of clean_currency: strip thousands separators, blanks become 0.0"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float).fillna(0.0)
+    text = series.astype(str).str.strip().str.replace(',', '', regex=False)
+    return pd.to_numeric(text, errors='coerce').fillna(0.0)
+
+
+def prepare_manufacturing_data(data):
+    """Clean raw ledger columns and derive the business metrics used by the dashboards"""
+    for col in NUMERIC_COLUMNS:
+        if col in data.columns:
+            data[col] = clean_numeric_column(data[col])
+
+    # Convert date
+    data['Date'] = pd.to_datetime(data['Date'], errors='coerce', dayfirst=True)
+
+    # Calculate business metrics
+    data['Total_Target_Cost'] = (data['Target  Manpower'] +
+                                 data['Target RawMaterial(Cost)'] +
+                                 data['Target Machinepower(Cost)'] +
+                                 data['Target Overhead(Cost)or Profit'])
+
+    data['Total_Actual_Cost'] = (data['Actual Manpower'] +
+                                 data['Actual RawMaterial'] +
+                                 data['Actual Machine power'] +
+                                 data['Actual Overhead or profit'])
+
+    data['Cost_Variance'] = data['Total_Actual_Cost'] - data['Total_Target_Cost']
+    data['Cost_Variance_Pct'] = (data['Cost_Variance'] / data['Total_Target_Cost'].replace(0, 1)) * 100
+    data['Profit_Margin'] = ((data['Value'] - data['Total_Actual_Cost']) / data['Value'].replace(0, 1)) * 100
+    data['Unit_Profit'] = (data['Value'] - data['Total_Actual_Cost']) / data['Qty'].replace(0, 1)
+    data['ROI'] = (data['Value'] - data['Total_Target_Cost']) / data['Total_Target_Cost'].replace(0, 1) * 100
+
+    # Efficiency metrics
+    data['Manpower_Efficiency'] = (data['Target  Manpower'] / data['Actual Manpower'].replace(0, 1)) * 100
+    data['Material_Efficiency'] = (data['Target RawMaterial(Cost)'] / data['Actual RawMaterial'].replace(0, 1)) * 100
+    data['Machine_Efficiency'] = (data['Target Machinepower(Cost)'] / data['Actual Machine power'].replace(0, 1)) * 100
+    data['Overall_Efficiency'] = (data['Manpower_Efficiency'] + data['Material_Efficiency'] + data['Machine_Efficiency']) / 3
+
+    return data
+
+
+def enable_copy_on_write():
+    """App-level pandas setting for the dashboards: copy-on-write, always on from pandas 3, opt-in on 2.x.
+
+    Sessions share one frame, and copy-on-write is what keeps the shallow
+    copies handed out by DatasetSnapshot from writing back into it.
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def list_source_files(source):
+    """Return the CSV files behind a source path, which may be a file or a directory"""
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.csv')))
+    return [source]
+
+
+def load_manufacturing_data(source=DEFAULT_SOURCE):
+    """Load and clean the manufacturing data from a CSV file or a directory of CSV files"""
+    files = list_source_files(source)
+    if not files:
+        raise FileNotFoundError(f"No CSV files found in {source}")
+    frames = [pd.read_csv(path) for path in files]
+    data = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return prepare_manufacturing_data(data)
+
+
+def iter_manufacturing_chunks(source=DEFAULT_SOURCE, chunksize=100000, skip_rows=0):
+    """Yield cleaned ledger chunks from a CSV file or directory without loading it all at once.
+
+    The first ``skip_rows`` ledger rows are read past without being cleaned,
+    so callers that only need appended rows pay the cleaning cost for those.
+    """
+    files = list_source_files(source)
+    if not files:
+        raise FileNotFoundError(f"No CSV files found in {source}")
+    for path in files:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            if skip_rows >= len(chunk):
+                skip_rows -= len(chunk)
+                continue
+            chunk, skip_rows = chunk.iloc[skip_rows:].copy(), 0
+            yield prepare_manufacturing_data(chunk)
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+class DatasetSnapshot:
+    """One immutable load of the ledger plus the row indexes built from it.
+
+    ``data`` and ``select()`` return new frame objects over the shared
+    columns, so a caller adding or overwriting columns never changes what
+    other sessions see; with copy-on-write (see enable_copy_on_write) in-place
+    value edits copy first as well.
+    """
+
+    def __init__(self, data, source, version):
+        self._data = data
+        self.source = source
+        self.version = version
+        self.loaded_at = datetime.now()
+
+        # Row positions per customer / part, so selections avoid full-column scans
+        self.customer_index = {key: _read_only(rows)
+                               for key, rows in data.groupby('Customer', sort=False).indices.items()}
+        self.part_index = {key: _read_only(rows)
+                           for key, rows in data.groupby('Part description', sort=False).indices.items()}
+
+        # Date-sorted row order for range lookups via binary search
+        dates = data['Date'].to_numpy(dtype='datetime64[ns]')
+        self.date_order = _read_only(np.argsort(dates, kind='stable'))
+        self.sorted_dates = _read_only(dates[self.date_order])
+        # Distinct calendar months, for choosing a forecast granularity without rescanning
+        months = self.sorted_dates[~np.isnat(self.sorted_dates)].astype('datetime64[M]')
+        self.month_count = len(np.unique(months))
+
+    @property
+    def data(self):
+        return self._data.copy(deep=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def rows_between(self, start=None, end=None):
+        """Return row positions whose Date falls in [start, end]"""
+        lo = 0 if start is None else np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = len(self.sorted_dates) if end is None else np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+        return self.date_order[lo:hi]
+
+    def select(self, customers=None, start=None, end=None):
+        """Return the rows for the given customers and date range as a new frame"""
+        positions = None
+        if start is not None or end is not None:
+            positions = self.rows_between(start, end)
+
+        if customers is not None:
+            customer_rows = [self.customer_index[c] for c in customers if c in self.customer_index]
+            customer_rows = np.concatenate(customer_rows) if customer_rows else np.array([], dtype=np.intp)
+            positions = customer_rows if positions is None else np.intersect1d(positions, customer_rows)
+
+        if positions is None:
+            return self.data
+        return self._data.take(np.sort(positions))
+
+
+class SharedDataset:
+    """Process-wide, read-only ledger shared by every dashboard session.
+
+    Readers take ``dataset.snapshot`` once per script run and use that object
+    throughout, so they always see one consistent version. ``refresh()`` builds
+    a complete new snapshot off to the side and only then swaps the reference,
+    which makes the refresh atomic: sessions keep the old version until their
+    next rerun and never observe a half-loaded frame.
+    """
+
+    def __init__(self, source=DEFAULT_SOURCE, loader=load_manufacturing_data):
+        self.source = source
+        self.loader = loader
+        self._snapshot = None
+        self._version = 0
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh(only_if_missing=True)
+        return snapshot
+
+    @property
+    def data(self):
+        return self.snapshot.data
+
+    def refresh(self, only_if_missing=False):
+        """Reload the source and atomically publish the new snapshot"""
+        with self._refresh_lock:
+            if only_if_missing and self._snapshot is not None:
+                return self._snapshot
+
+            snapshot = DatasetSnapshot(self.loader(self.source), self.source, self._version + 1)
+            self._version = snapshot.version
+            self._snapshot = snapshot
+            return snapshot
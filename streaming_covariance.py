@@ -0,0 +1,119 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from shared_dataset import DEFAULT_SOURCE, iter_manufacturing_chunks, list_source_files
+
+
+class CovarianceAccumulator:
+    """Mergeable covariance / correlation matrix built chunk by chunk (Welford/Chan updates).
+
+    Like ``DataFrame.corr()`` every pair of columns uses the rows where both are
+    present (non-finite values count as missing), so the accumulator keeps, per
+    pair, the row count, each column's mean and squared deviations over those
+    rows, and the co-moment. A chunk is reduced around its own column means
+    with a few matrix products, then folded in with Chan's pairwise update,
+    which stays numerically stable however many chunks or partitions are merged.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.count = np.zeros((p, p))
+        # mean[i, j] / m2[i, j]: mean and squared deviations of column i over rows where i and j are present
+        self.mean = np.zeros((p, p))
+        self.m2 = np.zeros((p, p))
+        self.comoment = np.zeros((p, p))
+
+    @classmethod
+    def from_frame(cls, data, columns=None, chunksize=None):
+        """Accumulate an in-memory frame, optionally in row chunks to bound temporary memory"""
+        columns = data.select_dtypes(include=[np.number]).columns if columns is None else columns
+        accumulator = cls(columns)
+        step = chunksize or max(len(data), 1)
+        for start in range(0, len(data), step):
+            accumulator.update(data.iloc[start:start + step])
+        return accumulator
+
+    def _chunk_moments(self, chunk):
+        values = chunk[self.columns].to_numpy(dtype=float)
+        present = np.isfinite(values)
+        with np.errstate(invalid='ignore'):
+            shift = np.nanmean(np.where(present, values, np.nan), axis=0)
+        centred = np.where(present, values - np.nan_to_num(shift), 0.0)
+        weights = present.astype(float)
+
+        count = weights.T @ weights
+        sums = centred.T @ weights
+        squares = (centred ** 2).T @ weights
+        cross = centred.T @ centred
+        with np.errstate(invalid='ignore', divide='ignore'):
+            local_mean = np.where(count > 0, sums / count, 0.0)
+        mean = np.nan_to_num(shift)[:, None] + local_mean
+        m2 = squares - sums * local_mean
+        comoment = cross - sums * local_mean.T
+        return count, mean, m2, comoment
+
+    def _combine(self, count, mean, m2, comoment):
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, count / total, 0.0)
+            cross_weight = np.where(total > 0, self.count * count / total, 0.0)
+        delta = mean - self.mean
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + m2 + delta ** 2 * cross_weight
+        self.comoment = self.comoment + comoment + delta * delta.T * cross_weight
+        self.count = total
+
+    def update(self, chunk):
+        """Fold a chunk of rows into the running moments"""
+        if len(chunk):
+            self._combine(*self._chunk_moments(chunk))
+        return self
+
+    def merge(self, other):
+        """Combine with an accumulator built over another partition"""
+        self._combine(other.count, other.mean, other.m2, other.comoment)
+        return self
+
+    def covariance(self):
+        """Sample covariance matrix (pairwise-complete), like DataFrame.cov()"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = np.where(self.count > 1, self.comoment / (self.count - 1), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Pearson correlation matrix (pairwise-complete), like DataFrame.corr()"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denominator = np.sqrt(self.m2 * self.m2.T)
+            corr = np.where((self.count > 1) & (denominator > 0), self.comoment / denominator, np.nan)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _accumulate_file(path, columns, chunksize):
+    accumulator = CovarianceAccumulator(columns)
+    for chunk in iter_manufacturing_chunks(path, chunksize=chunksize):
+        accumulator.update(chunk)
+    return accumulator
+
+
+def build_covariance(columns, source=DEFAULT_SOURCE, chunksize=100000, max_workers=None):
+    """Accumulate every CSV file of a source on a worker pool and merge the partitions"""
+    files = list_source_files(source)
+    merged = CovarianceAccumulator(columns)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bdm-covariance') as pool:
+        for partition in pool.map(lambda path: _accumulate_file(path, columns, chunksize), files):
+            merged.merge(partition)
+    return merged
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE
+    columns = ['Value', 'Qty', 'Rate', 'Profit_Margin', 'Overall_Efficiency', 'Cost_Variance_Pct']
+    accumulator = build_covariance(columns, source)
+    print(f"Correlation matrix for {source}:")
+    print(accumulator.correlation().round(3).to_string())
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+
+def sort_keys(values, ascending=False):
+    """Float keys whose ascending order is the requested order, with NaN always last"""
+    if isinstance(values, np.ndarray):
+        keys = values.astype(float)
+    elif pd.api.types.is_numeric_dtype(values):
+        keys = pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+    else:
+        codes, _ = pd.factorize(values, sort=True)
+        keys = np.where(codes < 0, np.nan, codes).astype(float)
+    return np.where(np.isnan(keys), np.inf, keys if ascending else -keys)
+
+
+def top_positions(keys, n, start=0):
+    """Positions of the n smallest keys in order (ties keep original order), skipping the first `start`.
+
+    Uses argpartition to select the candidates, so only those n rows are sorted
+    instead of the whole array.
+    """
+    size = len(keys)
+    stop = min(start + n, size)
+    start = min(start, stop)
+    if stop <= 0:
+        return np.array([], dtype=np.intp)
+    if stop < size:
+        # Keep every row tied with the cut-off so ties resolve by position, as a stable sort would
+        kth = keys[np.argpartition(keys, stop - 1)[stop - 1]]
+        candidates = np.flatnonzero(keys <= kth)
+    else:
+        candidates = np.arange(size)
+    order = candidates[np.lexsort((candidates, keys[candidates]))]
+    return order[start:stop]
+
+
+def top_n(data, n, by=None, ascending=False):
+    """Equivalent of data.sort_values(by, ascending=ascending, kind='stable').head(n).
+
+    Works on a Series (by=None) or a DataFrame sorted by one column, such as the
+    groupby aggregates behind every "top customers / top products" list.
+    """
+    values = data if by is None else data[by]
+    return data.iloc[top_positions(sort_keys(values, ascending), n)]